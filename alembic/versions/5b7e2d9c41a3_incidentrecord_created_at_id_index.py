@@ -0,0 +1,33 @@
+"""Add composite (created_at, id) index to incidentrecord
+
+Revision ID: 5b7e2d9c41a3
+Revises: eeebefcd37d6
+Create Date: 2026-10-18 09:12:40.518203
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = "5b7e2d9c41a3"
+down_revision = "eeebefcd37d6"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_incidentrecord_created_at_id",
+        "incidentrecord",
+        ["created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_incidentrecord_created_at_id", table_name="incidentrecord"
+    )
@@ -0,0 +1,99 @@
+"""Store the Slack user and channel cache one row per entity
+
+Revision ID: 7e4b1c9a2f60
+Revises: d41b7a2e96c5
+Create Date: 2026-10-18 15:02:11.604218
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = "7e4b1c9a2f60"
+down_revision = "d41b7a2e96c5"
+branch_labels = None
+depends_on = None
+
+
+# ApplicationData record that held each kind's list
+RECORDS = {
+    "channel": "slack_channels",
+    "user": "slack_users",
+}
+
+FIELDS = {
+    "channel": ("id", "name", "is_archived", "is_private"),
+    "user": ("id", "name", "real_name", "email"),
+}
+
+applicationdata = sa.table(
+    "applicationdata",
+    sa.column("name", sa.String),
+    sa.column("json_data", sa.JSON),
+)
+
+slackcacherecord = sa.table(
+    "slackcacherecord",
+    sa.column("kind", sa.String),
+    sa.column("id", sa.String),
+    sa.column("data", sa.JSON),
+)
+
+
+def upgrade():
+    op.create_table(
+        "slackcacherecord",
+        sa.Column("data", sa.JSON(), nullable=True),
+        sa.Column("kind", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("id", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("kind", "id"),
+    )
+
+    conn = op.get_bind()
+    for kind, record_name in RECORDS.items():
+        items = conn.execute(
+            sa.select(applicationdata.c.json_data).where(
+                applicationdata.c.name == record_name
+            )
+        ).scalar()
+        if not isinstance(items, list):
+            continue
+
+        rows = {}
+        for item in items:
+            if item.get("id"):
+                data = {k: item[k] for k in FIELDS[kind] if k in item}
+                rows[item["id"]] = {"kind": kind, "id": item["id"], "data": data}
+        if rows:
+            op.bulk_insert(slackcacherecord, list(rows.values()))
+
+        conn.execute(
+            sa.update(applicationdata)
+            .where(applicationdata.c.name == record_name)
+            .values(json_data=sa.null())
+        )
+
+
+def downgrade():
+    conn = op.get_bind()
+    for kind, record_name in RECORDS.items():
+        items = (
+            conn.execute(
+                sa.select(slackcacherecord.c.data).where(
+                    slackcacherecord.c.kind == kind
+                )
+            )
+            .scalars()
+            .all()
+        )
+        conn.execute(
+            sa.update(applicationdata)
+            .where(applicationdata.c.name == record_name)
+            .values(json_data=list(items))
+        )
+
+    op.drop_table("slackcacherecord")
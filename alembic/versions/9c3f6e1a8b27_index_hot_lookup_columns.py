@@ -0,0 +1,129 @@
+"""Index hot lookup columns
+
+Revision ID: 9c3f6e1a8b27
+Revises: 5b7e2d9c41a3
+Create Date: 2026-10-18 11:04:27.903114
+
+"""
+
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+logger = logging.getLogger(f"alembic.{__name__}")
+
+
+# revision identifiers, used by Alembic.
+revision = "9c3f6e1a8b27"
+down_revision = "5b7e2d9c41a3"
+branch_labels = None
+depends_on = None
+
+
+PARENT_TABLES = (
+    "gitlabissuerecord",
+    "incidentparticipant",
+    "jiraissuerecord",
+    "pagerdutyincidentrecord",
+    "phareincidentrecord",
+    "postmortemrecord",
+    "statuspageincidentrecord",
+)
+
+
+def _duplicates(conn, table: str, column: str) -> list[tuple[str, int]]:
+    return conn.execute(
+        sa.text(
+            f"SELECT {column}, COUNT(*) FROM {table} "
+            f"WHERE {column} IS NOT NULL "
+            f"GROUP BY {column} HAVING COUNT(*) > 1 ORDER BY {column}"
+        )
+    ).all()
+
+
+def upgrade():
+    conn = op.get_bind()
+
+    # Incidents can't be merged automatically; stop before creating the unique
+    # indexes and say which values need cleaning up by hand.
+    problems = [
+        f"incidentrecord.{column} {value!r} appears {count} times"
+        for column in ("channel_id", "slug")
+        for value, count in _duplicates(conn, "incidentrecord", column)
+    ]
+    if problems:
+        raise RuntimeError(
+            "cannot create unique incidentrecord indexes, resolve these "
+            "duplicates and rerun the migration: " + "; ".join(problems)
+        )
+
+    # applicationdata rows are looked up by name and every reader already
+    # takes the first match. Keep the most recent row for any name written
+    # more than once before the constraint, and report what was removed.
+    for name, count in _duplicates(conn, "applicationdata", "name"):
+        logger.warning(
+            "removing %d older applicationdata rows named %r, keeping the "
+            "most recent",
+            count - 1,
+            name,
+        )
+    op.execute(
+        """
+        DELETE FROM applicationdata a
+        USING applicationdata b
+        WHERE a.name = b.name
+          AND (
+            a.created_at < b.created_at
+            OR (a.created_at = b.created_at AND a.id < b.id)
+          )
+        """
+    )
+    op.create_index(
+        op.f("ix_applicationdata_name"),
+        "applicationdata",
+        ["name"],
+        unique=True,
+    )
+
+    op.create_index(
+        op.f("ix_incidentrecord_channel_id"),
+        "incidentrecord",
+        ["channel_id"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_incidentrecord_slug"),
+        "incidentrecord",
+        ["slug"],
+        unique=True,
+    )
+    op.create_index(
+        op.f("ix_incidentrecord_status"),
+        "incidentrecord",
+        ["status"],
+        unique=False,
+    )
+
+    for table in PARENT_TABLES:
+        op.create_index(
+            op.f(f"ix_{table}_parent"),
+            table,
+            ["parent"],
+            unique=False,
+        )
+
+
+def downgrade():
+    for table in PARENT_TABLES:
+        op.drop_index(op.f(f"ix_{table}_parent"), table_name=table)
+
+    op.drop_index(op.f("ix_incidentrecord_status"), table_name="incidentrecord")
+    op.drop_index(op.f("ix_incidentrecord_slug"), table_name="incidentrecord")
+    op.drop_index(
+        op.f("ix_incidentrecord_channel_id"), table_name="incidentrecord"
+    )
+    op.drop_index(
+        op.f("ix_applicationdata_name"), table_name="applicationdata"
+    )
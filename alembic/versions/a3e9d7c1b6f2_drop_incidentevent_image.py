@@ -0,0 +1,98 @@
+"""Drop incidentevent.image once every image is in the attachment store
+
+Revision ID: a3e9d7c1b6f2
+Revises: f2a7c5d1e9b4
+Create Date: 2026-10-18 21:12:40.518306
+
+"""
+
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from incidentbot.attachments.store import get_attachment_store
+
+
+# revision identifiers, used by Alembic.
+revision = "a3e9d7c1b6f2"
+down_revision = "f2a7c5d1e9b4"
+branch_labels = None
+depends_on = None
+
+
+def _stored_intact(store, image_hash: str | None) -> bool:
+    if not image_hash or not store.exists(image_hash):
+        return False
+
+    digest = hashlib.sha256()
+    for chunk in store.iter_chunks(image_hash):
+        digest.update(chunk)
+
+    return digest.hexdigest() == image_hash
+
+
+def upgrade():
+    # Check every copy made by d41b7a2e96c5 against the attachment store,
+    # reading only the stored files; images found missing or damaged are
+    # copied again from the column, one row at a time.
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, image_hash FROM incidentevent WHERE image IS NOT NULL"
+        )
+    ).all()
+    store = get_attachment_store() if rows else None
+    missing = []
+    for event_id, image_hash in rows:
+        if _stored_intact(store, image_hash):
+            continue
+
+        image = bytes(
+            conn.execute(
+                sa.text("SELECT image FROM incidentevent WHERE id = :id"),
+                {"id": event_id},
+            ).scalar_one()
+        )
+        image_hash = store.put(image)
+        conn.execute(
+            sa.text(
+                "UPDATE incidentevent SET image_hash = :image_hash, "
+                "image_size = :image_size WHERE id = :id"
+            ),
+            {"id": event_id, "image_hash": image_hash, "image_size": len(image)},
+        )
+        if not _stored_intact(store, image_hash):
+            missing.append(str(event_id))
+
+    if missing:
+        raise RuntimeError(
+            f"{len(missing)} incident event images could not be verified in "
+            f"the attachment store (events {', '.join(missing[:10])}); "
+            "incidentevent.image was kept. Check that attachments.path is "
+            "writable and run the migration again."
+        )
+
+    op.drop_column("incidentevent", "image")
+
+
+def downgrade():
+    op.add_column(
+        "incidentevent",
+        sa.Column("image", sa.LargeBinary(), nullable=True),
+    )
+
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, image_hash FROM incidentevent "
+            "WHERE image_hash IS NOT NULL"
+        )
+    ).all()
+    store = get_attachment_store() if rows else None
+    for event_id, image_hash in rows:
+        conn.execute(
+            sa.text("UPDATE incidentevent SET image = :image WHERE id = :id"),
+            {"id": event_id, "image": store.get(image_hash)},
+        )
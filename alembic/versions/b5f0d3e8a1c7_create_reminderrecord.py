@@ -0,0 +1,38 @@
+"""Create reminderrecord
+
+Revision ID: b5f0d3e8a1c7
+Revises: 7e4b1c9a2f60
+Create Date: 2026-10-18 16:40:52.118309
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = "b5f0d3e8a1c7"
+down_revision = "7e4b1c9a2f60"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "reminderrecord",
+        sa.Column("slug", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column(
+            "reminder_id", sqlmodel.sql.sqltypes.AutoString(), nullable=False
+        ),
+        sa.Column("dismissed", sa.Boolean(), nullable=False),
+        sa.Column("due_at", sa.DateTime(), nullable=True),
+        sa.Column("fired", sa.Boolean(), nullable=False),
+        sa.Column("snoozed", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("slug", "reminder_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("reminderrecord")
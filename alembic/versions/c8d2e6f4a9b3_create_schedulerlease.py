@@ -0,0 +1,33 @@
+"""Create schedulerlease
+
+Revision ID: c8d2e6f4a9b3
+Revises: b5f0d3e8a1c7
+Create Date: 2026-10-18 18:12:37.501946
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = "c8d2e6f4a9b3"
+down_revision = "b5f0d3e8a1c7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "schedulerlease",
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("holder", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade():
+    op.drop_table("schedulerlease")
@@ -0,0 +1,95 @@
+"""Move incident event images to the attachment store
+
+Revision ID: d41b7a2e96c5
+Revises: 9c3f6e1a8b27
+Create Date: 2026-10-18 13:26:51.377460
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+from incidentbot.attachments.store import get_attachment_store
+
+
+# revision identifiers, used by Alembic.
+revision = "d41b7a2e96c5"
+down_revision = "9c3f6e1a8b27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Only databases holding images need attachments.path configured; check
+    # before anything changes
+    conn = op.get_bind()
+    event_ids = (
+        conn.execute(
+            sa.text("SELECT id FROM incidentevent WHERE image IS NOT NULL")
+        )
+        .scalars()
+        .all()
+    )
+    store = get_attachment_store() if event_ids else None
+
+    op.add_column(
+        "incidentevent",
+        sa.Column(
+            "image_hash", sqlmodel.sql.sqltypes.AutoString(), nullable=True
+        ),
+    )
+    op.add_column(
+        "incidentevent",
+        sa.Column("image_size", sa.Integer(), nullable=True),
+    )
+    op.create_index(
+        op.f("ix_incidentevent_image_hash"),
+        "incidentevent",
+        ["image_hash"],
+        unique=False,
+    )
+
+    # Copy images out one row at a time so only a single image is ever held
+    # in memory. The image column is kept as it is; a later revision drops it
+    # once every copy has been checked.
+    for event_id in event_ids:
+        image = conn.execute(
+            sa.text("SELECT image FROM incidentevent WHERE id = :id"),
+            {"id": event_id},
+        ).scalar_one()
+        image = bytes(image)
+        conn.execute(
+            sa.text(
+                "UPDATE incidentevent SET image_hash = :image_hash, "
+                "image_size = :image_size WHERE id = :id"
+            ),
+            {
+                "id": event_id,
+                "image_hash": store.put(image),
+                "image_size": len(image),
+            },
+        )
+
+
+def downgrade():
+    # Images pinned since the upgrade only exist in the attachment store
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text(
+            "SELECT id, image_hash FROM incidentevent "
+            "WHERE image_hash IS NOT NULL AND image IS NULL"
+        )
+    ).all()
+    store = get_attachment_store() if rows else None
+    for event_id, image_hash in rows:
+        conn.execute(
+            sa.text("UPDATE incidentevent SET image = :image WHERE id = :id"),
+            {"id": event_id, "image": store.get(image_hash)},
+        )
+
+    op.drop_index(
+        op.f("ix_incidentevent_image_hash"), table_name="incidentevent"
+    )
+    op.drop_column("incidentevent", "image_size")
+    op.drop_column("incidentevent", "image_hash")
@@ -0,0 +1,41 @@
+"""Replace the incidentrecord status index with (status, created_at)
+
+Revision ID: f2a7c5d1e9b4
+Revises: c8d2e6f4a9b3
+Create Date: 2026-10-18 19:05:13.274861
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = "f2a7c5d1e9b4"
+down_revision = "c8d2e6f4a9b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_incidentrecord_status_created_at",
+        "incidentrecord",
+        ["status", "created_at"],
+        unique=False,
+    )
+    # Covered by the leading column of the new index
+    op.drop_index(op.f("ix_incidentrecord_status"), table_name="incidentrecord")
+
+
+def downgrade():
+    op.create_index(
+        op.f("ix_incidentrecord_status"),
+        "incidentrecord",
+        ["status"],
+        unique=False,
+    )
+    op.drop_index(
+        "ix_incidentrecord_status_created_at", table_name="incidentrecord"
+    )
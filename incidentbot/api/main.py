@@ -1,20 +1,30 @@
+import time
+
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 
 from incidentbot.api.routes import incidents, widget
 from incidentbot.configuration.settings import settings
+from incidentbot.util import metrics
 from incidentbot.version import APP_VERSION
 
+request_duration = metrics.histogram(
+    "incidentbot_api_request_duration_seconds",
+    "Time taken to serve API requests",
+    ("method", "route", "status"),
+)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     from incidentbot.scheduler.core import process as task_scheduler
     from incidentbot.startup import (
+        attachment_check,
         connect_platform,
         db_check,
         emit_startup_log,
@@ -24,6 +34,7 @@ async def lifespan(app: FastAPI):
     )
 
     db_check()
+    attachment_check()
     startup_tasks()
     task_scheduler.start()
     init_platform()
@@ -33,7 +44,30 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    task_scheduler.scheduler.shutdown(wait=False)
+    task_scheduler.shutdown()
+
+    from incidentbot.attachments.ingest import attachment_ingestor
+
+    attachment_ingestor.shutdown()
+
+    from incidentbot.slack.updates import message_updates
+
+    # Send roles panel and digest edits still waiting out their window
+    message_updates.shutdown()
+
+    from incidentbot.util.tracing import shutdown_exporter
+
+    # Send any spans still queued for the collector
+    shutdown_exporter()
+
+    if (
+        settings.integrations
+        and settings.integrations.pagerduty
+        and settings.integrations.pagerduty.enabled
+    ):
+        from incidentbot.pagerduty.client import client_pool
+
+        client_pool.close()
 
 
 app = FastAPI(
@@ -55,6 +89,22 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template, not path, so ids don't explode the series
+    route = request.scope.get("route")
+    request_duration.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=response.status_code,
+    )
+
+    return response
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(
     request: Request, exc: RequestValidationError
@@ -70,5 +120,15 @@ async def health():
     return {"healthy": True}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(_: None = Depends(incidents._api_key_check)):
+    if not settings.ENABLE_PROMETHEUS_METRICS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+
+    return PlainTextResponse(
+        metrics.exposition(), media_type=metrics.CONTENT_TYPE
+    )
+
+
 app.include_router(incidents.router)
 app.include_router(widget.router)
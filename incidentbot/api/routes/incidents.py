@@ -1,10 +1,17 @@
+import base64
+import hashlib
+import json
+import threading
+import time
+
+from collections.abc import Callable
 from datetime import datetime, timedelta, UTC
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi import status as http_status
 from pydantic import BaseModel
-from sqlalchemy import func
+from sqlalchemy import case, func, literal, tuple_
 from sqlmodel import select, Session
 
 from incidentbot.configuration.settings import settings
@@ -36,28 +43,30 @@ class ParticipantResponse(BaseModel):
 
 
 class IncidentResponse(BaseModel):
+    # Everything except id may be left out when a fields= projection is requested
     id: int
-    slug: str | None
-    description: str | None
-    severity: str | None
-    status: str | None
-    components: str | None
-    impact: str | None
-    is_security_incident: bool | None
-    channel_id: str | None
-    channel_name: str | None
-    link: str | None
-    meeting_link: str | None
-    created_at: datetime
-    updated_at: datetime | None
+    slug: str | None = None
+    description: str | None = None
+    severity: str | None = None
+    status: str | None = None
+    components: str | None = None
+    impact: str | None = None
+    is_security_incident: bool | None = None
+    channel_id: str | None = None
+    channel_name: str | None = None
+    link: str | None = None
+    meeting_link: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
     participants: list[ParticipantResponse] = []
 
 
 class IncidentListResponse(BaseModel):
-    total: int
+    total: int | None
     limit: int
     offset: int
     incidents: list[IncidentResponse]
+    next_cursor: str | None = None
 
 
 class MetricsResponse(BaseModel):
@@ -72,31 +81,50 @@ class MetricsResponse(BaseModel):
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
+# Response fields read straight from IncidentRecord columns
+_RECORD_FIELDS = tuple(
+    f for f in IncidentResponse.model_fields if f not in ("id", "participants")
+)
+
 
-def _final_statuses() -> list[str]:
-    return [s for s, cfg in settings.statuses.items() if cfg.final]
+def _final_statuses() -> frozenset[str]:
+    return settings.lookups.final_statuses
 
 
-def _to_response(incident: IncidentRecord, session: Session) -> IncidentResponse:
+def _participants_by_incident(
+    session: Session, incident_ids: list[int]
+) -> dict[int, list[IncidentParticipant]]:
+    """
+    Fetch participants for a page of incidents with a single query
+    """
+
+    grouped: dict[int, list[IncidentParticipant]] = {i: [] for i in incident_ids}
+    if not incident_ids:
+        return grouped
+
     participants = session.exec(
-        select(IncidentParticipant).where(IncidentParticipant.parent == incident.id)
+        select(IncidentParticipant)
+        .where(IncidentParticipant.parent.in_(incident_ids))
+        .order_by(IncidentParticipant.parent, IncidentParticipant.id)
     ).all()
-    return IncidentResponse(
-        id=incident.id,
-        slug=incident.slug,
-        description=incident.description,
-        severity=incident.severity,
-        status=incident.status,
-        components=incident.components,
-        impact=incident.impact,
-        is_security_incident=incident.is_security_incident,
-        channel_id=incident.channel_id,
-        channel_name=incident.channel_name,
-        link=incident.link,
-        meeting_link=incident.meeting_link,
-        created_at=incident.created_at,
-        updated_at=incident.updated_at,
-        participants=[
+    for p in participants:
+        grouped.setdefault(p.parent, []).append(p)
+
+    return grouped
+
+
+def _to_response(
+    incident: IncidentRecord,
+    participants: list[IncidentParticipant] | None,
+    fields: set[str] | None = None,
+) -> IncidentResponse:
+    values = {
+        f: getattr(incident, f)
+        for f in _RECORD_FIELDS
+        if fields is None or f in fields
+    }
+    if participants is not None:
+        values["participants"] = [
             ParticipantResponse(
                 role=p.role,
                 user_id=p.user_id,
@@ -104,41 +132,255 @@ def _to_response(incident: IncidentRecord, session: Session) -> IncidentResponse
                 is_lead=p.is_lead,
             )
             for p in participants
-        ],
+        ]
+
+    return IncidentResponse(id=incident.id, **values)
+
+
+def _parse_fields(fields: str | None) -> set[str] | None:
+    if not fields:
+        return None
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - set(IncidentResponse.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+
+    return requested
+
+
+def _encode_cursor(incident: IncidentRecord) -> str:
+    payload = json.dumps(
+        {"created_at": incident.created_at.isoformat(), "id": incident.id}
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (ValueError, KeyError, TypeError) as error:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from error
+
+
+def _compute_metrics() -> MetricsResponse:
+    """
+    Compute incident metrics with a single grouped scan of incidentrecord
+
+    Every figure is derived from per (severity, status) aggregates, so the
+    totals, breakdowns, MTTR and recent counts no longer need a query each.
+    """
+
+    final = _final_statuses()
+    now = datetime.now(tz=UTC)
+
+    with Session(engine) as session:
+        rows = session.execute(
+            select(
+                IncidentRecord.severity,
+                IncidentRecord.status,
+                func.count(IncidentRecord.id),
+                func.sum(
+                    case(
+                        (IncidentRecord.created_at >= now - timedelta(days=7), 1),
+                        else_=0,
+                    )
+                ),
+                func.sum(
+                    case(
+                        (IncidentRecord.created_at >= now - timedelta(days=30), 1),
+                        else_=0,
+                    )
+                ),
+                # MTTR uses updated_at as a proxy for resolution time (last
+                # write to a resolved record is the resolution event in the
+                # normal workflow).
+                func.sum(
+                    func.extract(
+                        "epoch",
+                        IncidentRecord.updated_at - IncidentRecord.created_at,
+                    )
+                ),
+                func.count(IncidentRecord.updated_at),
+            ).group_by(IncidentRecord.severity, IncidentRecord.status)
+        ).all()
+
+    total = open_count = last_7 = last_30 = resolved = 0
+    resolution_seconds = 0.0
+    by_severity: dict[str, int] = {}
+    by_status: dict[str, int] = {}
+    for severity, status, count, recent_7, recent_30, seconds, timed in rows:
+        total += count
+        last_7 += recent_7 or 0
+        last_30 += recent_30 or 0
+        severity_key = severity or "unknown"
+        by_severity[severity_key] = by_severity.get(severity_key, 0) + count
+        status_key = status or "unknown"
+        by_status[status_key] = by_status.get(status_key, 0) + count
+        if status in final:
+            resolved += timed or 0
+            resolution_seconds += float(seconds or 0)
+        elif status is not None:
+            # Matches status NOT IN (final), which never counts NULL
+            open_count += count
+
+    # Configured severities first, most severe first, then any others
+    rank = settings.lookups.severity_rank
+    by_severity = dict(
+        sorted(by_severity.items(), key=lambda item: rank.get(item[0], len(rank)))
+    )
+
+    mttr_hours: float | None = None
+    if resolved:
+        mttr_hours = round(resolution_seconds / resolved / 3600, 2)
+
+    return MetricsResponse(
+        total=total,
+        open=open_count,
+        by_severity=by_severity,
+        by_status=by_status,
+        mttr_hours=mttr_hours,
+        last_7_days=last_7,
+        last_30_days=last_30,
     )
 
 
+class _MetricsCache:
+    """
+    Keeps the last metrics response in memory for API_METRICS_CACHE_SECONDS so
+    dashboards polling the endpoint don't each trigger a scan
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value: tuple[MetricsResponse, str] | None = None
+        self._expires_at = 0.0
+
+    def get(
+        self, compute: Callable[[], MetricsResponse]
+    ) -> tuple[MetricsResponse, str]:
+        # Computing under the lock means concurrent pollers arriving after
+        # expiry wait for one scan instead of each running their own.
+        with self._lock:
+            if self._value is not None and time.monotonic() < self._expires_at:
+                return self._value
+
+            metrics = compute()
+            digest = hashlib.sha256(metrics.model_dump_json().encode()).hexdigest()
+            self._value = (metrics, f'"{digest[:32]}"')
+            self._expires_at = time.monotonic() + settings.API_METRICS_CACHE_SECONDS
+
+            return self._value
+
+    def clear(self):
+        with self._lock:
+            self._value = None
+            self._expires_at = 0.0
+
+
+_metrics_cache = _MetricsCache()
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+
+    return "*" in candidates or etag in candidates
+
+
 # ── Routes ────────────────────────────────────────────────────────────────────
 
 
-@router.get("/incidents")
+@router.get("/incidents", response_model_exclude_unset=True)
 def list_incidents(
     status: str | None = Query(default=None, description="Filter by status"),
     severity: str | None = Query(default=None, description="Filter by severity"),
     limit: int = Query(default=50, ge=1, le=500, description="Page size"),
     offset: int = Query(default=0, ge=0, description="Page offset"),
+    cursor: str | None = Query(
+        default=None,
+        description="Opaque next_cursor from a previous page; replaces offset",
+    ),
+    fields: str | None = Query(
+        default=None,
+        description="Comma-separated incident fields to return; id is always included",
+    ),
+    include_total: bool = Query(
+        default=True, description="Set to false to skip counting all matches"
+    ),
     _: None = Depends(_api_key_check),
 ) -> IncidentListResponse:
+    if cursor and offset:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="cursor and offset cannot be combined",
+        )
+
+    requested = _parse_fields(fields)
+    columns = [IncidentRecord.id, IncidentRecord.created_at] + [
+        getattr(IncidentRecord, f)
+        for f in _RECORD_FIELDS
+        if f != "created_at" and (requested is None or f in requested)
+    ]
+
     with Session(engine) as session:
-        count_stmt = select(func.count(IncidentRecord.id))
-        data_stmt = select(IncidentRecord)
+        filters = []
         if status:
-            count_stmt = count_stmt.where(IncidentRecord.status == status)
-            data_stmt = data_stmt.where(IncidentRecord.status == status)
+            filters.append(IncidentRecord.status == status)
         if severity:
-            count_stmt = count_stmt.where(IncidentRecord.severity == severity)
-            data_stmt = data_stmt.where(IncidentRecord.severity == severity)
-
-        total: int = session.execute(count_stmt).scalar_one()
-        incidents = session.exec(
-            data_stmt.order_by(IncidentRecord.created_at.desc()).offset(offset).limit(limit)
-        ).all()
+            filters.append(IncidentRecord.severity == severity)
+
+        total: int | None = None
+        if include_total:
+            total = session.execute(
+                select(func.count(IncidentRecord.id)).where(*filters)
+            ).scalar_one()
+
+        data_stmt = (
+            select(*columns)
+            .where(*filters)
+            .order_by(IncidentRecord.created_at.desc(), IncidentRecord.id.desc())
+        )
+        if cursor:
+            created_at, last_id = _decode_cursor(cursor)
+            data_stmt = data_stmt.where(
+                tuple_(IncidentRecord.created_at, IncidentRecord.id)
+                < tuple_(literal(created_at), literal(last_id))
+            )
+        else:
+            data_stmt = data_stmt.offset(offset)
+
+        # Fetch one extra row to learn whether another page exists
+        incidents = session.exec(data_stmt.limit(limit + 1)).all()
+        has_more = len(incidents) > limit
+        incidents = incidents[:limit]
+
+        participants = None
+        if requested is None or "participants" in requested:
+            participants = _participants_by_incident(
+                session, [i.id for i in incidents]
+            )
 
         return IncidentListResponse(
             total=total,
             limit=limit,
             offset=offset,
-            incidents=[_to_response(i, session) for i in incidents],
+            incidents=[
+                _to_response(
+                    i,
+                    participants[i.id] if participants is not None else None,
+                    requested,
+                )
+                for i in incidents
+            ],
+            next_cursor=_encode_cursor(incidents[-1]) if has_more else None,
         )
 
 
@@ -154,75 +396,24 @@ def get_incident(
                 status_code=http_status.HTTP_404_NOT_FOUND,
                 detail=f"Incident {incident_id} not found",
             )
-        return _to_response(incident, session)
+        participants = _participants_by_incident(session, [incident.id])
+        return _to_response(incident, participants[incident.id])
 
 
 @router.get("/metrics")
-def get_metrics(_: None = Depends(_api_key_check)) -> MetricsResponse:
-    final = _final_statuses()
-    now = datetime.now(tz=UTC)
-
-    with Session(engine) as session:
-        total: int = session.execute(
-            select(func.count(IncidentRecord.id))
-        ).scalar_one()
-
-        open_stmt = select(func.count(IncidentRecord.id))
-        if final:
-            open_stmt = open_stmt.where(IncidentRecord.status.not_in(final))
-        open_count: int = session.execute(open_stmt).scalar_one()
-
-        severity_rows = session.execute(
-            select(IncidentRecord.severity, func.count(IncidentRecord.id))
-            .group_by(IncidentRecord.severity)
-        ).all()
-        by_severity = {(row[0] or "unknown"): row[1] for row in severity_rows}
-
-        status_rows = session.execute(
-            select(IncidentRecord.status, func.count(IncidentRecord.id))
-            .group_by(IncidentRecord.status)
-        ).all()
-        by_status = {(row[0] or "unknown"): row[1] for row in status_rows}
-
-        # MTTR: average seconds from created_at to updated_at for resolved incidents.
-        # Uses updated_at as a proxy for resolution time (last write to a resolved
-        # record is the resolution event in the normal workflow).
-        mttr_hours: float | None = None
-        if final:
-            avg_seconds = session.execute(
-                select(
-                    func.avg(
-                        func.extract(
-                            "epoch",
-                            IncidentRecord.updated_at - IncidentRecord.created_at,
-                        )
-                    )
-                ).where(
-                    IncidentRecord.status.in_(final),
-                    IncidentRecord.updated_at.is_not(None),
-                )
-            ).scalar()
-            if avg_seconds is not None:
-                mttr_hours = round(float(avg_seconds) / 3600, 2)
-
-        last_7: int = session.execute(
-            select(func.count(IncidentRecord.id)).where(
-                IncidentRecord.created_at >= now - timedelta(days=7)
-            )
-        ).scalar_one()
-
-        last_30: int = session.execute(
-            select(func.count(IncidentRecord.id)).where(
-                IncidentRecord.created_at >= now - timedelta(days=30)
-            )
-        ).scalar_one()
-
-    return MetricsResponse(
-        total=total,
-        open=open_count,
-        by_severity=by_severity,
-        by_status=by_status,
-        mttr_hours=mttr_hours,
-        last_7_days=last_7,
-        last_30_days=last_30,
-    )
+def get_metrics(
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+    _: None = Depends(_api_key_check),
+) -> MetricsResponse:
+    metrics, etag = _metrics_cache.get(_compute_metrics)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={settings.API_METRICS_CACHE_SECONDS}",
+    }
+
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return metrics
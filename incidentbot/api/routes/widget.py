@@ -197,9 +197,8 @@ async def widget_update_incident_room(
                     )
 
                 display_name = adapter.get_user_display_name(body.user)
-                role_config = settings.roles.get(body.role)
                 participant = IncidentParticipant(
-                    is_lead=role_config.is_lead if role_config else False,
+                    is_lead=body.role in settings.lookups.lead_roles,
                     parent=incident.id,
                     role=body.role,
                     user_id=body.user,
@@ -260,10 +259,7 @@ async def widget_update_incident_room(
             case "set_status" | "resolve":
                 target_status = body.status
                 if body.action == "resolve":
-                    target_status = next(
-                        (name for name, cfg in settings.statuses.items() if cfg.final),
-                        "resolved",
-                    )
+                    target_status = settings.lookups.final_status or "resolved"
                 if not target_status:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
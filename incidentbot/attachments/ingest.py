@@ -0,0 +1,148 @@
+import threading
+
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from incidentbot.attachments.store import CHUNK_SIZE, get_attachment_store
+from incidentbot.configuration.settings import settings
+from incidentbot.exceptions import AttachmentTooLargeError
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+
+attachment_downloads = metrics.counter(
+    "incidentbot_attachment_downloads_total",
+    "Attachment downloads by result",
+    ("result",),
+)
+attachment_download_bytes = metrics.counter(
+    "incidentbot_attachment_download_bytes_total",
+    "Bytes streamed into the attachment store",
+)
+
+
+class AttachmentIngestor:
+    """
+    Downloads attachments into the attachment store off the caller's thread
+
+    Downloads are streamed in chunks straight into the store, which hashes
+    and de-duplicates as it writes, so an image is never held in memory in
+    full. One pooled HTTP session is shared by every download, and a small
+    thread pool keeps slow downloads off the Slack listener threads.
+    """
+
+    def __init__(self):
+        self._executor: ThreadPoolExecutor | None = None
+        self._session: requests.Session | None = None
+        self._lock = threading.Lock()
+
+    def _workers(self) -> int:
+        return settings.attachments.ingest_workers
+
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=self._workers(),
+                        pool_maxsize=self._workers(),
+                    )
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+
+        return self._session
+
+    def download(
+        self,
+        url: str,
+        headers: dict[str, str] | None = None,
+        params: dict[str, str] | None = None,
+    ) -> tuple[str, int]:
+        """
+        Stream a file into the attachment store
+
+        Returns the content key and size. Raises AttachmentTooLargeError once
+        the download passes attachments.max_size_mb, discarding what was
+        received so far.
+        """
+
+        limit = settings.attachments.max_size_mb * 1024 * 1024
+        timeout = settings.attachments.download_timeout_seconds
+
+        try:
+            with self.session().get(
+                url,
+                headers=headers,
+                params=params,
+                stream=True,
+                timeout=(timeout, timeout),
+            ) as response:
+                response.raise_for_status()
+
+                length = response.headers.get("content-length")
+                if length and length.isdigit() and int(length) > limit:
+                    raise AttachmentTooLargeError(
+                        f"attachment is {int(length)} bytes, over the {limit} byte limit"
+                    )
+
+                def chunks():
+                    received = 0
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        received += len(chunk)
+                        if received > limit:
+                            raise AttachmentTooLargeError(
+                                f"attachment exceeded the {limit} byte limit"
+                            )
+                        yield chunk
+
+                key, size = get_attachment_store().put_stream(chunks())
+        except AttachmentTooLargeError:
+            attachment_downloads.inc(result="too_large")
+            raise
+        except Exception:
+            attachment_downloads.inc(result="error")
+            raise
+
+        attachment_downloads.inc(result="ok")
+        attachment_download_bytes.inc(size)
+
+        return key, size
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run an ingestion job in the background
+        """
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers(),
+                        thread_name_prefix="attachment-ingest",
+                    )
+
+        def run():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as error:
+                logger.exception("attachment ingestion failed", error=error)
+                raise
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+attachment_ingestor = AttachmentIngestor()
@@ -0,0 +1,203 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from incidentbot.configuration.settings import settings
+from incidentbot.logging import logger
+
+CHUNK_SIZE = 64 * 1024
+
+
+class AttachmentStore:
+    """
+    Content-addressed storage for incident attachments such as pinned images
+
+    Attachments are keyed by the sha256 of their bytes, so storing the same
+    image twice keeps a single copy and rows only need to hold the key.
+    Backends implement the storage primitives below.
+    """
+
+    def put_stream(self, chunks: Iterable[bytes]) -> tuple[str, int]:
+        """
+        Store content from an iterable of chunks
+
+        Returns the content key and the number of bytes stored
+        """
+
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        """
+        Open stored content for reading
+        """
+
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str, idle_seconds: float = 0) -> bool:
+        """
+        Remove stored content unless it was stored or reused within the last
+        idle_seconds
+
+        Storing content that already exists counts as reusing it, so a caller
+        that found no row referring to the key does not remove content a
+        concurrent put has just handed to a row it is about to write. Returns
+        whether the content was removed.
+        """
+
+        raise NotImplementedError
+
+    def put(self, data: bytes) -> str:
+        """
+        Store content and return its key
+        """
+
+        key, _ = self.put_stream([data])
+
+        return key
+
+    def get(self, key: str) -> bytes:
+        """
+        Read stored content into memory
+        """
+
+        with self.open(key) as f:
+            return f.read()
+
+    def iter_chunks(self, key: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Stream stored content without loading all of it at once
+        """
+
+        with self.open(key) as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+
+class FilesystemAttachmentStore(AttachmentStore):
+    """
+    Stores attachments under a local directory, which may also be a mounted
+    network or object storage volume
+
+    Files are fanned out by key prefix (ab/cd/abcd...) to keep directories
+    small, and written through a temporary file so readers never see a
+    partial attachment. A file's mtime records when it was last stored or
+    reused, which is what delete checks against idle_seconds.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        if len(key) != 64 or not all(c in "0123456789abcdef" for c in key):
+            raise ValueError(f"invalid attachment key: {key!r}")
+
+        return self.root / key[:2] / key[2:4] / key
+
+    def put_stream(self, chunks: Iterable[bytes]) -> tuple[str, int]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+
+            key = digest.hexdigest()
+            path = self._path(key)
+            try:
+                # Already stored; identical content needs no second copy, but
+                # mark it as just reused so a concurrent delete keeps it
+                os.utime(path)
+            except FileNotFoundError:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_name, path)
+            else:
+                os.unlink(tmp_name)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        return key, size
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def delete(self, key: str, idle_seconds: float = 0) -> bool:
+        path = self._path(key)
+        aside = path.with_name(f".delete-{uuid.uuid4().hex}")
+        try:
+            if time.time() - path.stat().st_mtime < idle_seconds:
+                return False
+
+            # Move the file aside first: a put after this finds it missing and
+            # writes its own copy, while one that reused it just before shows
+            # up as a fresh mtime and the file is put back
+            os.replace(path, aside)
+        except FileNotFoundError:
+            return False
+
+        if time.time() - aside.stat().st_mtime < idle_seconds:
+            os.replace(aside, path)
+            return False
+
+        aside.unlink()
+
+        return True
+
+
+_store: AttachmentStore | None = None
+_store_lock = threading.Lock()
+
+
+def build_attachment_store() -> AttachmentStore:
+    """
+    Create the attachment store configured in settings.attachments
+    """
+
+    config = settings.attachments
+    match config.backend:
+        case "filesystem":
+            if not config.path:
+                raise ValueError(
+                    "attachments.path is not set: configure an absolute path "
+                    "on persistent storage for incident images"
+                )
+            return FilesystemAttachmentStore(config.path)
+
+    raise ValueError(f"unsupported attachment backend: {config.backend}")
+
+
+def get_attachment_store() -> AttachmentStore:
+    """
+    Return the process-wide attachment store, creating it on first use
+    """
+
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = build_attachment_store()
+                logger.info(
+                    "attachment store ready", backend=settings.attachments.backend
+                )
+
+    return _store
@@ -0,0 +1,81 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+
+class ConfigLookups(NamedTuple):
+    """
+    Read-only views of the configured statuses, severities and roles
+
+    Built once when settings load, so code that asks "is this status final?"
+    or "what does a new incident start as?" does not rescan the configuration
+    on every call. Every collection is immutable; statuses, severities and
+    roles keep the order they are configured in.
+    """
+
+    statuses: tuple[str, ...]
+    # Status a new incident starts in: the first marked initial, else the first
+    initial_status: str | None
+    # Status resolving an incident moves it to: the first marked final
+    final_status: str | None
+    final_statuses: frozenset[str]
+    open_statuses: tuple[str, ...]
+    severities: tuple[str, ...]
+    # Position of each severity in the configuration, most severe first
+    severity_rank: Mapping[str, int]
+    roles: tuple[str, ...]
+    lead_roles: frozenset[str]
+
+
+def build_lookups(
+    statuses: dict[str, Any] | None = None,
+    severities: dict[str, Any] | None = None,
+    roles: dict[str, Any] | None = None,
+) -> ConfigLookups:
+    """
+    Build the lookups for a configuration
+
+    Parameters:
+        statuses (dict[str, Any]): Status name to its definition
+        severities (dict[str, Any]): Severity name to its description
+        roles (dict[str, Any]): Role name to its definition
+    """
+
+    statuses = statuses or {}
+    severities = severities or {}
+    roles = roles or {}
+
+    status_names = tuple(statuses)
+    final = tuple(
+        name
+        for name, config in statuses.items()
+        if getattr(config, "final", False)
+    )
+    initial = next(
+        (
+            name
+            for name, config in statuses.items()
+            if getattr(config, "initial", False)
+        ),
+        status_names[0] if status_names else None,
+    )
+
+    return ConfigLookups(
+        statuses=status_names,
+        initial_status=initial,
+        final_status=final[0] if final else None,
+        final_statuses=frozenset(final),
+        open_statuses=tuple(
+            name for name in status_names if name not in final
+        ),
+        severities=tuple(severities),
+        severity_rank=MappingProxyType(
+            {name: rank for rank, name in enumerate(severities)}
+        ),
+        roles=tuple(roles),
+        lead_roles=frozenset(
+            name
+            for name, config in roles.items()
+            if getattr(config, "is_lead", False)
+        ),
+    )
@@ -3,6 +3,8 @@ Config schema models — Pydantic BaseModel classes that define the shape of
 config.yaml. Imported by settings.py to build the root Settings class.
 """
 
+import os
+
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field, field_validator, model_validator
@@ -22,6 +24,9 @@ class ScrapeForAgingIncidentsJob(BaseModel):
 class SlackCacheJob(BaseModel):
     enabled: bool = True
     interval_minutes: int = 15
+    reconcile_interval_hours: int = 24
+    # How often every replica reads back cache rows written by the others
+    refresh_seconds: int = 60
 
 
 class PagerDutyOCJob(BaseModel):
@@ -29,12 +34,28 @@ class PagerDutyOCJob(BaseModel):
     interval_minutes: int = 30
 
 
+class ReminderSweepJob(BaseModel):
+    interval_seconds: int = 30
+    # What to do on startup with reminders that fell due while the bot was
+    # down: send them on the first sweep, or move them on to their next interval
+    catch_up: Literal["fire", "skip"] = "fire"
+
+
+class LeaderElection(BaseModel):
+    enabled: bool = True
+    # A node that stops renewing loses the lease after this long
+    lease_seconds: int = 30
+    renew_seconds: int = 10
+
+
 class Jobs(BaseModel):
     scrape_for_aging_incidents: ScrapeForAgingIncidentsJob = Field(
         default_factory=ScrapeForAgingIncidentsJob
     )
     update_slack_cache: SlackCacheJob = Field(default_factory=SlackCacheJob)
     update_pagerduty_oc_data: PagerDutyOCJob = Field(default_factory=PagerDutyOCJob)
+    sweep_reminders: ReminderSweepJob = Field(default_factory=ReminderSweepJob)
+    leader_election: LeaderElection = Field(default_factory=LeaderElection)
 
 
 # ── Reminders ─────────────────────────────────────────────────────────────────
@@ -113,6 +134,30 @@ class Options(BaseModel):
     updates_in_threads: bool | None = False
 
 
+# ── Attachments ───────────────────────────────────────────────────────────────
+
+
+class Attachments(BaseModel):
+    backend: Literal["filesystem"] = "filesystem"
+    download_timeout_seconds: int = 30
+    ingest_workers: int = 4
+    max_size_mb: int = 25
+    # Must be set, and absolute, so images land on storage that outlives the
+    # container rather than wherever the process happens to run
+    path: str | None = None
+    # Images no event refers to are only removed once they have not been
+    # stored or reused for this long, so a pin of the same image racing the
+    # removal keeps its copy
+    release_after_seconds: int = 3600
+
+    @field_validator("path")
+    @classmethod
+    def _path_is_absolute(cls, v: str | None) -> str | None:
+        if v is not None and not os.path.isabs(v):
+            raise ValueError(f"attachments.path must be an absolute path, got {v!r}")
+        return v
+
+
 # ── Integrations ──────────────────────────────────────────────────────────────
 
 
@@ -183,6 +228,9 @@ class PhareIntegration(BaseModel):
 
 class PagerDutyIntegration(BaseModel):
     enabled: bool = False
+    escalation_policy_cache_minutes: int = 60
+    max_connections: int = 10
+    max_rate_limit_retries: int = 3
 
 
 class ZoomIntegration(BaseModel):
@@ -201,6 +249,30 @@ class Integrations(BaseModel):
 # ── Platform ──────────────────────────────────────────────────────────────────
 
 
+SLACK_LISTENER_KINDS = ("action", "command", "event", "options", "shortcut", "view")
+
+
+class SlackSettings(BaseModel):
+    handler_mode: Literal["sync", "async"] = "sync"
+    handler_workers: int = 16
+    handler_concurrency: dict[str, int] = {}
+    default_handler_concurrency: int = 8
+    # Roles panel and digest message edits made within this many seconds of
+    # each other are sent as one chat.update; 0 sends every edit right away
+    message_update_window_seconds: float = 2.0
+    message_update_max_delay_seconds: float = 10.0
+
+    @field_validator("handler_concurrency")
+    @classmethod
+    def _known_listener_kinds(cls, v: dict[str, int]) -> dict[str, int]:
+        unknown = set(v) - set(SLACK_LISTENER_KINDS)
+        if unknown:
+            raise ValueError(
+                f"unknown listener types in handler_concurrency: {sorted(unknown)}"
+            )
+        return v
+
+
 class MatrixSettings(BaseModel):
     homeserver: str
     user_id: str
@@ -2,7 +2,7 @@ import os
 import secrets
 from typing import Literal
 
-from pydantic import computed_field, Field, model_validator
+from pydantic import computed_field, Field, model_validator, PrivateAttr
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
@@ -11,7 +11,9 @@ from pydantic_settings import (
 )
 from typing import Self
 
+from incidentbot.configuration.lookups import build_lookups, ConfigLookups
 from incidentbot.configuration.schema import (
+    Attachments,
     Automation,
     Integrations,
     Jobs,
@@ -22,6 +24,7 @@ from incidentbot.configuration.schema import (
     ReminderAction,
     Conditions,
     RoleDefinition,
+    SlackSettings,
     StatusDefinition,
 )
 
@@ -56,6 +59,7 @@ _DEFAULT_REMINDERS: list[Reminder] = [
 class Settings(BaseSettings):
     # ── YAML config fields ────────────────────────────────────────────────────
 
+    attachments: Attachments = Field(default_factory=Attachments)
     digest_channel: str = "incidents"
     enable_pinned_images: bool = True
     icons: dict[str, dict[str, str]] = {
@@ -105,6 +109,7 @@ class Settings(BaseSettings):
         "sev3": "This signifies a minor production scenario that may or may not result in degradation. This situation is worth coordination to resolve quickly but does not indicate a critical loss of service for users.",
         "sev4": "This signifies an ongoing investigation. This incident has not been promoted to SEV3 yet, indicating there may be little to no impact, but the situation warrants a closer look. This is diagnostic in nature. This is the default setting for a new incident.",
     }
+    slack: SlackSettings = Field(default_factory=SlackSettings)
     statuses: dict[str, StatusDefinition] = {
         "investigating": {"initial": True},
         "identified": {},
@@ -127,6 +132,15 @@ class Settings(BaseSettings):
     def DATABASE_URI(self) -> str:
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
 
+    DATABASE_ECHO: bool = False
+    DATABASE_ECHO_POOL: bool = False
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_POOL_RECYCLE_SECONDS: int = 1800
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_POOL_TIMEOUT_SECONDS: int = 30
+    DATABASE_STATEMENT_TIMEOUT_MS: int | None = None
+
     ATLASSIAN_API_URL: str | None = None
     ATLASSIAN_API_USERNAME: str | None = None
     ATLASSIAN_API_TOKEN: str | None = None
@@ -159,13 +173,22 @@ class Settings(BaseSettings):
     GITLAB_API_TOKEN: str | None = None
 
     API_KEY: str | None = None
+    API_METRICS_CACHE_SECONDS: int = 15
     ENABLE_API_DOCS: bool = False
+    ENABLE_PROMETHEUS_METRICS: bool = False
 
     IS_MIGRATION: bool | None = False
     IS_TEST_ENVIRONMENT: bool | None = False
 
     LOG_LEVEL: str = "INFO"
 
+    SCHEDULER_NODE_ID: str | None = None
+
+    TRACING_OTLP_ENDPOINT: str | None = None
+    TRACING_SERVICE_NAME: str = "incidentbot"
+
+    _lookups: ConfigLookups = PrivateAttr()
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_ignore_empty=True,
@@ -323,6 +346,24 @@ class Settings(BaseSettings):
 
         return self
 
+    @model_validator(mode="after")
+    def _build_lookups(self) -> Self:
+        self._lookups = build_lookups(
+            statuses=self.statuses,
+            severities=self.severities,
+            roles=self.roles,
+        )
+
+        return self
+
+    @property
+    def lookups(self) -> ConfigLookups:
+        """
+        Precomputed views of statuses, severities and roles
+        """
+
+        return self._lookups
+
     @classmethod
     def settings_customise_sources(
         cls,
@@ -4,8 +4,9 @@ import uuid
 from incidentbot.configuration.settings import settings
 from incidentbot.confluence.api import ConfluenceApi
 from incidentbot.exceptions import PostmortemException
+from incidentbot.incident.event import EventLogHandler
 from incidentbot.models.database import (
-    IncidentEvent,
+    IncidentEventBase,
     IncidentParticipant,
     IncidentRecord,
 )
@@ -18,7 +19,7 @@ class IncidentPostmortem:
         self,
         incident: IncidentRecord,
         participants: list[IncidentParticipant],
-        timeline: list[IncidentEvent],
+        timeline: list[IncidentEventBase],
         title: str,
     ):
         self.parent_page = settings.integrations.atlassian.confluence.parent
@@ -177,12 +178,12 @@ class IncidentPostmortem:
         base = f'<table data-table-width="760" data-layout="default" ac:local-id="{str(uuid.uuid4())}"><tbody><tr><th><p><strong>Timestamp</strong></p></th><th><p><strong>Event</strong></p></th></tr>'
         all_items_formatted = ""
         for item in self.timeline:
-            if item.image is not None:
+            if item.image_hash is not None:
                 try:
                     # Attach content to document
                     self.exec.attach_content(
                         comment=item.title,
-                        content=item.image,
+                        content=EventLogHandler.read_image(item.id),
                         content_type=item.mimetype,
                         name=item.title,
                         page_id=created_page_id,
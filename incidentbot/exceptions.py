@@ -22,3 +22,16 @@ class PostmortemException(Exception):
     def __init__(self, message: str) -> None:
         self.message = message
         super().__init__(self.message)
+
+
+class AttachmentTooLargeError(Exception):
+    """
+    Exception raised when a downloaded attachment exceeds the size limit
+
+    Parameters:
+        message (str): explanation of the error
+    """
+
+    def __init__(self, message: str) -> None:
+        self.message = message
+        super().__init__(self.message)
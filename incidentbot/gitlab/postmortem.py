@@ -5,8 +5,9 @@ import re
 from incidentbot.configuration.settings import settings
 from incidentbot.gitlab.api import GitLabApi
 from incidentbot.exceptions import PostmortemException
+from incidentbot.incident.event import EventLogHandler
 from incidentbot.models.database import (
-    IncidentEvent,
+    IncidentEventBase,
     IncidentParticipant,
     IncidentRecord,
 )
@@ -25,7 +26,7 @@ class IncidentPostmortem:
         self,
         incident: IncidentRecord,
         participants: list[IncidentParticipant],
-        timeline: list[IncidentEvent],
+        timeline: list[IncidentEventBase],
         title: str,
     ):
         self.incident = incident
@@ -181,7 +182,7 @@ class IncidentPostmortem:
         for event in self.timeline:
             timestamp = event.created_at.strftime("%Y-%m-%d %H:%M:%S")
 
-            if event.image is not None and event.title in image_references:
+            if event.image_hash is not None and event.title in image_references:
                 # Use the markdown reference from uploaded image
                 markdown_ref = image_references[event.title]
                 rows.append(f"| {timestamp} | {markdown_ref} |")
@@ -203,13 +204,19 @@ class IncidentPostmortem:
         proj_id = proj.id
 
         for event in self.timeline:
-            if event.image is None:
+            if event.image_hash is None:
                 continue
 
             filename = self._sanitize_filename(event.title)
 
             try:
-                files = {"file": (filename, event.image, event.mimetype)}
+                files = {
+                    "file": (
+                        filename,
+                        EventLogHandler.read_image(event.id),
+                        event.mimetype,
+                    )
+                }
 
                 response = self.gitlab_api.api.http_post(
                     f"/projects/{proj_id}/uploads", files=files
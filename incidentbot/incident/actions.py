@@ -1,9 +1,9 @@
 import datetime
 import re
 
-import requests
+from incidentbot.attachments.ingest import attachment_ingestor
 from incidentbot.configuration.settings import settings
-from incidentbot.exceptions import IndexNotFoundError
+from incidentbot.exceptions import AttachmentTooLargeError, IndexNotFoundError
 from incidentbot.incident.automations import run as run_automations
 from incidentbot.incident.core import format_channel_name
 from incidentbot.incident.event import EventLogHandler
@@ -18,19 +18,22 @@ from incidentbot.slack.client import (
     get_slack_user,
     slack_web_client,
 )
+from incidentbot.slack.directory import channel_directory
 from incidentbot.slack.messages import (
     BlockBuilder,
     IncidentChannelDigestNotification,
     IncidentUpdate,
 )
+from incidentbot.slack.updates import message_updates
 from incidentbot.util import gen
+from incidentbot.util.tracing import set_incident, span, traced
 from slack_sdk.errors import SlackApiError
 from sqlmodel import Session, select
 
 err_msg = ":robot_face::heart_on_fire: I've run into a problem processing commands for this incident: I cannot find it in the database. Let an administrator know about this error."
 
 
-def _refresh_roles_panel(channel_id: str) -> None:
+def _update_roles_panel(channel_id: str) -> None:
     """
     Update the live roles panel message in the incident channel.
 
@@ -38,37 +41,82 @@ def _refresh_roles_panel(channel_id: str) -> None:
     block payload with current participant data, and calls chat_update.
     Silently no-ops if no panel TS is found (e.g. older incidents or Matrix).
     """
-    try:
-        with Session(engine) as session:
-            entry = session.exec(
-                select(ApplicationData).filter(
-                    ApplicationData.name == f"role_panel_{channel_id}"
-                )
-            ).first()
+    with Session(engine) as session:
+        entry = session.exec(
+            select(ApplicationData).filter(
+                ApplicationData.name == f"role_panel_{channel_id}"
+            )
+        ).first()
 
-        if not entry or not entry.json_data:
-            return
+    if not entry or not entry.json_data:
+        return
 
-        ts = entry.json_data.get("ts")
-        if not ts:
-            return
+    ts = entry.json_data.get("ts")
+    if not ts:
+        return
 
-        incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
-        if not incident:
-            return
+    incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
+    if not incident:
+        return
 
-        participants = IncidentDatabaseInterface.list_participants(incident=incident)
+    participants = IncidentDatabaseInterface.list_participants(incident=incident)
 
-        slack_web_client.chat_update(
-            channel=channel_id,
-            ts=ts,
-            blocks=BlockBuilder.roles_panel(
-                incident=incident, participants=participants
-            ),
-            text="Role assignments for this incident.",
-        )
-    except Exception as error:
-        logger.exception("error refreshing roles panel", channel_id=channel_id, error=error)
+    slack_web_client.chat_update(
+        channel=channel_id,
+        ts=ts,
+        blocks=BlockBuilder.roles_panel(
+            incident=incident, participants=participants
+        ),
+        text="Role assignments for this incident.",
+    )
+
+
+def _refresh_roles_panel(channel_id: str) -> None:
+    """
+    Queue a roles panel update; role changes made in quick succession are
+    sent as one edit with the latest assignments
+    """
+    message_updates.submit(
+        "roles_panel", channel_id, lambda: _update_roles_panel(channel_id)
+    )
+
+
+def _update_digest(channel_id: str) -> None:
+    """
+    Rebuild the digest message for an incident from its stored state,
+    including the postmortem link if one exists
+    """
+    incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
+    if not incident or not incident.digest_message_ts:
+        return
+
+    slack_web_client.chat_update(
+        channel=get_digest_channel_id(),
+        ts=incident.digest_message_ts,
+        blocks=IncidentChannelDigestNotification.update(
+            channel_id=incident.channel_id,
+            has_private_channel=incident.has_private_channel,
+            incident_components=incident.components,
+            incident_description=incident.description,
+            incident_impact=incident.impact,
+            incident_slug=incident.slug,
+            meeting_link=incident.meeting_link,
+            severity=incident.severity,
+            status=incident.status,
+            postmortem_link=_get_existing_postmortem_link(incident.id),
+        ),
+        text="The digest message has been updated.",
+    )
+
+
+def _refresh_digest(channel_id: str) -> None:
+    """
+    Queue a digest message update; call after the change has been written
+    to the database, since the update is built from the stored incident
+    """
+    message_updates.submit(
+        "digest", channel_id, lambda: _update_digest(channel_id)
+    )
 
 
 def _get_channel_topic(channel_id: str) -> list[str]:
@@ -83,13 +131,8 @@ def _get_channel_topic(channel_id: str) -> list[str]:
     ]
 
 
-def _get_final_statuses() -> set[str]:
-    statuses = settings.statuses or {}
-    return {
-        status_name
-        for status_name, config in statuses.items()
-        if getattr(config, "final", False)
-    }
+def _get_final_statuses() -> frozenset[str]:
+    return settings.lookups.final_statuses
 
 
 def _is_final_status(status: str) -> bool:
@@ -146,46 +189,19 @@ def _extract_confluence_page_id(postmortem_link: str) -> str | None:
     return None
 
 
-def _load_workspace_records(record_name: str) -> list[dict]:
-    try:
-        with Session(engine) as session:
-            record = session.exec(
-                select(ApplicationData).filter(ApplicationData.name == record_name)
-            ).first()
-            if record and isinstance(record.json_data, list):
-                return record.json_data
-    except Exception as error:
-        logger.exception(
-            "error loading workspace record for pinned-content parsing", record_name=record_name, error=error
-        )
-    return []
-
-
 def _parse_pinned_message_content(message: str) -> str:
     channel_pattern = r"<#([A-Z0-9]+)\|?.*?>"
     username_pattern = r"<@([A-Z0-9]+)>"
 
-    channels = _load_workspace_records("slack_channels")
-    users = _load_workspace_records("slack_users")
-    channel_lookup = {
-        item.get("id"): item.get("name")
-        for item in channels
-        if item.get("id") and item.get("name")
-    }
-    user_lookup = {
-        item.get("id"): item.get("real_name")
-        for item in users
-        if item.get("id") and item.get("real_name")
-    }
-
     def replace_channel(match: re.Match) -> str:
-        channel_id = match.group(1)
-        name = channel_lookup.get(channel_id)
+        channel = channel_directory.get(match.group(1))
+        name = channel.get("name") if channel else None
         return f"#{name}" if name else match.group(0)
 
     def replace_user(match: re.Match) -> str:
         user_id = match.group(1)
-        real_name = user_lookup.get(user_id)
+        user = get_slack_user(user_id)
+        real_name = user.get("real_name") if user else None
         return f"@{real_name}" if real_name else match.group(0)
 
     message = re.sub(channel_pattern, replace_channel, message)
@@ -197,13 +213,13 @@ def _parse_pinned_message_content(message: str) -> str:
 
 def _build_existing_pin_event_keys(incident) -> set[tuple[str, str, str, str]]:
     keys = set()
-    timeline = EventLogHandler.read(incident_id=incident.id) or []
+    timeline = EventLogHandler.read_summary(incident_id=incident.id) or []
 
     for item in timeline:
         if item.source != "pin":
             continue
         message_ts = item.message_ts or ""
-        if item.image is not None:
+        if item.image_hash is not None:
             keys.add(("image", message_ts, item.title or "", item.mimetype or ""))
         else:
             keys.add(("text", message_ts, item.text or "", ""))
@@ -246,14 +262,20 @@ def _resolve_pinned_event_user(message: dict) -> str:
     return "NotAvailable"
 
 
-def _download_pinned_image(file: dict) -> bytes | None:
+def store_pinned_image(file: dict) -> tuple[str, int]:
+    """
+    Stream a pinned Slack file into the attachment store
+
+    Temporarily shares the file publicly when needed so it can be fetched,
+    and revokes that again afterwards. Returns the attachment key and size.
+    """
+
     file_id = file.get("id")
     file_name = file.get("name") or file.get("title") or "unknown"
     url_private = file.get("url_private")
 
     if not file_id or not url_private:
-        logger.error("pinned file is missing required metadata", file_name=file_name)
-        return None
+        raise ValueError(f"pinned file {file_name} is missing required metadata")
 
     made_public = False
     if not file.get("public_url_shared") and getattr(settings, "SLACK_USER_TOKEN", None):
@@ -274,17 +296,11 @@ def _download_pinned_image(file: dict) -> bytes | None:
             if len(parts) > 3:
                 params = {"pub_secret": parts[3]}
 
-        response = requests.get(
+        return attachment_ingestor.download(
             url_private,
             headers={"Authorization": f"Bearer {settings.SLACK_BOT_TOKEN}"},
             params=params,
-            timeout=30,
         )
-        response.raise_for_status()
-        return response.content
-    except Exception as error:
-        logger.exception("error downloading pinned file", file_name=file_name, error=error)
-        return None
     finally:
         if made_public:
             try:
@@ -298,6 +314,68 @@ def _download_pinned_image(file: dict) -> bytes | None:
                 )
 
 
+def _download_pinned_image(file: dict) -> tuple[str, int] | None:
+    try:
+        return store_pinned_image(file)
+    except Exception as error:
+        file_name = file.get("name") or file.get("title") or "unknown"
+        logger.exception("error downloading pinned file", file_name=file_name, error=error)
+        return None
+
+
+def ingest_pinned_image(incident, message: dict, file: dict, channel_id: str) -> bool:
+    """
+    Store a pinned image and add it to the incident timeline
+
+    Meant to run on the attachment ingestor's threads; the outcome is
+    reported back to the channel with a reaction on success or a message
+    explaining the failure.
+    """
+
+    try:
+        image_hash, image_size = store_pinned_image(file)
+    except AttachmentTooLargeError:
+        reason = f"That image is larger than the {settings.attachments.max_size_mb} MB limit."
+    except Exception as error:
+        logger.exception("error ingesting pinned image", file_name=file.get("name"), error=error)
+        # Details stay in the logs; the channel only needs to know it failed
+        reason = "Something went wrong while storing it, please try again."
+    else:
+        EventLogHandler.create(
+            image_hash=image_hash,
+            image_size=image_size,
+            incident_id=incident.id,
+            incident_slug=incident.slug,
+            message_ts=message["ts"],
+            mimetype=file["mimetype"],
+            title=file["name"],
+            source="pin",
+            user=_resolve_pinned_event_user(message),
+        )
+
+        try:
+            slack_web_client.reactions_add(
+                channel=channel_id,
+                name="white_check_mark",
+                timestamp=message["ts"],
+            )
+        except SlackApiError as error:
+            if "already_reacted" not in str(error):
+                logger.exception("error reacting to pinned image", error=error)
+
+        return True
+
+    try:
+        slack_web_client.chat_postMessage(
+            channel=channel_id,
+            text=f":wave: I was unable to pin that image. {reason}",
+        )
+    except SlackApiError as error:
+        logger.exception("error reporting pinned image failure", error=error)
+
+    return False
+
+
 def _upsert_pinned_message_event(
     incident,
     message: dict,
@@ -328,12 +406,14 @@ def _upsert_pinned_message_event(
             if key in existing_keys:
                 continue
 
-            content = _download_pinned_image(file)
-            if content is None:
+            stored = _download_pinned_image(file)
+            if stored is None:
                 continue
 
+            image_hash, image_size = stored
             EventLogHandler.create(
-                image=content,
+                image_hash=image_hash,
+                image_size=image_size,
                 incident_id=incident.id,
                 incident_slug=incident.slug,
                 message_ts=message_ts,
@@ -492,12 +572,13 @@ def _create_confluence_postmortem(
     from incidentbot.confluence.postmortem import IncidentPostmortem
 
     try:
-        return IncidentPostmortem(
-            incident=incident,
-            participants=participants,
-            timeline=timeline,
-            title=title,
-        ).create()
+        with span("confluence", "create_postmortem"):
+            return IncidentPostmortem(
+                incident=incident,
+                participants=participants,
+                timeline=timeline,
+                title=title,
+            ).create()
     except Exception as error:
         logger.exception("error creating confluence postmortem", error=error)
         return None
@@ -516,12 +597,13 @@ def _create_gitlab_postmortem(
     from incidentbot.gitlab.postmortem import IncidentPostmortem
 
     try:
-        return IncidentPostmortem(
-            incident=incident,
-            participants=participants,
-            timeline=timeline,
-            title=title,
-        ).create()
+        with span("gitlab", "create_postmortem"):
+            return IncidentPostmortem(
+                incident=incident,
+                participants=participants,
+                timeline=timeline,
+                title=title,
+            ).create()
     except Exception as error:
         logger.exception("error creating gitlab postmortem", error=error)
         return None
@@ -529,7 +611,7 @@ def _create_gitlab_postmortem(
 
 def _create_new_postmortem(incident) -> str | None:
     participants = IncidentDatabaseInterface.list_participants(incident=incident)
-    timeline = EventLogHandler.read(incident_id=incident.id)
+    timeline = EventLogHandler.read_summary(incident_id=incident.id)
     title = _build_postmortem_title(incident)
 
     providers = (
@@ -588,7 +670,7 @@ def _sync_confluence_postmortem(incident, postmortem_link: str) -> bool:
     from incidentbot.confluence.postmortem import IncidentPostmortem
 
     participants = IncidentDatabaseInterface.list_participants(incident=incident)
-    timeline = EventLogHandler.read(incident_id=incident.id)
+    timeline = EventLogHandler.read_summary(incident_id=incident.id)
 
     postmortem = IncidentPostmortem(
         incident=incident,
@@ -597,7 +679,8 @@ def _sync_confluence_postmortem(incident, postmortem_link: str) -> bool:
         title=_build_postmortem_title(incident),
     )
 
-    return postmortem.sync(page_id=page_id)
+    with span("confluence", "sync_postmortem"):
+        return postmortem.sync(page_id=page_id)
 
 
 def _send_postmortem_message(channel_id: str, postmortem_link: str) -> None:
@@ -639,35 +722,16 @@ def _send_postmortem_message(channel_id: str, postmortem_link: str) -> None:
     except SlackApiError as error:
         logger.exception("error posting postmortem message", channel_id=channel_id, error=error)
 
-    try:
-        slack_web_client.chat_update(
-            channel=get_digest_channel_id(),
-            ts=incident.digest_message_ts,
-            blocks=IncidentChannelDigestNotification.update(
-                channel_id=incident.channel_id,
-                has_private_channel=incident.has_private_channel,
-                incident_components=incident.components,
-                incident_description=incident.description,
-                incident_impact=incident.impact,
-                incident_slug=incident.slug,
-                meeting_link=incident.meeting_link,
-                severity=incident.severity,
-                status=incident.status,
-                postmortem_link=postmortem_link,
-            ),
-            text="The digest message has been updated.",
-        )
-    except SlackApiError as error:
-        logger.exception(
-            "error updating digest with postmortem link", channel=incident.channel_name, error=error
-        )
+    _refresh_digest(channel_id)
 
 
+@traced("incident")
 async def generate_postmortem(channel_id: str) -> str | None:
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
     if not incident:
         slack_web_client.chat_postMessage(channel=channel_id, text=err_msg)
         return None
+    set_incident(incident.slug)
 
     backfill_result = _backfill_pinned_content_from_channel(incident)
     if backfill_result["events_created"] > 0:
@@ -689,37 +753,18 @@ async def generate_postmortem(channel_id: str) -> str | None:
         )
         return None
 
-    try:
-        slack_web_client.chat_update(
-            channel=get_digest_channel_id(),
-            ts=incident.digest_message_ts,
-            blocks=IncidentChannelDigestNotification.update(
-                channel_id=incident.channel_id,
-                has_private_channel=incident.has_private_channel,
-                incident_components=incident.components,
-                incident_description=incident.description,
-                incident_impact=incident.impact,
-                incident_slug=incident.slug,
-                meeting_link=incident.meeting_link,
-                severity=incident.severity,
-                status=incident.status,
-                postmortem_link=postmortem_link,
-            ),
-            text="The digest message has been updated.",
-        )
-    except SlackApiError as error:
-        logger.exception(
-            "error sending postmortem update to digest", channel=incident.channel_name, error=error
-        )
+    _refresh_digest(channel_id)
 
     return postmortem_link
 
 
+@traced("incident")
 async def sync_postmortem(channel_id: str) -> bool:
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
     if not incident:
         slack_web_client.chat_postMessage(channel=channel_id, text=err_msg)
         return False
+    set_incident(incident.slug)
 
     postmortem_link = _get_existing_postmortem_link(incident.id)
     if not postmortem_link:
@@ -890,10 +935,8 @@ async def join_incident_as_role(
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
 
     # Verify the role is valid
-    try:
-        role_definition = settings.roles.get(role)
-    except Exception:
-        logger.exception("role is not valid", role=role)
+    if role not in settings.lookups.roles:
+        logger.error("role is not valid", role=role)
         return
 
     if incident:
@@ -947,7 +990,7 @@ async def join_incident_as_role(
             )
 
         # Update topic if lead role
-        if role_definition.is_lead:
+        if role in settings.lookups.lead_roles:
             try:
                 current_topic = _get_channel_topic(incident.channel_id)
                 slack_web_client.conversations_setTopic(
@@ -960,7 +1003,7 @@ async def join_incident_as_role(
         # Create record
         IncidentDatabaseInterface.associate_role(
             incident=incident,
-            is_lead=role_definition.is_lead,
+            is_lead=role in settings.lookups.lead_roles,
             role=role,
             user=user,
         )
@@ -997,10 +1040,8 @@ async def leave_incident_as_role(
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
 
     # Verify the role is valid
-    try:
-        role_definition = settings.roles.get(role)
-    except Exception:
-        logger.exception("role is not valid", role=role)
+    if role not in settings.lookups.roles:
+        logger.error("role is not valid", role=role)
         return
 
     if incident:
@@ -1046,7 +1087,7 @@ async def leave_incident_as_role(
             )
 
         # Update topic if lead role
-        if role_definition.is_lead:
+        if role in settings.lookups.lead_roles:
             try:
                 current_topic = _get_channel_topic(incident.channel_id)
                 slack_web_client.conversations_setTopic(
@@ -1080,6 +1121,7 @@ async def leave_incident_as_role(
         )
 
 
+@traced("incident")
 async def set_description(channel_id: str, description: str, user: str = None):
     """
     Parameters:
@@ -1090,29 +1132,7 @@ async def set_description(channel_id: str, description: str, user: str = None):
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
 
     if incident:
-        # Update digest message
-        try:
-            slack_web_client.chat_update(
-                channel=get_digest_channel_id(),
-                ts=incident.digest_message_ts,
-                blocks=IncidentChannelDigestNotification.update(
-                    channel_id=incident.channel_id,
-                    has_private_channel=incident.has_private_channel,
-                    incident_components=incident.components,
-                    incident_description=description,
-                    incident_impact=incident.impact,
-                    incident_slug=incident.slug,
-                    meeting_link=incident.meeting_link,
-                    severity=incident.severity,
-                    status=incident.status,
-                ),
-                text="Digest message has been updated.",
-            )
-        except SlackApiError as error:
-            logger.exception(
-                "error during description update for incident channel", channel=incident.channel_name, error=error
-            )
-            return
+        set_incident(incident.slug)
 
         # Update boilerplate message
         result = slack_web_client.conversations_history(
@@ -1178,6 +1198,9 @@ async def set_description(channel_id: str, description: str, user: str = None):
         except Exception as error:
             logger.exception("error updating entry in database", error=error)
 
+        # Update digest message
+        _refresh_digest(incident.channel_id)
+
         # Write event log
         EventLogHandler.create(
             event=f"The incident description was updated to {notification_suffix}",
@@ -1196,6 +1219,7 @@ async def set_description(channel_id: str, description: str, user: str = None):
         )
 
 
+@traced("incident")
 async def set_severity(channel_id: str, severity: str, user: User | str):
     """
     Parameters:
@@ -1207,6 +1231,8 @@ async def set_severity(channel_id: str, severity: str, user: User | str):
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
 
     if incident:
+        set_incident(incident.slug)
+
         if user != "api" and incident.severity == severity:
                 try:
                     slack_web_client.chat_postEphemeral(
@@ -1231,36 +1257,14 @@ async def set_severity(channel_id: str, severity: str, user: User | str):
             from incidentbot.gitlab.api import GitLabApi
 
             gitlab = GitLabApi()
-            gitlab.update_issue_severity(
-                incident_name=incident.channel_name, incident_severity=severity
-            )
+            with span("gitlab", "update_issue_severity"):
+                gitlab.update_issue_severity(
+                    incident_name=incident.channel_name, incident_severity=severity
+                )
             logger.info(
                 "updated gitlab issue severity", channel=incident.channel_name, severity=severity
             )
 
-        # Update digest message
-        try:
-            slack_web_client.chat_update(
-                channel=get_digest_channel_id(),
-                ts=incident.digest_message_ts,
-                blocks=IncidentChannelDigestNotification.update(
-                    channel_id=incident.channel_id,
-                    has_private_channel=incident.has_private_channel,
-                    incident_components=incident.components,
-                    incident_description=incident.description,
-                    incident_impact=incident.impact,
-                    incident_slug=incident.slug,
-                    meeting_link=incident.meeting_link,
-                    severity=severity,
-                    status=incident.status,
-                ),
-                text="Digest message has been updated.",
-            )
-        except SlackApiError as error:
-            logger.exception(
-                "error sending severity update to incident channel", channel=incident.channel_name, error=error
-            )
-
         # Channel notification
         try:
             result = slack_web_client.chat_postMessage(
@@ -1302,6 +1306,9 @@ async def set_severity(channel_id: str, severity: str, user: User | str):
         except Exception as error:
             logger.exception("error updating entry in database", error=error)
 
+        # Update digest message
+        _refresh_digest(incident.channel_id)
+
         # Write event log
         EventLogHandler.create(
             event=f"The incident severity was changed to {severity.upper()}",
@@ -1318,6 +1325,7 @@ async def set_severity(channel_id: str, severity: str, user: User | str):
         )
 
 
+@traced("incident")
 async def set_status(
     channel_id: str,
     status: str,
@@ -1333,6 +1341,8 @@ async def set_status(
     incident = IncidentDatabaseInterface.get_one(channel_id=channel_id)
 
     if incident:
+        set_incident(incident.slug)
+
         if user != "api" and incident.status == status:
                 try:
                     slack_web_client.chat_postEphemeral(
@@ -1349,12 +1359,7 @@ async def set_status(
 
         postmortem_link = None
 
-        final_statuses = [
-            status
-            for status, config in settings.statuses.items()
-            if config.final
-        ]
-        if final_statuses and status == final_statuses[0]:
+        if status == settings.lookups.final_status:
             # First, make sure a postmortem doesn't already exist
             if not IncidentDatabaseInterface.get_postmortem(
                 parent=incident.id,
@@ -1377,10 +1382,11 @@ async def set_status(
                         participants=IncidentDatabaseInterface.list_participants(
                             incident=incident
                         ),
-                        timeline=EventLogHandler.read(incident_id=incident.id),
+                        timeline=EventLogHandler.read_summary(incident_id=incident.id),
                         title=f"{datetime.datetime.today().strftime('%Y-%m-%d')} - {incident.slug.upper()} - {incident.description}",
                     )
-                    postmortem_link = postmortem.create()
+                    with span("confluence", "create_postmortem"):
+                        postmortem_link = postmortem.create()
 
                     if postmortem_link:
                         IncidentDatabaseInterface.add_postmortem(
@@ -1411,10 +1417,11 @@ async def set_status(
                         participants=IncidentDatabaseInterface.list_participants(
                             incident=incident
                         ),
-                        timeline=EventLogHandler.read(incident_id=incident.id),
+                        timeline=EventLogHandler.read_summary(incident_id=incident.id),
                         title=f"{datetime.datetime.today().strftime('%Y-%m-%d')} - {incident.slug.upper()} - {incident.description}",
                     )
-                    postmortem_link = postmortem.create()
+                    with span("gitlab", "create_postmortem"):
+                        postmortem_link = postmortem.create()
 
                     if postmortem_link:
                         IncidentDatabaseInterface.add_postmortem(
@@ -1450,30 +1457,6 @@ async def set_status(
                                 "error resolving pagerduty incident", url=inc.url, error=error
                             )
 
-        # Update digest message
-        try:
-            slack_web_client.chat_update(
-                channel=get_digest_channel_id(),
-                ts=incident.digest_message_ts,
-                blocks=IncidentChannelDigestNotification.update(
-                    channel_id=incident.channel_id,
-                    has_private_channel=incident.has_private_channel,
-                    incident_components=incident.components,
-                    incident_description=incident.description,
-                    incident_impact=incident.impact,
-                    incident_slug=incident.slug,
-                    meeting_link=incident.meeting_link,
-                    severity=incident.severity,
-                    status=status,
-                    postmortem_link=postmortem_link,
-                ),
-                text="The digest message has been updated.",
-            )
-        except SlackApiError as error:
-            logger.exception(
-                "error sending status update to incident channel", channel=incident.channel_name, error=error
-            )
-
         try:
             current_topic = _get_channel_topic(incident.channel_id)
             new_topic = f"{current_topic[0]} | Status: {status.title()}"
@@ -1516,10 +1499,11 @@ async def set_status(
             from incidentbot.jira.api import JiraApi
 
             jira = JiraApi()
-            jira.update_issue_status(
-                incident_name=incident.channel_name,
-                incident_status=status,
-            )
+            with span("jira", "update_issue_status"):
+                jira.update_issue_status(
+                    incident_name=incident.channel_name,
+                    incident_status=status,
+                )
 
         # Update gitlab ticket status
         if (
@@ -1531,9 +1515,10 @@ async def set_status(
             from incidentbot.gitlab.api import GitLabApi
 
             gitlab = GitLabApi()
-            gitlab.update_issue_status(
-                incident_name=incident.channel_name, incident_status=status
-            )
+            with span("gitlab", "update_issue_status"):
+                gitlab.update_issue_status(
+                    incident_name=incident.channel_name, incident_status=status
+                )
             logger.info(
                 "updated gitlab issue status", channel=incident.channel_name, status=status
             )
@@ -1548,6 +1533,9 @@ async def set_status(
         except Exception as error:
             logger.exception("error updating entry in database", error=error)
 
+        # Update digest message
+        _refresh_digest(incident.channel_id)
+
         # Write event log
         EventLogHandler.create(
             event=f"The incident status was changed to {status}",
@@ -1560,12 +1548,7 @@ async def set_status(
         updated_incident = IncidentDatabaseInterface.get_one(channel_id=incident.channel_id) or incident
         run_automations("on_status_change", updated_incident)
 
-        final_statuses = [
-            status
-            for status, config in settings.statuses.items()
-            if config.final
-        ]
-        if final_statuses and status in final_statuses:
+        if status in settings.lookups.final_statuses:
             cancel_reminder_jobs(incident.slug)
             run_automations("on_final_status", updated_incident)
 
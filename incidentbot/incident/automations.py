@@ -26,8 +26,7 @@ def run(trigger: str, record) -> None:
             if trigger != "on_status_change":
                 continue
             from incidentbot.configuration.settings import settings as s
-            final_statuses = {name for name, cfg in s.statuses.items() if cfg.final}
-            if record.status not in final_statuses:
+            if record.status not in s.lookups.final_statuses:
                 continue
         elif automation.trigger != trigger:
             continue
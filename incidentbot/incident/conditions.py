@@ -3,10 +3,15 @@ from incidentbot.configuration.settings import settings
 from incidentbot.models.incident import IncidentDatabaseInterface
 
 
-def evaluate(conditions: Conditions | None, record) -> bool:
+def evaluate(
+    conditions: Conditions | None, record, participant_count: int | None = None
+) -> bool:
     """
     Return True if all conditions in the Conditions object are satisfied
     for the given incident record. A None conditions object always passes.
+
+    participant_count, when the caller already has it, saves looking the
+    participants up for no_roles_claimed.
     """
     if conditions is None:
         return True
@@ -17,16 +22,18 @@ def evaluate(conditions: Conditions | None, record) -> bool:
     if conditions.status_is and record.status not in conditions.status_is:
         return False
 
-    if conditions.status_is_final:
-        final_statuses = {
-            name for name, cfg in settings.statuses.items() if cfg.final
-        }
-        if record.status not in final_statuses:
-            return False
+    if (
+        conditions.status_is_final
+        and record.status not in settings.lookups.final_statuses
+    ):
+        return False
 
     if conditions.no_roles_claimed:
-        participants = IncidentDatabaseInterface.list_participants(record)
-        if participants:
+        if participant_count is None:
+            participant_count = len(
+                IncidentDatabaseInterface.list_participants(record)
+            )
+        if participant_count:
             return False
 
     return True
@@ -1,15 +1,18 @@
 from datetime import datetime
 import asyncio
 import re
+import time
 
 from incidentbot.configuration.settings import settings
 from incidentbot.incident.event import EventLogHandler
 from incidentbot.incident.automations import run as run_automations
 from incidentbot.incident.reminders import register_reminder_jobs
+from incidentbot.incident.steps import StepGraph
 from incidentbot.logging import logger
-from incidentbot.models.database import IncidentRecord, engine
+from incidentbot.models.database import IncidentEvent, IncidentRecord, engine
 from incidentbot.models.pager import read_pager_auto_page_targets
 from incidentbot.platform import get_adapter
+from incidentbot.util.tracing import set_incident, span, traced
 from incidentbot.scheduler.core import (
     process as TaskScheduler,
 )
@@ -84,7 +87,8 @@ class Incident:
             and settings.integrations.zoom
             and settings.integrations.zoom.enabled
         ):
-            return ZoomMeeting(incident=channel_name).url
+            with span("zoom", "create_meeting"):
+                return ZoomMeeting(incident=channel_name).url
         else:
             return (
                 settings.options.meeting_link
@@ -92,9 +96,17 @@ class Incident:
                 else None
             )
 
+    @traced("incident")
     def start(self) -> str:
         """
         Create an incident
+
+        The record is written first, then the room is created, followed by the
+        meeting link once the room exists. The remaining setup runs as a step
+        graph: independent steps such as the digest post, topic, bookmark and
+        invite run concurrently, while messages posted into the room are
+        chained so they keep their order. No database session is held open
+        across platform calls.
         """
 
         adapter = get_adapter()
@@ -107,44 +119,61 @@ class Incident:
                     description=self.params.incident_description,
                     impact=self.params.incident_impact,
                     is_security_incident=self.params.is_security_incident,
-                    roles_all=[key for key, _ in settings.roles.items()],
+                    roles_all=list(settings.lookups.roles),
                     severity=self.params.severity,
-                    severities=[key for key, _ in settings.severities.items()],
-                    status=next(
-                        (status for status, config in settings.statuses.items() if config.initial),
-                        list(settings.statuses.keys())[0] if settings.statuses else None
-                    ),
-                    statuses=[status for status in settings.statuses],
+                    severities=list(settings.lookups.severities),
+                    status=settings.lookups.initial_status,
+                    statuses=list(settings.lookups.statuses),
                 )
 
                 session.add(record)
                 session.commit()
                 session.refresh(record)
 
-                """
-                Create platform room/channel for incident
-                """
+            started = time.perf_counter()
 
-                channel_name = format_channel_name(
-                    id=record.id,
-                    description=self.params.incident_description,
-                    use_date_prefix=settings.options.channel_name_use_date_prefix,
-                )
+            """
+            Create platform room/channel for incident
+            """
+
+            channel_name = format_channel_name(
+                id=record.id,
+                description=self.params.incident_description,
+                use_date_prefix=settings.options.channel_name_use_date_prefix,
+            )
+
+            def create_room() -> dict:
                 channel = adapter.create_room(
                     name=channel_name,
                     private=self.params.private_channel | self.params.is_security_incident,
                 )
-                meeting_link = self.generate_meeting_link(channel_name=channel_name)
+                if not (channel or {}).get("id"):
+                    raise RuntimeError(f"no room was created for {channel_name}")
+
+                return channel
+
+            # The meeting waits for the room so a failed incident doesn't
+            # leave an orphaned Zoom meeting behind
+            room = StepGraph("incident-room")
+            room.add("create_room", create_room)
+            room.add(
+                "meeting_link",
+                lambda: self.generate_meeting_link(channel_name=channel_name),
+                after=("create_room",),
+            )
+            results = room.run()
+            channel = results.get("create_room") or {}
 
-                """
-                Update record
-                """
+            """
+            Update record
+            """
 
-                channel_id = channel.get("id")
+            channel_id = channel.get("id")
+            with Session(engine) as session:
                 if not channel_id:
                     # Channel creation failed entirely — delete the stub record so we
                     # don't leave an orphaned row with channel_id=None in the DB.
-                    session.delete(record)
+                    session.delete(session.get(IncidentRecord, record.id))
                     session.commit()
                     logger.error(
                         "aborting incident creation: could not obtain a channel id", channel_name=channel_name
@@ -160,7 +189,7 @@ class Incident:
                     )
                 ).first()
                 if duplicate:
-                    session.delete(record)
+                    session.delete(session.get(IncidentRecord, record.id))
                     session.commit()
                     logger.warning(
                         "channel already has an incident record, reusing existing incident",
@@ -169,204 +198,269 @@ class Incident:
                     )
                     return channel_id
 
-                record.channel_id = channel_id
-                record.channel_name = channel_name
-                record.has_private_channel = (
-                    self.params.private_channel or self.params.is_security_incident
-                )
+            record.channel_id = channel_id
+            record.channel_name = channel_name
+            record.has_private_channel = (
+                self.params.private_channel or self.params.is_security_incident
+            )
 
-                if settings.platform == "matrix" and self.params.user:
-                    adapter.invite_user(record.channel_id, self.params.user)
-                    adapter.make_room_admin(record.channel_id, self.params.user)
-                record.link = adapter.room_url(channel.get("id"))
-                record.meeting_link = meeting_link
-                record.slug = f"{settings.options.channel_name_prefix}-{record.id}"
+            if settings.platform == "matrix" and self.params.user:
+                adapter.invite_user(record.channel_id, self.params.user)
+                adapter.make_room_admin(record.channel_id, self.params.user)
+            record.link = adapter.room_url(channel.get("id"))
+            record.meeting_link = results.get("meeting_link")
+            record.slug = f"{settings.options.channel_name_prefix}-{record.id}"
+            set_incident(record.slug)
 
-                """
-                Notify digest room/channel
-                """
+            setup = self._setup_steps(adapter, record)
+            results.merge(setup.run())
 
-                logger.info(
-                    "sending message to digest channel", channel=record.channel_name
-                )
-                digest_event_id = adapter.post_digest_notification(
-                    channel_id=record.channel_id,
-                    has_private_channel=record.has_private_channel,
-                    incident_components=record.components,
-                    incident_description=record.description,
-                    incident_impact=record.impact,
-                    incident_slug=f"{settings.options.channel_name_prefix}-{record.id}",
-                    initial_status=record.status,
-                    meeting_link=record.meeting_link,
-                    severity=record.severity,
-                )
+            record.digest_message_ts = results.get("digest")
+            record.boilerplate_message_ts = results.get("boilerplate")
+            setup_seconds = time.perf_counter() - started
 
-                record.digest_message_ts = digest_event_id
+            """
+            Database commit
+            """
 
-                """
-                Set incident room topic
-                """
+            with Session(engine) as session:
+                session.add(record)
+                session.commit()
+                session.refresh(record)
+
+            """
+            Run additional features
+            """
 
-                adapter.set_room_topic(
+            try:
+                loop = asyncio.get_running_loop()
+                loop.create_task(self.handle_incident_optional_features(id=record.id))
+            except RuntimeError:
+                asyncio.run(self.handle_incident_optional_features(id=record.id))
+
+            if not self.params.user:
+                logger.info(
+                    "no declaring user provided for incident, skipping auto-invite",
                     room_id=record.channel_id,
-                    topic=f"Severity: {record.severity.upper()} | Status: {record.status.title()}",
                 )
 
-                """
-                Send boilerplate info to incident room
-                """
+            # Write event log
+            user_name = results.get("reporter", "system")
+            EventLogHandler.create(
+                event=f"The incident was reported by {user_name}",
+                incident_id=record.id,
+                incident_slug=record.slug,
+                source="system",
+                user=user_name,
+            )
+            EventLogHandler.create(
+                event=f"Incident room set up in {setup_seconds:.2f}s ({results.summary()})",
+                incident_id=record.id,
+                incident_slug=record.slug,
+                source="system",
+                title="Incident setup",
+                user="system",
+            )
 
-                bp_event_id = adapter.post_incident_boilerplate(incident=record)
-                record.boilerplate_message_ts = bp_event_id
+            return record.channel_id
+        except Exception as error:
+            logger.exception("error during incident creation", error=error)
+            return
 
-                """
-                Send welcome message to incident room
-                """
+    def _setup_steps(self, adapter, record: IncidentRecord) -> StepGraph:
+        """
+        Build the steps that run once the incident room exists
 
-                adapter.post_welcome_message(room_id=record.channel_id)
+        Everything here only needs the room id and the record fields already
+        set, so steps run concurrently except where they post into the room,
+        where each message waits for the one before it to keep their order.
+        """
 
-                """
-                Post live roles panel (updated in-place as roles are claimed)
-                """
+        steps = StepGraph("incident-setup")
 
-                roles_panel_ts = adapter.post_roles_panel(
-                    room_id=record.channel_id,
-                    incident=record,
-                    participants=[],
-                )
-                if roles_panel_ts:
-                    from incidentbot.models.database import ApplicationData
-
-                    with Session(engine) as sess:
-                        sess.add(
-                            ApplicationData(
-                                name=f"role_panel_{record.channel_id}",
-                                json_data={"ts": roles_panel_ts},
-                            )
+        """
+        Notify digest room/channel
+        """
+
+        def post_digest() -> str:
+            logger.info(
+                "sending message to digest channel", channel=record.channel_name
+            )
+            return adapter.post_digest_notification(
+                channel_id=record.channel_id,
+                has_private_channel=record.has_private_channel,
+                incident_components=record.components,
+                incident_description=record.description,
+                incident_impact=record.impact,
+                incident_slug=record.slug,
+                initial_status=record.status,
+                meeting_link=record.meeting_link,
+                severity=record.severity,
+            )
+
+        steps.add("digest", post_digest)
+
+        """
+        Set incident room topic
+        """
+
+        steps.add(
+            "topic",
+            lambda: adapter.set_room_topic(
+                room_id=record.channel_id,
+                topic=f"Severity: {record.severity.upper()} | Status: {record.status.title()}",
+            ),
+        )
+
+        """
+        Send boilerplate info, welcome message and the live roles panel
+        (updated in-place as roles are claimed) to incident room, in order
+        """
+
+        steps.add(
+            "boilerplate", lambda: adapter.post_incident_boilerplate(incident=record)
+        )
+        steps.add(
+            "welcome",
+            lambda: adapter.post_welcome_message(room_id=record.channel_id),
+            after=("boilerplate",),
+        )
+
+        def post_roles_panel() -> str:
+            roles_panel_ts = adapter.post_roles_panel(
+                room_id=record.channel_id,
+                incident=record,
+                participants=[],
+            )
+            if roles_panel_ts:
+                from incidentbot.models.database import ApplicationData
+
+                with Session(engine) as sess:
+                    sess.add(
+                        ApplicationData(
+                            name=f"role_panel_{record.channel_id}",
+                            json_data={"ts": roles_panel_ts},
                         )
-                        sess.commit()
-
-                if (
-                    settings.platform == "matrix"
-                    and settings.matrix
-                    and settings.matrix.widget_base_url
-                ):
-                    from incidentbot.util.widget_token import build_widget_url
-
-                    widget_url = build_widget_url(
-                        settings.matrix.widget_base_url,
-                        "/widget/incident-room",
-                        record.channel_id,
-                        "incidentbot-controls",
                     )
-                    try:
-                        adapter.client.register_widget(
-                            room_id=record.channel_id,
-                            widget_id="incidentbot-controls",
-                            name="Incident Controls",
-                            url=widget_url,
-                        )
-                        logger.info(
-                            "incident controls widget registered in room", room_id=record.channel_id
-                        )
-                    except Exception as error:
-                        logger.exception(
-                            "failed to register incident controls widget", room_id=record.channel_id, error=error
-                        )
+                    sess.commit()
 
-                """
-                Add meeting bookmark (optional)
-                """
+            return roles_panel_ts
 
-                if record.meeting_link:
-                    meeting_link_provider = "Audio"
-                    if "zoom" in record.meeting_link.lower():
-                        meeting_link_provider = "Zoom"
+        steps.add("roles_panel", post_roles_panel, after=("welcome",))
 
-                    adapter.add_bookmark(
-                        room_id=record.channel_id,
-                        title=f"{meeting_link_provider} Meeting",
-                        url=record.meeting_link,
-                        emoji=settings.icons.get(settings.platform, {}).get("meeting", ""),
-                    )
+        if (
+            settings.platform == "matrix"
+            and settings.matrix
+            and settings.matrix.widget_base_url
+        ):
 
-                """
-                Pin meeting link to channel (optional)
-                """
+            def register_widget():
+                from incidentbot.util.widget_token import build_widget_url
 
-                if record.meeting_link and settings.options.pin_meeting_link_to_channel:
-                    event_id = adapter.send_text(
+                widget_url = build_widget_url(
+                    settings.matrix.widget_base_url,
+                    "/widget/incident-room",
+                    record.channel_id,
+                    "incidentbot-controls",
+                )
+                try:
+                    adapter.client.register_widget(
                         room_id=record.channel_id,
-                        text=f"Join the meeting here: {record.meeting_link}",
+                        widget_id="incidentbot-controls",
+                        name="Incident Controls",
+                        url=widget_url,
+                    )
+                    logger.info(
+                        "incident controls widget registered in room", room_id=record.channel_id
+                    )
+                except Exception as error:
+                    logger.exception(
+                        "failed to register incident controls widget", room_id=record.channel_id, error=error
                     )
-                    if event_id:
-                        adapter.pin_message(room_id=record.channel_id, event_id=event_id)
 
-                """
-                Database commit
-                """
+            steps.add("widget", register_widget)
 
-                session.add(record)
-                session.commit()
+        """
+        Add meeting bookmark (optional)
 
-                """
-                Run additional features
-                """
+        On Matrix the bookmark is a pinned message, so it follows the other
+        room messages
+        """
 
-                try:
-                    loop = asyncio.get_running_loop()
-                    loop.create_task(self.handle_incident_optional_features(id=record.id))
-                except RuntimeError:
-                    asyncio.run(self.handle_incident_optional_features(id=record.id))
+        if record.meeting_link:
+            meeting_link_provider = "Audio"
+            if "zoom" in record.meeting_link.lower():
+                meeting_link_provider = "Zoom"
 
-                # Invite the user who started the incident to the room
-                if self.params.user:
+            steps.add(
+                "bookmark",
+                lambda: adapter.add_bookmark(
+                    room_id=record.channel_id,
+                    title=f"{meeting_link_provider} Meeting",
+                    url=record.meeting_link,
+                    emoji=settings.icons.get(settings.platform, {}).get("meeting", ""),
+                ),
+                after=("roles_panel",) if settings.platform == "matrix" else (),
+            )
+
+        """
+        Pin meeting link to channel (optional)
+        """
+
+        if record.meeting_link and settings.options.pin_meeting_link_to_channel:
+
+            def pin_meeting_link():
+                event_id = adapter.send_text(
+                    room_id=record.channel_id,
+                    text=f"Join the meeting here: {record.meeting_link}",
+                )
+                if event_id:
+                    adapter.pin_message(room_id=record.channel_id, event_id=event_id)
+
+            # Pinning rewrites the room's whole pinned list, so it must not
+            # overlap with the bookmark's pin
+            steps.add(
+                "pin_meeting_link",
+                pin_meeting_link,
+                after=("roles_panel", "bookmark"),
+            )
+
+        """
+        Invite the user who started the incident to the room
+        """
+
+        if self.params.user:
+
+            def invite_reporter():
+                logger.info(
+                    "inviting declaring user to incident room",
+                    user=self.params.user,
+                    room_id=record.channel_id,
+                )
+                adapter.invite_user(room_id=record.channel_id, user_id=self.params.user)
+                try:
+                    adapter.make_room_admin(
+                        room_id=record.channel_id, user_id=self.params.user
+                    )
                     logger.info(
-                        "inviting declaring user to incident room",
+                        "granted room admin to declaring user",
                         user=self.params.user,
                         room_id=record.channel_id,
                     )
-                    adapter.invite_user(room_id=record.channel_id, user_id=self.params.user)
-                    try:
-                        adapter.make_room_admin(
-                            room_id=record.channel_id, user_id=self.params.user
-                        )
-                        logger.info(
-                            "granted room admin to declaring user",
-                            user=self.params.user,
-                            room_id=record.channel_id,
-                        )
-                    except Exception as error:
-                        logger.exception(
-                            "failed to grant room admin to declaring user",
-                            user=self.params.user,
-                            room_id=record.channel_id,
-                            error=error,
-                        )
-                else:
-                    logger.info(
-                        "no declaring user provided for incident, skipping auto-invite",
+                except Exception as error:
+                    logger.exception(
+                        "failed to grant room admin to declaring user",
+                        user=self.params.user,
                         room_id=record.channel_id,
+                        error=error,
                     )
 
-                # Write event log
-                user_name = (
-                    adapter.get_user_display_name(self.params.user)
-                    if self.params.user
-                    else "system"
-                )
-                EventLogHandler.create(
-                    event=f"The incident was reported by {user_name}",
-                    incident_id=record.id,
-                    incident_slug=record.slug,
-                    source="system",
-                    user=user_name,
-                )
+            steps.add("invite_reporter", invite_reporter)
+            steps.add(
+                "reporter", lambda: adapter.get_user_display_name(self.params.user)
+            )
 
-                return record.channel_id
-        except Exception as error:
-            logger.exception("error during incident creation", error=error)
-            return
+        return steps
 
     @staticmethod
     def delete(id: int) -> bool:
@@ -380,8 +474,19 @@ class Incident:
                 record = session.exec(
                     select(IncidentRecord).filter(IncidentRecord.id == id)
                 ).one()
+                # Deleting the record cascades to its events; note their
+                # images first so the ones nothing else uses can be released
+                image_hashes = session.exec(
+                    select(IncidentEvent.image_hash)
+                    .filter(
+                        IncidentEvent.parent == id,
+                        IncidentEvent.image_hash.is_not(None),
+                    )
+                    .distinct()
+                ).all()
                 session.delete(record)
                 session.commit()
+                EventLogHandler.release_images(image_hashes)
 
                 for job in TaskScheduler.list_jobs():
                     if f"inc-{record.id}" in job.id:
@@ -400,6 +505,7 @@ class Incident:
             logger.exception("error deleting incident", error=error)
             return
 
+    @traced("incident", "optional_features")
     async def handle_incident_optional_features(self, id: int):
         """
         Run optional post-creation features: group invites, Statuspage, PagerDuty,
@@ -412,6 +518,7 @@ class Incident:
             record = session.exec(
                 select(IncidentRecord).filter(IncidentRecord.id == id)
             ).one()
+            set_incident(record.slug)
 
             run_automations("on_open", record)
 
@@ -449,21 +556,27 @@ class Incident:
                 and settings.integrations.pagerduty
                 and settings.integrations.pagerduty.enabled
             ):
-                from incidentbot.pagerduty.api import PagerDutyInterface
+                from incidentbot.pagerduty.api import page_escalation_policies
 
                 auto_page_targets = read_pager_auto_page_targets()
 
                 if auto_page_targets:
-                    for i in auto_page_targets:
-                        for k, v in i.items():
-                            logger.info("paging team", team=k)
-                            pagerduty_interface = PagerDutyInterface(escalation_policy=v)
-                            pagerduty_interface.page(
-                                priority="low",
-                                channel_name=record.channel_name,
-                                channel_id=record.channel_id,
-                                paging_user="auto",
-                            )
+                    teams = {
+                        k: v for i in auto_page_targets for k, v in i.items()
+                    }
+                    logger.info("paging teams", teams=list(teams))
+
+                    # Page every team concurrently instead of one after another
+                    results = page_escalation_policies(
+                        escalation_policies=list(teams.values()),
+                        channel_id=record.channel_id,
+                        channel_name=record.channel_name,
+                        paging_user="auto",
+                        priority="low",
+                    )
+
+                    for k, v in teams.items():
+                        if results.get(v):
                             EventLogHandler.create(
                                 event=f"Created PagerDuty incident for team {k} at user request",
                                 incident_id=record.id,
@@ -505,7 +618,8 @@ class Incident:
                         issue_type=settings.integrations.atlassian.jira.auto_create_issue_type,
                         summary=record.description,
                     )
-                    resp = issue_obj.new()
+                    with span("jira", "create_issue"):
+                        resp = issue_obj.new()
 
                     if resp is not None:
                         issue_link = f"{settings.ATLASSIAN_API_URL}/browse/{resp.get('key')}"
@@ -559,7 +673,8 @@ class Incident:
                         status=record.status,
                         severity=record.severity,
                     )
-                    resp = issue_obj.new()
+                    with span("gitlab", "create_incident"):
+                        resp = issue_obj.new()
 
                     if resp is not None:
                         issue_link = resp.get("web_url")
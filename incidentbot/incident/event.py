@@ -1,11 +1,16 @@
 from datetime import datetime
 
+from incidentbot.attachments.store import get_attachment_store
 from incidentbot.configuration.settings import settings
 from incidentbot.logging import logger
-from incidentbot.models.database import engine, IncidentEvent
+from incidentbot.models.database import engine, IncidentEvent, IncidentEventBase
 from incidentbot.util.gen import fetch_timestamp
 from sqlmodel import Session, select, or_
 
+_SUMMARY_COLUMNS = [
+    getattr(IncidentEvent, name) for name in IncidentEventBase.model_fields
+]
+
 
 class EventLogHandler:
     @staticmethod
@@ -31,6 +36,8 @@ class EventLogHandler:
         source: str,
         event: str | None = None,
         image: bytes | None = None,
+        image_hash: str | None = None,
+        image_size: int | None = None,
         message_ts: str | None = None,
         mimetype: str | None = None,
         title: str | None = None,
@@ -39,12 +46,21 @@ class EventLogHandler:
     ):
         """
         Create an event log for an incident
+
+        Image bytes are written to the attachment store and the event only
+        keeps the content hash; images already in the store are passed by
+        image_hash and image_size instead
         """
 
         with Session(engine) as session:
             try:
+                if image is not None:
+                    image_hash = get_attachment_store().put(image)
+                    image_size = len(image)
+
                 event = IncidentEvent(
-                    image=image,
+                    image_hash=image_hash,
+                    image_size=image_size,
                     incident_slug=incident_slug,
                     message_ts=(
                         message_ts
@@ -89,6 +105,9 @@ class EventLogHandler:
                 session.commit()
 
                 logger.info("deleted incident event", event_id=id)
+
+                if record.image_hash:
+                    self._release_image(session, record.image_hash)
             except Exception as error:
                 logger.exception(
                     "event log delete failed", event_id=id, error=error
@@ -96,6 +115,44 @@ class EventLogHandler:
 
                 return False, error
 
+    @classmethod
+    def release_images(self, image_hashes: list[str]):
+        """
+        Remove images from the attachment store that no event refers to any
+        more, e.g. once an incident and its events have been deleted
+
+        Parameters:
+            image_hashes (list[str]): Content hashes the deleted events held
+        """
+
+        with Session(engine) as session:
+            for image_hash in image_hashes:
+                try:
+                    self._release_image(session, image_hash)
+                except Exception as error:
+                    logger.exception(
+                        "attachment release failed", image_hash=image_hash, error=error
+                    )
+
+    @staticmethod
+    def _release_image(session: Session, image_hash: str):
+        """
+        Remove an image from the attachment store once no event refers to it
+
+        An image stored or reused within attachments.release_after_seconds is
+        kept, since a pin of the same content may be about to write an event
+        referring to it.
+        """
+
+        still_used = session.exec(
+            select(IncidentEvent.id).filter(IncidentEvent.image_hash == image_hash)
+        ).first()
+        if still_used is None:
+            get_attachment_store().delete(
+                image_hash,
+                idle_seconds=settings.attachments.release_after_seconds,
+            )
+
     @classmethod
     def read(
         self,
@@ -131,6 +188,72 @@ class EventLogHandler:
                     "event log lookup failed", incident_id=incident_id, error=error
                 )
 
+    @classmethod
+    def read_summary(
+        self,
+        incident_id: int = None,
+        incident_slug: str = None,
+    ) -> list[IncidentEventBase]:
+        """
+        Read an incident's event logs as compact rows
+
+        Only the timeline columns are selected and rows are not tracked by
+        the session; use read_image for an event's image.
+
+        Parameters:
+            incident_id (int): The incident id
+            incident_slug (str): The incident slug
+        """
+
+        with Session(engine) as session:
+            try:
+                rows = session.exec(
+                    select(*_SUMMARY_COLUMNS)
+                    .filter(
+                        or_(
+                            IncidentEvent.incident_slug == incident_slug,
+                            IncidentEvent.parent == incident_id,
+                        )
+                    )
+                    .order_by(
+                        IncidentEvent.message_ts, IncidentEvent.created_at
+                    )
+                ).all()
+
+                # Rows come straight from the table, so skip re-validation
+                return [
+                    IncidentEventBase.model_construct(**row._mapping) for row in rows
+                ]
+            except Exception as error:
+                logger.exception(
+                    "event log lookup failed", incident_id=incident_id, error=error
+                )
+
+    @classmethod
+    def read_image(
+        self,
+        id: str,
+    ) -> bytes | None:
+        """
+        Read the image attached to an event, if it has one
+
+        Parameters:
+            id (str): The event's uuid
+        """
+
+        try:
+            with Session(engine) as session:
+                image_hash = session.exec(
+                    select(IncidentEvent.image_hash).filter(IncidentEvent.id == id)
+                ).first()
+
+            if not image_hash:
+                return None
+
+            return get_attachment_store().get(image_hash)
+        except Exception as error:
+            logger.exception("event image lookup failed", event_id=id, error=error)
+
     @classmethod
     def read_one(
         self,
@@ -1,76 +1,477 @@
+import datetime
+import heapq
+import threading
+import time
+
+from collections.abc import Callable
 from incidentbot.configuration.settings import settings
 from incidentbot.incident.conditions import evaluate
 from incidentbot.logging import logger
+from incidentbot.models.database import engine, IncidentRecord, ReminderRecord
 from incidentbot.models.incident import IncidentDatabaseInterface
 from incidentbot.platform import get_adapter
-from incidentbot.scheduler.core import process as TaskScheduler
+from incidentbot.util import metrics
+from sqlalchemy import delete, or_, true, tuple_
+from sqlmodel import Session, select
 
+# How far back refresh() reads before its last run, to allow for clock skew
+# between replicas
+_REFRESH_OVERLAP_SECONDS = 60
 
-def _job_id(slug: str, reminder_id: str) -> str:
-    return f"{slug}_{reminder_id}"
+reminders_sent = metrics.counter(
+    "incidentbot_reminders_sent_total",
+    "Reminder messages posted to incident channels",
+    ("reminder",),
+)
 
 
-def run_reminder(channel_id: str, reminder_id: str) -> None:
-    """Generic APScheduler job function for all configured reminders."""
-    reminder = next((r for r in settings.reminders if r.id == reminder_id), None)
-    if not reminder or not reminder.enabled:
-        return
+def _to_db(ts: float | None) -> datetime.datetime | None:
+    if ts is None:
+        return None
 
-    record = IncidentDatabaseInterface.get_one(channel_id=channel_id)
-    if not record:
-        return
+    return datetime.datetime.fromtimestamp(
+        ts, datetime.UTC
+    ).replace(tzinfo=None)
+
+
+def _from_db(value: datetime.datetime) -> float:
+    return value.replace(tzinfo=datetime.UTC).timestamp()
+
+
+def _store(
+    rows: list[ReminderRecord] = (),
+    removed: list[tuple[str, str | None]] = (),
+):
+    """
+    Write reminder state in one transaction
+
+    Rows already dismissed or fired are final: they are never overwritten
+    with a new due time, even by a process whose schedule hasn't caught up.
 
-    if not evaluate(reminder.conditions, record):
+    Parameters:
+        rows (list[ReminderRecord]): Full state for each reminder to save
+        removed (list[tuple[str, str | None]]): (slug, reminder id) pairs to
+            delete; a reminder id of None deletes all of the incident's rows
+    """
+
+    if not rows and not removed:
         return
 
+    # Stamped here rather than by the database so refresh() on other
+    # processes compares like with like
+    updated_at = _to_db(time.time())
     try:
-        get_adapter().post_reminder(channel_id, reminder, record.slug)
+        with Session(engine) as session:
+            rearming = [row for row in rows if not (row.dismissed or row.fired)]
+            final = set()
+            if rearming:
+                final = set(
+                    session.exec(
+                        select(ReminderRecord.slug, ReminderRecord.reminder_id)
+                        .where(
+                            tuple_(
+                                ReminderRecord.slug, ReminderRecord.reminder_id
+                            ).in_(
+                                [(row.slug, row.reminder_id) for row in rearming]
+                            ),
+                            or_(ReminderRecord.dismissed, ReminderRecord.fired),
+                        )
+                        .with_for_update()
+                    ).all()
+                )
+            for row in rows:
+                if (row.slug, row.reminder_id) in final and not (
+                    row.dismissed or row.fired
+                ):
+                    continue
+                row.updated_at = updated_at
+                session.merge(row)
+            for slug, reminder_id in removed:
+                query = delete(ReminderRecord).where(
+                    ReminderRecord.slug == slug
+                )
+                if reminder_id is not None:
+                    query = query.where(
+                        ReminderRecord.reminder_id == reminder_id
+                    )
+                session.exec(query)
+            session.commit()
     except Exception as error:
-        logger.exception("error sending reminder message", reminder=reminder_id, error=error)
-        return
+        logger.exception("error saving reminder state", error=error)
+
+
+class ReminderSweeper:
+    """
+    Due times for every (incident, reminder) pair, sent in batches
+
+    Due times are kept in a heap. sweep() runs on a single scheduler job: it
+    pops everything that has fallen due, loads the incidents involved and
+    their participant counts in one query, evaluates each reminder's
+    conditions in memory and posts the ones that pass. Repeating reminders go
+    back on the heap one interval later; once-only reminders are dropped after
+    they are posted.
+
+    Every change is also written to the reminderrecord table, and rehydrate()
+    rebuilds the heap from it on startup, so reminders, snoozes, dismissals
+    and once-only reminders that have fired survive a restart. Only the
+    replica holding the scheduler lease sweeps; refresh() brings in the
+    reminders other replicas scheduled, snoozed or dismissed since.
+
+    The heap may hold stale entries for reminders that were cancelled or
+    rescheduled; an entry only counts if it matches _due.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self._heap: list[tuple[float, str, str]] = []
+        # (slug, reminder id) -> due time
+        self._due: dict[tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        # Wall-clock time of the last rehydrate() or refresh()
+        self._refreshed_at: float | None = None
+
+    def _push(self, slug: str, reminder_id: str, due_at: float):
+        with self._lock:
+            self._due[(slug, reminder_id)] = due_at
+            heapq.heappush(self._heap, (due_at, slug, reminder_id))
+
+    def schedule(
+        self,
+        slug: str,
+        reminder_id: str,
+        due_at: float,
+        snoozed: bool = False,
+    ):
+        self._push(slug, reminder_id, due_at)
+        _store(
+            rows=[
+                ReminderRecord(
+                    slug=slug,
+                    reminder_id=reminder_id,
+                    due_at=_to_db(due_at),
+                    snoozed=snoozed,
+                )
+            ]
+        )
+
+    def snooze(self, slug: str, reminder_id: str, due_at: float) -> bool:
+        """
+        Push a scheduled reminder back to due_at
+
+        Decided from the stored row, read and written in one transaction,
+        rather than this process's schedule, which only the sweeping replica
+        keeps fully up to date. Reminders that were dismissed, already sent
+        once or never scheduled are left alone.
+        """
 
-    if reminder.once:
         try:
-            job = TaskScheduler.get_job(job_id=_job_id(record.slug, reminder_id))
-            if job:
-                TaskScheduler.delete_job(job.id)
+            with Session(engine) as session:
+                row = session.get(
+                    ReminderRecord, (slug, reminder_id), with_for_update=True
+                )
+                if row is None or row.dismissed or row.fired or row.due_at is None:
+                    return False
+                row.due_at = _to_db(due_at)
+                row.snoozed = True
+                row.updated_at = _to_db(time.time())
+                session.add(row)
+                session.commit()
         except Exception as error:
-            logger.exception("error removing once-only reminder job", reminder=reminder_id, error=error)
+            logger.exception(
+                "error saving reminder snooze", reminder=reminder_id, error=error
+            )
+            return False
 
+        self._push(slug, reminder_id, due_at)
 
-def register_reminder_jobs(record) -> None:
-    """Register APScheduler interval jobs for all enabled reminders."""
-    for reminder in settings.reminders:
-        if not reminder.enabled:
-            continue
-        try:
-            TaskScheduler.scheduler.add_job(
-                id=_job_id(record.slug, reminder.id),
-                func=run_reminder,
-                args=[record.channel_id, reminder.id],
-                trigger="interval",
-                name=_job_id(record.slug, reminder.id),
-                minutes=reminder.interval_minutes,
-                replace_existing=True,
+        return True
+
+    def register(self, slug: str):
+        """
+        Schedule every enabled reminder for a new incident
+        """
+
+        now = self._clock()
+        rows = []
+        for reminder in settings.reminders:
+            if not reminder.enabled:
+                continue
+            due_at = now + reminder.interval_minutes * 60
+            self._push(slug, reminder.id, due_at)
+            rows.append(
+                ReminderRecord(
+                    slug=slug, reminder_id=reminder.id, due_at=_to_db(due_at)
+                )
             )
+        _store(rows=rows)
+
+    def cancel(self, slug: str, reminder_id: str | None = None):
+        """
+        Dismiss one reminder for an incident, or drop all of them when the
+        incident is closed
+        """
+
+        with self._lock:
+            for key in [key for key in self._due if key[0] == slug]:
+                if reminder_id is None or key[1] == reminder_id:
+                    del self._due[key]
+
+        if reminder_id is None:
+            _store(removed=[(slug, None)])
+        else:
+            _store(
+                rows=[
+                    ReminderRecord(
+                        slug=slug, reminder_id=reminder_id, dismissed=True
+                    )
+                ]
+            )
+
+    def next_due(self, slug: str, reminder_id: str) -> float | None:
+        return self._due.get((slug, reminder_id))
+
+    def pending(self) -> int:
+        return len(self._due)
+
+    def _take(self, now: float) -> list[tuple[str, str, float]]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due_at, slug, reminder_id = heapq.heappop(self._heap)
+                if self._due.get((slug, reminder_id)) == due_at:
+                    due.append((slug, reminder_id, due_at))
+
+        return due
+
+    def _settle(
+        self, slug: str, reminder_id: str, due_at: float, next_due: float | None
+    ) -> bool:
+        # Leave alone anything cancelled or snoozed while it was being sent
+        with self._lock:
+            if self._due.get((slug, reminder_id)) != due_at:
+                return False
+            if next_due is None:
+                del self._due[(slug, reminder_id)]
+            else:
+                self._due[(slug, reminder_id)] = next_due
+                heapq.heappush(self._heap, (next_due, slug, reminder_id))
+
+        return True
+
+    def sweep(self):
+        """
+        Send every reminder that has fallen due
+        """
+
+        now = self._clock()
+        due = self._take(now)
+        if not due:
+            return
+
+        rows = IncidentDatabaseInterface.list_open_with_participant_counts(
+            slugs=sorted({slug for slug, _, _ in due})
+        )
+        if rows is None:
+            # Try again on the next sweep
+            for slug, reminder_id, due_at in due:
+                self._settle(slug, reminder_id, due_at, due_at)
+            return
+
+        incidents = {record.slug: (record, count) for record, count in rows}
+        reminders = {reminder.id: reminder for reminder in settings.reminders}
+        saved, removed = [], []
+
+        for slug, reminder_id, due_at in due:
+            reminder = reminders.get(reminder_id)
+            if slug not in incidents or not reminder or not reminder.enabled:
+                # Closed or deleted incident, or reminder no longer configured
+                if self._settle(slug, reminder_id, due_at, None):
+                    removed.append((slug, reminder_id))
+                continue
+
+            record, participant_count = incidents[slug]
+            next_due = due_at + reminder.interval_minutes * 60
+            if next_due <= now:
+                next_due = now + reminder.interval_minutes * 60
+
+            if evaluate(reminder.conditions, record, participant_count):
+                try:
+                    get_adapter().post_reminder(
+                        record.channel_id, reminder, record.slug
+                    )
+                except Exception as error:
+                    logger.exception(
+                        "error sending reminder message",
+                        reminder=reminder_id,
+                        error=error,
+                    )
+                else:
+                    reminders_sent.inc(reminder=reminder_id)
+                    if reminder.once:
+                        next_due = None
+
+            if self._settle(slug, reminder_id, due_at, next_due):
+                saved.append(
+                    ReminderRecord(
+                        slug=slug,
+                        reminder_id=reminder_id,
+                        due_at=_to_db(next_due),
+                        fired=next_due is None,
+                    )
+                )
+
+        _store(rows=saved, removed=removed)
+
+    def rehydrate(self):
+        """
+        Rebuild the schedule from the database, e.g. after a restart
+
+        Every open incident gets each enabled reminder that has not been
+        dismissed or, for once-only reminders, already sent; incidents opened
+        while no state was kept get a fresh schedule. Reminders that fell due
+        while the bot was down are sent on the first sweep, or moved on to
+        their next interval when jobs.sweep_reminders.catch_up is "skip".
+        Rows for incidents that are no longer open are deleted.
+        """
+
+        now = self._clock()
+        refreshed_at = time.time()
+        final_statuses = settings.lookups.final_statuses
+        is_open = (
+            IncidentRecord.status.not_in(final_statuses)
+            if final_statuses
+            else true()
+        )
+
+        try:
+            with Session(engine) as session:
+                session.exec(
+                    delete(ReminderRecord).where(
+                        ReminderRecord.slug.not_in(
+                            select(IncidentRecord.slug).where(is_open)
+                        )
+                    )
+                )
+                session.commit()
+                rows = session.exec(
+                    select(IncidentRecord.slug, ReminderRecord)
+                    .outerjoin(
+                        ReminderRecord,
+                        ReminderRecord.slug == IncidentRecord.slug,
+                    )
+                    .where(is_open)
+                ).all()
         except Exception as error:
-            logger.exception("error registering reminder job", reminder=reminder.id, error=error)
+            logger.exception("error loading reminder state", error=error)
+            return
 
+        state: dict[str, dict[str, ReminderRecord]] = {}
+        for slug, row in rows:
+            state.setdefault(slug, {})
+            if row is not None:
+                state[slug][row.reminder_id] = row
 
-def cancel_reminder_jobs(slug: str) -> None:
-    """Remove all reminder jobs for an incident (called on final status)."""
-    for reminder in settings.reminders:
-        job_id = _job_id(slug, reminder.id)
+        with self._lock:
+            self._heap = []
+            self._due = {}
+
+        catch_up = settings.jobs.sweep_reminders.catch_up
+        changed, overdue = [], 0
+        for slug, existing in state.items():
+            for reminder in settings.reminders:
+                if not reminder.enabled:
+                    continue
+
+                interval = reminder.interval_minutes * 60
+                row = existing.get(reminder.id)
+                if row is not None and (row.dismissed or row.fired):
+                    continue
+
+                if row is None or row.due_at is None:
+                    due_at = now + interval
+                else:
+                    due_at = _from_db(row.due_at)
+
+                if due_at <= now:
+                    overdue += 1
+                    if catch_up == "skip":
+                        due_at += ((now - due_at) // interval + 1) * interval
+
+                if row is None or row.due_at is None or due_at != _from_db(
+                    row.due_at
+                ):
+                    changed.append(
+                        ReminderRecord(
+                            slug=slug,
+                            reminder_id=reminder.id,
+                            due_at=_to_db(due_at),
+                            snoozed=row.snoozed if row else False,
+                        )
+                    )
+                self._push(slug, reminder.id, due_at)
+
+        _store(rows=changed)
+        self._refreshed_at = refreshed_at
+        logger.info(
+            "rehydrated reminders",
+            incidents=len(state),
+            reminders=self.pending(),
+            overdue=overdue,
+            catch_up=catch_up,
+        )
+
+    def refresh(self):
+        """
+        Apply reminder changes written by other processes since the last
+        rehydrate() or refresh()
+
+        Rows are read back from a little before that time, as they are stamped
+        with the writer's clock; applying a change twice is harmless.
+        """
+
+        since = self._refreshed_at
+        if since is None:
+            return
+
+        refreshed_at = time.time()
         try:
-            job = TaskScheduler.get_job(job_id=job_id)
-            if job:
-                TaskScheduler.delete_job(job_to_delete=job.id)
+            with Session(engine) as session:
+                rows = session.exec(
+                    select(ReminderRecord).where(
+                        ReminderRecord.updated_at
+                        >= _to_db(since - _REFRESH_OVERLAP_SECONDS)
+                    )
+                ).all()
         except Exception as error:
-            logger.exception("error removing reminder job", reminder=reminder.id, error=error)
+            logger.exception("error refreshing reminder state", error=error)
+            return
+
+        for row in rows:
+            key = (row.slug, row.reminder_id)
+            if row.dismissed or row.fired or row.due_at is None:
+                with self._lock:
+                    self._due.pop(key, None)
+            elif self._due.get(key) != _from_db(row.due_at):
+                self._push(row.slug, row.reminder_id, _from_db(row.due_at))
+
+        self._refreshed_at = refreshed_at
+
+
+reminder_sweeper = ReminderSweeper()
+
+
+def register_reminder_jobs(record) -> None:
+    """Schedule every enabled reminder for a new incident."""
+    reminder_sweeper.register(record.slug)
+
+
+def cancel_reminder_jobs(slug: str) -> None:
+    """Drop all reminders for an incident (called on final status)."""
+    reminder_sweeper.cancel(slug)
 
 
 def handle_snooze(channel_id: str, reminder_id: str, minutes: int, ts: str) -> None:
-    """Reschedule a reminder job and acknowledge in channel."""
+    """Push a reminder back by minutes and acknowledge in channel."""
     # ponytail: Slack-only — driven by a Block Kit button, and only called from
     # slack/handler.py. Route through the adapter if Matrix ever grows an equivalent.
     from incidentbot.slack.client import slack_web_client
@@ -79,11 +480,10 @@ def handle_snooze(channel_id: str, reminder_id: str, minutes: int, ts: str) -> N
     if not record:
         return
 
-    job_id = _job_id(record.slug, reminder_id)
     try:
-        job = TaskScheduler.get_job(job_id=job_id)
-        if job:
-            TaskScheduler.reschedule_job(job_id=job.id, new_minutes=minutes)
+        reminder_sweeper.snooze(
+            record.slug, reminder_id, time.time() + minutes * 60
+        )
         slack_web_client.chat_postMessage(
             channel=channel_id,
             text=f":white_check_mark: Got it. I'll remind the channel again in *{minutes} minutes*.",
@@ -94,7 +494,7 @@ def handle_snooze(channel_id: str, reminder_id: str, minutes: int, ts: str) -> N
 
 
 def handle_dismiss(channel_id: str, reminder_id: str, ts: str) -> None:
-    """Permanently cancel a reminder job and acknowledge in channel."""
+    """Permanently cancel a reminder and acknowledge in channel."""
     # ponytail: Slack-only, see handle_snooze.
     from incidentbot.slack.client import slack_web_client
 
@@ -102,11 +502,8 @@ def handle_dismiss(channel_id: str, reminder_id: str, ts: str) -> None:
     if not record:
         return
 
-    job_id = _job_id(record.slug, reminder_id)
     try:
-        job = TaskScheduler.get_job(job_id=job_id)
-        if job:
-            TaskScheduler.delete_job(job_to_delete=job.id)
+        reminder_sweeper.cancel(record.slug, reminder_id)
         slack_web_client.chat_postMessage(
             channel=channel_id,
             text=":white_check_mark: Got it. I won't send any more reminders for this incident.",
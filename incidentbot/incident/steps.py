@@ -0,0 +1,154 @@
+import contextvars
+import time
+
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any
+
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+
+step_duration = metrics.histogram(
+    "incidentbot_incident_setup_step_seconds",
+    "Time taken by each incident setup step",
+    ("step",),
+)
+step_failures = metrics.counter(
+    "incidentbot_incident_setup_step_failures_total",
+    "Incident setup steps that raised",
+    ("step",),
+)
+
+
+class StepResults:
+    """
+    Outcome of a StepGraph run
+
+    values holds the return value of each step that finished, timings the
+    seconds each step took whether or not it finished, failed the exception
+    each failing step raised, and skipped the steps that never ran because
+    something they depended on failed
+    """
+
+    def __init__(self):
+        self.values: dict[str, Any] = {}
+        self.timings: dict[str, float] = {}
+        self.failed: dict[str, Exception] = {}
+        self.skipped: list[str] = []
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.values.get(name, default)
+
+    def merge(self, other: StepResults):
+        self.values.update(other.values)
+        self.timings.update(other.timings)
+        self.failed.update(other.failed)
+        self.skipped.extend(other.skipped)
+
+    def summary(self) -> str:
+        """
+        Human readable timings, slowest first
+        """
+
+        parts = [
+            f"{name} {seconds:.2f}s"
+            for name, seconds in sorted(
+                self.timings.items(), key=lambda item: item[1], reverse=True
+            )
+        ]
+        parts.extend(f"{name} failed" for name in self.failed)
+        parts.extend(f"{name} skipped" for name in self.skipped)
+
+        return ", ".join(parts)
+
+
+class StepGraph:
+    """
+    Runs named steps concurrently, each as soon as the steps it depends on
+    have finished
+
+    Steps must be added after the steps they depend on, which keeps the graph
+    acyclic. A step that raises is logged and recorded, and any step that
+    depends on it is skipped; independent steps carry on.
+    """
+
+    def __init__(self, name: str, max_workers: int = 8):
+        self.name = name
+        self.max_workers = max_workers
+        self._steps: dict[str, tuple[Callable[[], Any], tuple[str, ...]]] = {}
+
+    def add(self, name: str, fn: Callable[[], Any], after: tuple[str, ...] = ()):
+        if name in self._steps:
+            raise ValueError(f"step {name} is already part of {self.name}")
+        unknown = [dep for dep in after if dep not in self._steps]
+        if unknown:
+            raise ValueError(f"step {name} depends on unknown steps {unknown}")
+
+        self._steps[name] = (fn, tuple(after))
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._steps
+
+    @staticmethod
+    def _timed(fn: Callable[[], Any]) -> tuple[Any, float, Exception | None]:
+        start = time.perf_counter()
+        try:
+            return fn(), time.perf_counter() - start, None
+        except Exception as error:
+            return None, time.perf_counter() - start, error
+
+    def run(self) -> StepResults:
+        results = StepResults()
+        if not self._steps:
+            return results
+
+        pending = dict(self._steps)
+        running: dict[Future, str] = {}
+
+        with ThreadPoolExecutor(
+            max_workers=min(len(self._steps), self.max_workers),
+            thread_name_prefix=self.name,
+        ) as executor:
+            while pending or running:
+                # Insertion order is a topological order, so one pass also
+                # skips everything downstream of a failed step
+                for name, (fn, after) in list(pending.items()):
+                    if any(
+                        dep in results.failed or dep in results.skipped
+                        for dep in after
+                    ):
+                        results.skipped.append(name)
+                        del pending[name]
+                    elif all(dep in results.values for dep in after):
+                        # Each step runs in a copy of the caller's context so
+                        # spans it starts nest under the caller's span
+                        running[
+                            executor.submit(
+                                contextvars.copy_context().run, self._timed, fn
+                            )
+                        ] = name
+                        del pending[name]
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    value, elapsed, error = future.result()
+
+                    results.timings[name] = elapsed
+                    step_duration.observe(elapsed, step=name)
+                    if error is None:
+                        results.values[name] = value
+                    else:
+                        results.failed[name] = error
+                        step_failures.inc(step=name)
+                        logger.error(
+                            "incident setup step failed",
+                            graph=self.name,
+                            step=name,
+                            error=error,
+                        )
+
+        return results
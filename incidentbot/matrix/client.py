@@ -1,7 +1,9 @@
 import asyncio
 import threading
+import time
 
 from incidentbot.logging import logger
+from incidentbot.util import metrics
 from nio import (
     AsyncClient,
     JoinResponse,
@@ -10,6 +12,25 @@ from nio import (
     RoomSendResponse,
 )
 
+sync_duration = metrics.histogram(
+    "incidentbot_matrix_sync_duration_seconds",
+    "Round trip time of Matrix sync requests, including the long poll",
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 35.0, 60.0),
+)
+sync_errors = metrics.counter(
+    "incidentbot_matrix_sync_errors_total",
+    "Matrix sync requests that failed",
+)
+last_sync = metrics.gauge(
+    "incidentbot_matrix_last_sync_timestamp_seconds",
+    "Unix time of the last successful Matrix sync",
+)
+event_lag = metrics.histogram(
+    "incidentbot_matrix_event_lag_seconds",
+    "Time between the homeserver receiving a message and the bot handling it",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
 
 class MatrixClient:
     """
@@ -201,8 +222,11 @@ class MatrixClient:
     async def _sync_loop(self, on_message):
         """Continuous sync loop. Calls on_message for each m.room.message event."""
         while True:
+            start = time.perf_counter()
             try:
                 resp = await self._client.sync(timeout=30000, full_state=False)
+                sync_duration.observe(time.perf_counter() - start)
+                last_sync.set(time.time())
                 for room_id in resp.rooms.invite:
                     if await self._join_room_async(room_id):
                         logger.info("accepted matrix invite for room", room_id=room_id)
@@ -213,8 +237,13 @@ class MatrixClient:
                 for room_id, room in resp.rooms.join.items():
                     for event in room.timeline.events:
                         if hasattr(event, "body"):
+                            # server_timestamp is in milliseconds
+                            event_lag.observe(
+                                max(time.time() - event.server_timestamp / 1000, 0)
+                            )
                             await on_message(room_id, event)
             except Exception as exc:
+                sync_errors.inc()
                 logger.exception("matrix sync error", error=exc)
                 await asyncio.sleep(5)
 
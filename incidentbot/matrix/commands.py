@@ -86,7 +86,7 @@ async def handle_join(room_id: str, args: list[str], sender: str, client) -> Non
             )
             return
         assigned_role = matched[0]
-        role_config = settings.roles.get(assigned_role)
+        is_lead = assigned_role in settings.lookups.lead_roles
         existing = session.exec(
             select(IncidentParticipant).where(
                 IncidentParticipant.parent == record.id,
@@ -103,7 +103,7 @@ async def handle_join(room_id: str, args: list[str], sender: str, client) -> Non
 
         display_name = await client.get_display_name_async(sender)
         participant = IncidentParticipant(
-            is_lead=role_config.is_lead if role_config else False,
+            is_lead=is_lead,
             parent=record.id,
             role=assigned_role,
             user_id=sender,
@@ -121,7 +121,7 @@ async def handle_join(room_id: str, args: list[str], sender: str, client) -> Non
     if is_private:
         await client.invite_user_async(incident_channel_id, sender)
 
-    if role_config and role_config.is_lead:
+    if is_lead:
         logger.info(
             "updating topic for incident room", room_id=incident_channel_id, role=assigned_role
         )
@@ -133,7 +133,7 @@ async def handle_join(room_id: str, args: list[str], sender: str, client) -> Non
         )
     else:
         logger.debug(
-            "skipping topic update", role_config=role_config, is_lead=getattr(role_config, "is_lead", None)
+            "skipping topic update", role=assigned_role, is_lead=is_lead
         )
 
     await client.send_text_async(
@@ -210,15 +210,11 @@ async def handle_resolve(room_id: str, args: list[str], client) -> None:
         if not record:
             await client.send_text_async(room_id, f"Incident {incident_id} not found.")
             return
-        final_status = next(
-            (
-                s
-                for s, cfg in __import__(
-                    "incidentbot.configuration.settings", fromlist=["settings"]
-                ).settings.statuses.items()
-                if cfg.final
-            ),
-            "resolved",
+        final_status = (
+            __import__(
+                "incidentbot.configuration.settings", fromlist=["settings"]
+            ).settings.lookups.final_status
+            or "resolved"
         )
         record.status = final_status
         session.add(record)
@@ -2,8 +2,9 @@ import uuid
 
 from datetime import datetime
 from incidentbot.configuration.settings import settings
+from incidentbot.models.pool import InstrumentedQueuePool
 from pydantic import BaseModel
-from sqlalchemy import DateTime, func, text
+from sqlalchemy import DateTime, func, Index, text
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlmodel import (
     create_engine,
@@ -11,17 +12,42 @@ from sqlmodel import (
     Field,
     ForeignKey,
     JSON,
-    LargeBinary,
     Relationship,
     SQLModel,
 )
 from typing import Annotated
 
-engine = create_engine(
-    settings.DATABASE_URI,
-    echo_pool=True,
-    pool_pre_ping=True,
-)
+
+def build_engine(uri: str | None = None):
+    """
+    Create the database engine using the pool settings from Settings
+
+    The engine is shared by Bolt workers, scheduler jobs and the API, so the
+    pool is sized from configuration rather than SQLAlchemy's defaults.
+    """
+
+    uri = uri or settings.DATABASE_URI
+    connect_args = {}
+    if settings.DATABASE_STATEMENT_TIMEOUT_MS and uri.startswith("postgresql"):
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.DATABASE_STATEMENT_TIMEOUT_MS}"
+        )
+
+    return create_engine(
+        uri,
+        connect_args=connect_args,
+        echo=settings.DATABASE_ECHO,
+        echo_pool=settings.DATABASE_ECHO_POOL,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+        pool_recycle=settings.DATABASE_POOL_RECYCLE_SECONDS,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT_SECONDS,
+        poolclass=InstrumentedQueuePool,
+    )
+
+
+engine = build_engine()
 
 
 def db_verify():
@@ -54,7 +80,7 @@ class ApplicationData(SQLModel, table=True):
     json_data: dict | None = Field(
         sa_column=Column(JSON), default_factory=dict
     )
-    name: str
+    name: str = Field(unique=True, index=True)
     updated_at: datetime | None = Field(
         sa_column=Column(
             DateTime(),
@@ -65,12 +91,18 @@ class ApplicationData(SQLModel, table=True):
 
 class IncidentRecord(SQLModel, table=True):
     __tablename__ = "incidentrecord"
+    __table_args__ = (
+        # Backs keyset pagination ordered by (created_at, id)
+        Index("ix_incidentrecord_created_at_id", "created_at", "id"),
+        # Backs lookups by status and the aging incident scan
+        Index("ix_incidentrecord_status_created_at", "status", "created_at"),
+    )
 
     additional_comms_channel: bool | None = None
     additional_comms_channel_id: str | None = None
     additional_comms_channel_link: str | None = None
     boilerplate_message_ts: str | None = None
-    channel_id: str | None = None
+    channel_id: str | None = Field(default=None, unique=True, index=True)
     channel_name: str | None = None
     components: str | None = None
     created_at: datetime = Field(
@@ -109,7 +141,7 @@ class IncidentRecord(SQLModel, table=True):
     severities: list | None = Field(
         sa_column=Column(MutableList.as_mutable(JSON)), default_factory=list
     )
-    slug: str | None = None
+    slug: str | None = Field(default=None, unique=True, index=True)
     status: str | None = None
     statuses: list | None = Field(
         sa_column=Column(MutableList.as_mutable(JSON)), default_factory=list
@@ -128,11 +160,16 @@ class IncidentRecord(SQLModel, table=True):
 class IncidentEventBase(BaseModel):
     """
     IncidentEvent base class, excludes image
+
+    Used for compact timeline reads; image_hash tells whether the event has
+    an image without loading it.
     """
 
     created_at: datetime
     id: uuid.UUID
-    incident_slug: str
+    image_hash: str | None = None
+    image_size: int | None = None
+    incident_slug: str | None = None
     message_ts: str | None = None
     mimetype: str | None = None
     parent: Annotated[
@@ -160,7 +197,10 @@ class IncidentEvent(SQLModel, table=True):
         }
     )
     id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
-    image: bytes | None = Field(sa_column=Column(LargeBinary))
+    # Content hash of the image in the attachment store; bytes are never
+    # kept on the row
+    image_hash: str | None = Field(default=None, index=True)
+    image_size: int | None = None
     incident: IncidentRecord | None = Relationship(
         back_populates="events",
         sa_relationship_kwargs={
@@ -197,6 +237,8 @@ class IncidentEvent(SQLModel, table=True):
 
 
 class IncidentParticipant(SQLModel, table=True):
+    __table_args__ = (Index("ix_incidentparticipant_parent", "parent"),)
+
     created_at: datetime = Field(
         sa_column_kwargs={
             "server_default": text("CURRENT_TIMESTAMP"),
@@ -224,6 +266,8 @@ class IncidentParticipant(SQLModel, table=True):
 
 
 class JiraIssueRecord(SQLModel, table=True):
+    __table_args__ = (Index("ix_jiraissuerecord_parent", "parent"),)
+
     key: str = Field(default=None, primary_key=True)
     parent: Annotated[
         int,
@@ -239,6 +283,8 @@ class JiraIssueRecord(SQLModel, table=True):
 
 
 class GitlabIssueRecord(SQLModel, table=True):
+    __table_args__ = (Index("ix_gitlabissuerecord_parent", "parent"),)
+
     id: str = Field(
         default=None, primary_key=True
     )  # GitLab Issue ID (globally unique)
@@ -256,6 +302,8 @@ class GitlabIssueRecord(SQLModel, table=True):
 
 
 class PagerDutyIncidentRecord(SQLModel, table=True):
+    __table_args__ = (Index("ix_pagerdutyincidentrecord_parent", "parent"),)
+
     created_at: datetime = Field(
         sa_column_kwargs={
             "server_default": text("CURRENT_TIMESTAMP"),
@@ -280,6 +328,8 @@ class PagerDutyIncidentRecord(SQLModel, table=True):
 
 
 class PostmortemRecord(SQLModel, table=True):
+    __table_args__ = (Index("ix_postmortemrecord_parent", "parent"),)
+
     id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     parent: Annotated[
         int,
@@ -293,6 +343,8 @@ class PostmortemRecord(SQLModel, table=True):
 
 
 class StatuspageIncidentRecord(SQLModel, table=True):
+    __table_args__ = (Index("ix_statuspageincidentrecord_parent", "parent"),)
+
     channel_id: str | None = None
     id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     message_ts: str | None = None
@@ -320,6 +372,8 @@ class StatuspageIncidentRecord(SQLModel, table=True):
 
 
 class PhareIncidentRecord(SQLModel, table=True):
+    __table_args__ = (Index("ix_phareincidentrecord_parent", "parent"),)
+
     channel_id: str | None = None
     id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     message_ts: str | None = None
@@ -346,6 +400,59 @@ class PhareIncidentRecord(SQLModel, table=True):
     url: str | None = None
 
 
+class ReminderRecord(SQLModel, table=True):
+    """
+    Schedule state for one configured reminder in one incident
+    """
+
+    slug: str = Field(primary_key=True)
+    reminder_id: str = Field(primary_key=True)
+    dismissed: bool = False
+    due_at: datetime | None = None
+    fired: bool = False
+    snoozed: bool = False
+    updated_at: datetime | None = Field(
+        sa_column=Column(
+            DateTime(),
+            onupdate=func.now(),
+        )
+    )
+
+
+class SchedulerLease(SQLModel, table=True):
+    """
+    Lease naming the node that runs the cluster-wide scheduled jobs
+    """
+
+    name: str = Field(primary_key=True)
+    expires_at: datetime
+    holder: str
+    updated_at: datetime | None = Field(
+        sa_column=Column(
+            DateTime(),
+            onupdate=func.now(),
+        )
+    )
+
+
+class SlackCacheRecord(SQLModel, table=True):
+    """
+    One cached Slack user or channel, keyed by kind ("user" or "channel")
+    and Slack ID
+    """
+
+    data: dict = Field(sa_column=Column(JSON), default_factory=dict)
+    # kind comes first so the primary key also serves lookups by kind
+    kind: str = Field(primary_key=True)
+    id: str = Field(primary_key=True)
+    updated_at: datetime | None = Field(
+        sa_column=Column(
+            DateTime(),
+            onupdate=func.now(),
+        )
+    )
+
+
 def create_models():
     """
     Create Models
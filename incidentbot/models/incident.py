@@ -1,3 +1,5 @@
+import datetime
+
 from incidentbot.configuration.settings import settings
 from incidentbot.logging import logger
 from incidentbot.models.database import (
@@ -11,8 +13,9 @@ from incidentbot.models.database import (
     GitlabIssueRecord,
 )
 from incidentbot.models.slack import User
+from sqlalchemy import Row
 from sqlalchemy.exc import NoResultFound
-from sqlmodel import or_, Session, select
+from sqlmodel import func, or_, Session, select
 
 """
 API Models
@@ -172,11 +175,7 @@ class IncidentDatabaseInterface:
 
         try:
             with Session(engine) as session:
-                final_statuses = [
-                    status
-                    for status, config in settings.statuses.items()
-                    if config.final
-                ]
+                final_statuses = settings.lookups.final_statuses
 
                 if final_statuses:
                     incidents = session.exec(
@@ -192,6 +191,89 @@ class IncidentDatabaseInterface:
             logger.exception("incident lookup query failed", error=error)
             return []
 
+    @staticmethod
+    def list_aging(
+        created_before: datetime.datetime,
+        ignore_statuses: list[str] | None = None,
+    ) -> list[Row]:
+        """
+        Return open incidents created before a point in time, oldest first
+
+        Only the channel_id, created_at, severity and status columns are
+        loaded. Open statuses are listed explicitly rather than excluding the
+        final ones, so the (status, created_at) index serves the whole query.
+
+        Parameters:
+            created_before (datetime.datetime): Naive local time, as created_at
+                is stored
+            ignore_statuses (list[str]): Open statuses to leave out
+        """
+
+        open_statuses = [
+            status
+            for status in settings.lookups.open_statuses
+            if status not in (ignore_statuses or [])
+        ]
+
+        try:
+            with Session(engine) as session:
+                return session.exec(
+                    select(
+                        IncidentRecord.channel_id,
+                        IncidentRecord.created_at,
+                        IncidentRecord.severity,
+                        IncidentRecord.status,
+                    )
+                    .where(
+                        IncidentRecord.status.in_(open_statuses),
+                        IncidentRecord.created_at < created_before,
+                    )
+                    .order_by(IncidentRecord.created_at)
+                ).all()
+        except Exception as error:
+            logger.exception("incident lookup (aging) query failed", error=error)
+            return []
+
+    @staticmethod
+    def list_open_with_participant_counts(
+        slugs: list[str] | None = None,
+    ) -> list[tuple[IncidentRecord, int]] | None:
+        """
+        Return open (non-final-status) incidents together with how many
+        participants hold a role in each, in a single query
+
+        Returns None rather than an empty list when the query fails, so
+        callers can tell "no open incidents" apart from an error.
+
+        Parameters:
+            slugs (list[str]): Only return these incidents
+        """
+
+        final_statuses = settings.lookups.final_statuses
+        query = (
+            select(IncidentRecord, func.count(IncidentParticipant.id))
+            .outerjoin(
+                IncidentParticipant,
+                IncidentParticipant.parent == IncidentRecord.id,
+            )
+            .group_by(IncidentRecord.id)
+        )
+        if final_statuses:
+            query = query.filter(IncidentRecord.status.not_in(final_statuses))
+        if slugs is not None:
+            query = query.filter(IncidentRecord.slug.in_(slugs))
+
+        try:
+            with Session(engine) as session:
+                return [
+                    (record, count) for record, count in session.exec(query)
+                ]
+        except Exception as error:
+            logger.exception(
+                "incident lookup (participant counts) query failed", error=error
+            )
+            return None
+
     @staticmethod
     def list_pagerduty_incident_records(
         id: int | None = None,
@@ -226,11 +308,7 @@ class IncidentDatabaseInterface:
             limit (int): How many incidents to return (default 5)
         """
 
-        final_statuses = [
-            status
-            for status, config in settings.statuses.items()
-            if config.final
-        ]
+        final_statuses = settings.lookups.final_statuses
 
         try:
             with Session(engine) as session:
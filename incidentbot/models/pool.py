@@ -0,0 +1,75 @@
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from incidentbot.util import metrics
+from incidentbot.util.tracing import start_span
+
+pool_checkout_wait = metrics.histogram(
+    "incidentbot_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+pool_checked_out = metrics.gauge(
+    "incidentbot_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+)
+pool_timeouts = metrics.counter(
+    "incidentbot_db_pool_timeouts_total",
+    "Checkouts that gave up after waiting pool_timeout for a connection",
+)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that records how long callers wait for a connection and how
+    many are checked out, so pool exhaustion shows up in metrics before it
+    shows up as timeouts
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+            pool_checked_out.set(self.checkedout())
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        pool_checked_out.set(self.checkedout())
+
+
+def _statement_operation(statement: str) -> str:
+    words = statement.split(None, 1)
+
+    return words[0].lower() if words else "execute"
+
+
+# Every statement run through any engine is timed as a "db" span, labelled
+# with its leading keyword (select, insert, ...) to keep label values bounded
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_span(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._incidentbot_span = start_span("db", _statement_operation(statement))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement_span(conn, cursor, statement, parameters, context, executemany):
+    statement_span = getattr(context, "_incidentbot_span", None)
+    if statement_span is not None:
+        statement_span.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_statement_span(exception_context):
+    statement_span = getattr(
+        exception_context.execution_context, "_incidentbot_span", None
+    )
+    if statement_span is not None:
+        statement_span.end(exception_context.original_exception)
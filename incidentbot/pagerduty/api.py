@@ -1,5 +1,10 @@
 import json
+import threading
+import time
 
+import httpx
+
+from concurrent.futures import ThreadPoolExecutor
 from incidentbot.configuration.settings import settings
 from incidentbot.logging import logger
 from incidentbot.models.database import (
@@ -8,6 +13,8 @@ from incidentbot.models.database import (
     IncidentRecord,
     PagerDutyIncidentRecord,
 )
+from incidentbot.pagerduty.client import client_pool
+from incidentbot.slack.directory import user_directory
 from incidentbot.util.gen import fetch_timestamp
 from pagerduty import RestApiV2Client, Error as PDClientError
 from sqlalchemy import update
@@ -20,10 +27,7 @@ class PagerDutyInterface:
 
     @classmethod
     def session(self) -> RestApiV2Client:
-        return RestApiV2Client(
-            settings.PAGERDUTY_API_TOKEN,
-            default_from=settings.PAGERDUTY_API_USERNAME,
-        )
+        return client_pool.get()
 
     @property
     def escalation_policy_id(self) -> str:
@@ -31,10 +35,9 @@ class PagerDutyInterface:
         Get the ID of an escalation policy
         """
 
-        escalation_policies = self.session().iter_all("escalation_policies")
-        for policy in escalation_policies:
-            if policy.get("name") == self.escalation_policy:
-                return policy.get("id")
+        policy = escalation_policy_catalog.get(self.escalation_policy)
+        if policy:
+            return policy.get("id")
 
     @property
     def service_for_escalation_policy(self) -> str:
@@ -42,81 +45,101 @@ class PagerDutyInterface:
         Determine which service is associated with an escalation policy
         """
 
-        escalation_policies = self.session().iter_all("escalation_policies")
-        for policy in escalation_policies:
-            if policy.get("name") == self.escalation_policy:
-                return policy.get("services")[0].get("id")
+        policy = escalation_policy_catalog.get(self.escalation_policy)
+        if policy:
+            return policy.get("service_id")
 
     @classmethod
-    def get_on_calls(self, short: bool = False) -> dict:
+    def fetch_on_calls(self) -> list[dict]:
         """
-        Given a PagerDuty instance, loop through oncall schedules and return info
-        on each one identifying who to contact when run
+        Retrieve every current on-call entry from PagerDuty in a single
+        paginated sweep
 
-        This is stored in the database and will only refresh when this function is
-        called to avoid API abuse
+        User objects are included so Slack users can be matched by email
+        """
+
+        return list(
+            self.session().iter_all(
+                "oncalls", params={"include[]": ["users"]}
+            )
+        )
+
+    @staticmethod
+    def _resolve_slack_user_id(user: dict) -> list[str]:
+        """
+        Match a PagerDuty user to a Slack user via the user directory, by email
+        first and then by name
+        """
+
+        match = user_directory.get_by_email(
+            user.get("email")
+        ) or user_directory.get_by_real_name(
+            user.get("name") or user.get("summary")
+        )
+
+        return [match.get("id")] if match else []
+
+    @classmethod
+    def build_on_call_views(self, oncalls: list[dict]) -> tuple[dict, dict]:
+        """
+        Group on-call entries by escalation policy in one pass and return both
+        the full on-call view and the auto page mapping
+
+        Parameters:
+            oncalls (list[dict]): On-call entries as returned by fetch_on_calls
         """
 
         on_call = {}
         auto_mapping = {}
 
-        try:
-            with Session(engine) as session:
-                slack_users_from_dict = session.exec(
-                    select(ApplicationData).filter(
-                        ApplicationData.name == "slack_users"
-                    )
-                ).first()
-        except Exception as error:
-            logger.exception(
-                "error retrieving list of slack users from db", error=error
+        for item in oncalls:
+            policy = item.get("escalation_policy") or {}
+            policy_name = policy.get("summary")
+
+            entries = on_call.setdefault(policy_name, [])
+            auto_mapping[policy_name] = policy_name
+
+            if item.get("start") is None or item.get("end") is None:
+                continue
+
+            user = item.get("user") or {}
+            entries.append(
+                {
+                    "escalation_level": item.get("escalation_level"),
+                    "escalation_policy": policy_name,
+                    "escalation_policy_id": policy.get("id"),
+                    "user": user.get("summary"),
+                    "start": item.get("start"),
+                    "end": item.get("end"),
+                    "slack_user_id": self._resolve_slack_user_id(user),
+                }
             )
 
-        slack_users = {
-            user.get("real_name"): user.get("id")
-            for user in slack_users_from_dict
-            if user.__contains__("real_name")
-        }
+        for entries in on_call.values():
+            entries.sort(key=lambda x: x.get("escalation_level"))
+
+        logger.info("pagerduty returned schedules", count=len(on_call))
+
+        return on_call, auto_mapping
+
+    @classmethod
+    def get_on_calls(self, short: bool = False) -> dict:
+        """
+        Given a PagerDuty instance, loop through oncall schedules and return info
+        on each one identifying who to contact when run
 
-        oncalls = self.session().iter_all("oncalls")
+        This is stored in the database and will only refresh when this function is
+        called to avoid API abuse
+        """
 
-        if oncalls is None:
+        oncalls = self.fetch_on_calls()
+
+        if not oncalls:
             logger.warning("pagerduty schedule information returned as empty")
 
             return {}
-        else:
-            for item in oncalls:
-                on_call[item.get("escalation_policy").get("summary")] = sorted(
-                    [
-                        {
-                            "escalation_level": item.get("escalation_level"),
-                            "escalation_policy": item.get(
-                                "escalation_policy"
-                            ).get("summary"),
-                            "escalation_policy_id": item.get(
-                                "escalation_policy"
-                            ).get("id"),
-                            "user": item.get("user").get("summary"),
-                            "start": item.get("start"),
-                            "end": item.get("end"),
-                            "slack_user_id": [
-                                val
-                                for key, val in slack_users.items()
-                                if item.get("user").get("summary") in key
-                            ],
-                        }
-                        for item in self.session().iter_all("oncalls")
-                        if item.get("start") is not None
-                        and item.get("end") is not None
-                    ],
-                    key=lambda x: x.get("escalation_level"),
-                )
 
-                auto_mapping[item.get("escalation_policy").get("summary")] = (
-                    item.get("escalation_policy").get("summary")
-                )
-
-        logger.info("pagerduty returned schedules", count=len(on_call))
+        on_call, auto_mapping = self.build_on_call_views(oncalls)
 
         if short:
             return auto_mapping
@@ -140,7 +163,9 @@ class PagerDutyInterface:
             priority (str): The priority of the page
         """
 
-        if self.escalation_policy_id is not None:
+        policy = escalation_policy_catalog.get(self.escalation_policy)
+
+        if policy is not None:
             from incidentbot.slack.client import slack_workspace_id
 
             pagerduty_incident_data = {
@@ -148,7 +173,7 @@ class PagerDutyInterface:
                     "type": "incident",
                     "title": f"Slack incident {channel_name} has been started and a page has been issued for assistance.",
                     "service": {
-                        "id": self.service_for_escalation_policy,
+                        "id": policy.get("service_id"),
                         "type": "service_reference",
                     },
                     "urgency": priority,
@@ -159,7 +184,7 @@ class PagerDutyInterface:
                         + f"You were paged by {paging_user}. Link: https://{slack_workspace_id}.slack.com/archives/{channel_id}",
                     },
                     "escalation_policy": {
-                        "id": self.escalation_policy_id,
+                        "id": policy.get("id"),
                         "type": "escalation_policy_reference",
                     },
                 }
@@ -244,71 +269,50 @@ class PagerDutyInterface:
         in the database
 
         This stores both a comprehensive list of schedule information and a mapping made
-        available to the auto page functions
+        available to the auto page functions, both built from a single fetch
         """
 
-        with Session(engine) as session:
-            try:
-                record_name = "pagerduty_oc_data"
-
-                # Create the row if it doesn't exist
-                if not session.exec(
-                    select(ApplicationData).filter(
-                        ApplicationData.name == record_name
-                    )
-                ).first():
-                    try:
-                        row = ApplicationData(name=record_name)
-                        session.add(row)
-                        session.commit()
-                    except Exception as error:
-                        logger.exception(
-                            "applicationdata row create failed", record_name=record_name, error=error
-                        )
-
-                session.exec(
-                    update(ApplicationData)
-                    .where(ApplicationData.name == record_name)
-                    .values(
-                        json_data=self.get_on_calls(),
-                    )
-                )
-                session.commit()
-            except Exception as error:
-                logger.exception(
-                    "applicationdata row edit failed", record_name=record_name, error=error
-                )
+        oncalls = self.fetch_on_calls()
 
-            try:
-                record_name = "pagerduty_auto_mapping"
+        if not oncalls:
+            logger.warning("pagerduty schedule information returned as empty")
+            on_call, auto_mapping = {}, {}
+        else:
+            on_call, auto_mapping = self.build_on_call_views(oncalls)
 
-                # Create the row if it doesn't exist
-                if not session.exec(
-                    select(ApplicationData).filter(
-                        ApplicationData.name == record_name
-                    )
-                ).first():
-                    try:
-                        row = ApplicationData(name=record_name)
-                        session.add(row)
-                        session.commit()
-                    except Exception as error:
-                        logger.exception(
-                            "applicationdata row create failed", record_name=record_name, error=error
+        with Session(engine) as session:
+            for record_name, json_data in (
+                ("pagerduty_oc_data", on_call),
+                ("pagerduty_auto_mapping", auto_mapping),
+            ):
+                try:
+                    # Create the row if it doesn't exist
+                    if not session.exec(
+                        select(ApplicationData).filter(
+                            ApplicationData.name == record_name
                         )
+                    ).first():
+                        try:
+                            row = ApplicationData(name=record_name)
+                            session.add(row)
+                            session.commit()
+                        except Exception as error:
+                            logger.exception(
+                                "applicationdata row create failed", record_name=record_name, error=error
+                            )
 
-                session.exec(
-                    update(ApplicationData)
-                    .where(ApplicationData.name == record_name)
-                    .values(
-                        json_data=self.get_on_calls(short=True),
+                    session.exec(
+                        update(ApplicationData)
+                        .where(ApplicationData.name == record_name)
+                        .values(
+                            json_data=json_data,
+                        )
+                    )
+                    session.commit()
+                except Exception as error:
+                    logger.exception(
+                        "applicationdata row edit failed", record_name=record_name, error=error
                     )
-                )
-                session.commit()
-            except Exception as error:
-                logger.exception(
-                    "applicationdata row edit failed", record_name=record_name, error=error
-                )
 
     @classmethod
     def test(self) -> list[dict]:
@@ -316,3 +320,150 @@ class PagerDutyInterface:
             return [sch for sch in self.session().iter_all("oncalls")]
         except Exception as error:
             logger.exception("error during validation of pagerduty auth", error=error)
+
+
+class EscalationPolicyCatalog:
+    """
+    TTL-cached catalog of PagerDuty escalation policies indexed by name and id,
+    along with the first service attached to each
+
+    The catalog is refreshed by the update_pagerduty_oc_data job and lazily
+    whenever it is read after the TTL has elapsed, so paging only needs to issue
+    the incident POST
+    """
+
+    def __init__(self, ttl_seconds: int | None = None):
+        self._ttl_seconds = ttl_seconds
+        self._policies: dict[str, dict] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def ttl_seconds(self) -> int:
+        if self._ttl_seconds is not None:
+            return self._ttl_seconds
+
+        if settings.integrations and settings.integrations.pagerduty:
+            return (
+                settings.integrations.pagerduty.escalation_policy_cache_minutes
+                * 60
+            )
+
+        return 3600
+
+    @property
+    def expired(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self.ttl_seconds
+        )
+
+    def refresh(self):
+        """
+        Rebuild the catalog from a single sweep of the escalation policies API
+        """
+
+        policies = {}
+        for policy in PagerDutyInterface.session().iter_all(
+            "escalation_policies"
+        ):
+            services = policy.get("services") or []
+            entry = {
+                "id": policy.get("id"),
+                "name": policy.get("name"),
+                "service_id": services[0].get("id") if services else None,
+            }
+            policies[entry["id"]] = entry
+            policies[entry["name"]] = entry
+
+        with self._lock:
+            self._policies = policies
+            self._loaded_at = time.monotonic()
+
+        logger.info(
+            "refreshed pagerduty escalation policy catalog",
+            count=len({p["id"] for p in policies.values()}),
+        )
+
+    def get(self, name_or_id: str) -> dict | None:
+        """
+        Return an escalation policy by name or id
+
+        Parameters:
+            name_or_id (str): Escalation policy name or id
+        """
+
+        if self.expired:
+            try:
+                self.refresh()
+            except (PDClientError, httpx.HTTPError) as error:
+                # Keep serving the policies loaded last time, if any
+                logger.exception(
+                    "error refreshing pagerduty escalation policy catalog", error=error
+                )
+
+        return self._policies.get(name_or_id)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+escalation_policy_catalog = EscalationPolicyCatalog()
+
+
+def page_escalation_policies(
+    escalation_policies: list[str],
+    channel_id: str,
+    channel_name: str,
+    paging_user: str,
+    priority: str,
+) -> dict[str, str | None]:
+    """
+    Page several escalation policies concurrently and return the PagerDuty
+    incident URL for each (None when paging failed)
+
+    Parameters:
+        escalation_policies (list[str]): Escalation policy names or ids
+        channel_id (str): The ID of the incident channel
+        channel_name (str): The name of the incident channel
+        paging_user (str): The user issuing the page
+        priority (str): The priority of the page
+    """
+
+    if not escalation_policies:
+        return {}
+
+    # Load the catalog once up front rather than racing to refresh it per
+    # worker. Paging still goes ahead if it cannot be loaded: each worker looks
+    # its policy up again and skips it if it is unknown
+    try:
+        escalation_policy_catalog.get(escalation_policies[0])
+    except Exception as error:
+        logger.exception(
+            "error loading pagerduty escalation policy catalog before paging",
+            error=error,
+        )
+
+    def _page(escalation_policy: str) -> str | None:
+        try:
+            return PagerDutyInterface(
+                escalation_policy=escalation_policy
+            ).page(
+                channel_id=channel_id,
+                channel_name=channel_name,
+                paging_user=paging_user,
+                priority=priority,
+            )
+        except Exception as error:
+            logger.exception(
+                "error paging escalation policy", policy=escalation_policy, error=error
+            )
+
+    with ThreadPoolExecutor(
+        max_workers=min(len(escalation_policies), 8),
+        thread_name_prefix="pagerduty-page",
+    ) as executor:
+        results = executor.map(_page, escalation_policies)
+
+        return dict(zip(escalation_policies, results, strict=True))
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+
+import httpx
+
+from incidentbot.configuration.settings import settings
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+from incidentbot.util.tracing import span
+from pagerduty import RestApiV2Client
+
+pagerduty_requests = metrics.counter(
+    "incidentbot_pagerduty_requests_total",
+    "PagerDuty API requests by method and response status",
+    ("method", "status"),
+)
+pagerduty_request_latency = metrics.histogram(
+    "incidentbot_pagerduty_request_duration_seconds",
+    "PagerDuty API request latency",
+    ("method",),
+)
+pagerduty_rate_limited = metrics.counter(
+    "incidentbot_pagerduty_rate_limited_total",
+    "PagerDuty API responses with status 429",
+)
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    """
+    Work out how long to wait before retrying a rate limited request
+
+    PagerDuty sends ratelimit-reset (seconds until the window resets) and may
+    send Retry-After; fall back to jittered exponential backoff otherwise.
+    """
+
+    for header in ("retry-after", "ratelimit-reset"):
+        value = response.headers.get(header)
+        if value:
+            try:
+                return max(float(value), 0) + random.uniform(0, 0.5)
+            except ValueError:
+                pass
+
+    return min(2**attempt, 30) * random.uniform(0.5, 1.0)
+
+
+class RateLimitAwareTransport(httpx.HTTPTransport):
+    """
+    HTTP transport that records request metrics and retries 429 responses a
+    bounded number of times, waiting as long as PagerDuty asks
+    """
+
+    def __init__(self, max_rate_limit_retries: int = 3, **kwargs):
+        super().__init__(**kwargs)
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            with span("pagerduty", request.method, url=request.url.path):
+                response = super().handle_request(request)
+            pagerduty_request_latency.observe(
+                time.perf_counter() - start, method=request.method
+            )
+            pagerduty_requests.inc(
+                method=request.method, status=response.status_code
+            )
+
+            if response.status_code != 429:
+                return response
+
+            pagerduty_rate_limited.inc()
+            if attempt >= self.max_rate_limit_retries:
+                logger.warning(
+                    "pagerduty rate limit retries exhausted",
+                    url=str(request.url),
+                    attempts=attempt + 1,
+                )
+                return response
+
+            delay = _retry_delay(response, attempt)
+            logger.warning(
+                "rate limited by pagerduty api, retrying",
+                url=str(request.url),
+                delay_seconds=round(delay, 2),
+            )
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+
+class PagerDutyClientPool:
+    """
+    Owns the shared PagerDuty REST client used by the integration
+
+    RestApiV2Client is an httpx.Client, which is thread-safe and keeps a pool of
+    keep-alive connections, so one instance is shared by every caller instead of
+    paying for a new session and TLS handshake on each call.
+    """
+
+    def __init__(self):
+        self._client: RestApiV2Client | None = None
+        self._lock = threading.Lock()
+
+    def _build(self) -> RestApiV2Client:
+        config = (
+            settings.integrations.pagerduty
+            if settings.integrations and settings.integrations.pagerduty
+            else None
+        )
+        max_connections = config.max_connections if config else 10
+        max_rate_limit_retries = config.max_rate_limit_retries if config else 3
+
+        client = RestApiV2Client(
+            settings.PAGERDUTY_API_TOKEN,
+            default_from=settings.PAGERDUTY_API_USERNAME,
+            transport=RateLimitAwareTransport(
+                max_rate_limit_retries=max_rate_limit_retries,
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+        # The transport already honored PagerDuty's rate-limit headers; give up
+        # after one more attempt instead of the client's default of retrying
+        # 429s forever.
+        client.retry[429] = 1
+
+        return client
+
+    def get(self) -> RestApiV2Client:
+        client = self._client
+        if client is not None and not client.is_closed:
+            return client
+
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = self._build()
+
+            return self._client
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+
+client_pool = PagerDutyClientPool()
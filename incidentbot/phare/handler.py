@@ -6,6 +6,7 @@ from incidentbot.logging import logger
 from incidentbot.models.database import engine, PhareIncidentRecord
 from incidentbot.models.incident import IncidentDatabaseInterface
 from incidentbot.slack.client import slack_web_client
+from incidentbot.util.tracing import traced
 from sqlmodel import Session, select
 from typing import Any
 
@@ -66,6 +67,7 @@ class PhareIncident:
             "exclude_from_downtime": self.request_data.get("exclude_from_downtime", False),
         }
 
+    @traced("phare", "create_incident")
     def start(self) -> str | None:
         """
         Create the Phare incident and store a record in the DB
@@ -137,6 +139,7 @@ class PhareIncidentUpdate:
     """
 
     @staticmethod
+    @traced("phare", "update_impact")
     def update_impact(channel_id: str, impact: str):
         """
         Change the impact level of a Phare incident via partial update.
@@ -167,6 +170,7 @@ class PhareIncidentUpdate:
             session.commit()
 
     @staticmethod
+    @traced("phare", "update_incident")
     def update(channel_id: str, content: str, state: str):
         """
         Update or recover a Phare incident
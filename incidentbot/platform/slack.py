@@ -1,5 +1,6 @@
 from incidentbot.logging import logger
 from incidentbot.platform.base import PlatformAdapter
+from incidentbot.slack.directory import channel_directory
 from typing import Any
 
 
@@ -24,6 +25,7 @@ class SlackAdapter(PlatformAdapter):
         try:
             resp = self._client.conversations_create(name=name, is_private=private)
             channel = resp.get("channel")
+            channel_directory.upsert(channel)
             return {"id": channel["id"], "name": channel["name"]}
         except slack_sdk.errors.SlackApiError as error:
             if error.response.get("error") == "name_taken":
@@ -39,17 +41,18 @@ class SlackAdapter(PlatformAdapter):
     def _find_channel_by_name(self, name: str) -> dict:
         """Look up an existing Slack channel by name; unarchive it if necessary."""
         import slack_sdk.errors
-        from incidentbot.slack.client import get_slack_channel_list_db
-        from incidentbot.util import gen
-
-        # Fast path: check the cached channel list
-        channels = get_slack_channel_list_db() or []
-        idx = gen.find_index_in_list(channels, "name", name)
-        if idx != -1:
-            ch = channels[idx]
+
+        # Fast path: the channel directory, which includes archived channels
+        ch = channel_directory.get_by_name(name, include_archived=True)
+        if ch is not None and ch["name"] == name:
+            if ch.get("is_archived"):
+                logger.info("unarchiving existing channel", name=name, channel_id=ch["id"])
+                self._client.conversations_unarchive(channel=ch["id"])
+                channel_directory.set_archived(ch["id"], False)
             return {"id": ch["id"], "name": ch["name"]}
 
-        # Slow path: walk the full list including archived channels
+        # Slow path: the directory missed the channel (e.g. an event was not
+        # delivered); walk the full list including archived channels
         try:
             cursor = None
             while True:
@@ -62,6 +65,7 @@ class SlackAdapter(PlatformAdapter):
                         if ch.get("is_archived"):
                             logger.info("unarchiving existing channel", name=name, channel_id=ch["id"])
                             self._client.conversations_unarchive(channel=ch["id"])
+                        channel_directory.upsert({**ch, "is_archived": False})
                         return {"id": ch["id"], "name": ch["name"]}
                 cursor = resp.get("response_metadata", {}).get("next_cursor")
                 if not cursor:
@@ -1,15 +1,61 @@
 import datetime
+import functools
+import time
 
 from incidentbot.configuration.settings import settings
 from apscheduler.job import Job
 from incidentbot.logging import logger
 from incidentbot.models.incident import IncidentDatabaseInterface
+from incidentbot.scheduler.leader import leader_elector, leader_only
 from apscheduler.schedulers.background import BackgroundScheduler
-from incidentbot.util import gen
+from incidentbot.util import metrics
+from collections.abc import Callable
 from zoneinfo import ZoneInfo
 
 configured_timezone = settings.options.timezone
 
+job_duration = metrics.histogram(
+    "incidentbot_scheduler_job_duration_seconds",
+    "Time taken by each run of a scheduled job",
+    ("job",),
+)
+job_errors = metrics.counter(
+    "incidentbot_scheduler_job_errors_total",
+    "Scheduled job runs that raised",
+    ("job",),
+)
+
+
+def _timed_job(func: Callable) -> Callable:
+    # Labelled by function rather than job id so jobs added with generated
+    # ids share a label
+    name = getattr(func, "__name__", "unknown")
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            job_errors.inc(job=name)
+            raise
+        finally:
+            job_duration.observe(time.perf_counter() - start, job=name)
+
+    return run
+
+
+def _timed_add_job(add_job: Callable) -> Callable:
+    @functools.wraps(add_job)
+    def add(func, *args, cluster_wide: bool = True, **kwargs):
+        job = _timed_job(func)
+        if cluster_wide:
+            job = leader_only(leader_elector, job)
+
+        return add_job(job, *args, **kwargs)
+
+    return add
+
 
 class TaskScheduler:
     def __init__(self):
@@ -19,6 +65,10 @@ class TaskScheduler:
         self.scheduler = BackgroundScheduler(
             timezone=ZoneInfo(configured_timezone),
         )
+        # Every job is added through add_job, so wrapping it times each run.
+        # Cluster-wide jobs, the default, only run on the replica holding the
+        # scheduler lease; pass cluster_wide=False for per-process upkeep
+        self.scheduler.add_job = _timed_add_job(self.scheduler.add_job)
 
     def delete_job(self, job_to_delete: str):
         try:
@@ -48,10 +98,16 @@ class TaskScheduler:
     def start(self):
         logger.info("starting task scheduler")
         try:
+            leader_elector.start()
             self.scheduler.start()
         except Exception as error:
             logger.exception("error starting task scheduler", error=error)
 
+    def shutdown(self):
+        self.scheduler.shutdown(wait=False)
+        # Hand the lease to another replica rather than letting it expire
+        leader_elector.stop()
+
 
 process = TaskScheduler()
 
@@ -85,62 +141,50 @@ def scrape_for_aging_incidents():
         {"type": "divider"},
     ]
 
-    # Find open incidents and append them to a list to add to the message if they're older
-    # than the max age
-    open_incidents = IncidentDatabaseInterface.list_all()
-
-    # Exclude statuses if provided
-    if settings.jobs.scrape_for_aging_incidents.ignore_statuses:
-        open_incidents = [
-            i
-            for i in open_incidents
-            if i.status
-            not in settings.jobs.scrape_for_aging_incidents.ignore_statuses
-        ]
+    # Open incidents older than the max age, oldest first
+    now = datetime.datetime.now()
+    aging_incidents = IncidentDatabaseInterface.list_aging(
+        created_before=now - datetime.timedelta(days=max_age),
+        ignore_statuses=settings.jobs.scrape_for_aging_incidents.ignore_statuses,
+    )
 
     formatted_incidents = []
-    for inc in open_incidents:
-        created_at = datetime.datetime.strptime(
-            inc.created_at, gen.timestamp_fmt
+    for inc in aging_incidents:
+        time_open = now - inc.created_at
+        logger.info(
+            "incident is older than max age and will be added to the weekly reminder",
+            channel_id=inc.channel_id,
+            max_age_days=max_age,
         )
-        now = datetime.datetime.now()
-        time_open = now - created_at
-        old = datetime.timedelta(days=max_age) < time_open
-        if old:
-            logger.info(
-                "incident is older than max age and will be added to the weekly reminder",
-                channel_id=inc.channel_id,
-                max_age_days=max_age,
-            )
 
-            formatted_incidents.append(
-                {
-                    "type": "section",
-                    "fields": [
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Incident Name:* <#{inc.channel_id}>",
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Current Severity:* {inc.severity.upper()}",
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Creation Time:* {inc.created_at}",
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Current Status:* {inc.status.title()}",
-                        },
-                        {
-                            "type": "mrkdwn",
-                            "text": f"*Time Open:* {time_open}",
-                        },
-                    ],
-                }
-            )
-            formatted_incidents.append({"type": "divider"})
+        formatted_incidents.append(
+            {
+                "type": "section",
+                "fields": [
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Incident Name:* <#{inc.channel_id}>",
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Current Severity:* {inc.severity.upper()}",
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Creation Time:* {inc.created_at}",
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Current Status:* {inc.status.title()}",
+                    },
+                    {
+                        "type": "mrkdwn",
+                        "text": f"*Time Open:* {time_open}",
+                    },
+                ],
+            }
+        )
+        formatted_incidents.append({"type": "divider"})
     if len(formatted_incidents) > 0:
         from incidentbot.slack.client import (
             get_digest_channel_id,
@@ -203,6 +247,55 @@ def update_slack_user_list():
         )
 
 
+def sweep_reminders():
+    """
+    Sends incident reminders that have fallen due
+    """
+    from incidentbot.incident.reminders import reminder_sweeper
+
+    try:
+        reminder_sweeper.refresh()
+        reminder_sweeper.sweep()
+    except Exception as error:
+        logger.exception("error sending reminders in scheduled job", error=error)
+
+
+if settings.reminders:
+    process.scheduler.add_job(
+        id="sweep_reminders",
+        func=sweep_reminders,
+        trigger="interval",
+        name="Send incident reminders that are due",
+        seconds=settings.jobs.sweep_reminders.interval_seconds,
+        replace_existing=True,
+    )
+
+def refresh_slack_cache():
+    """
+    Picks up Slack cache changes other replicas have written
+    """
+    from incidentbot.slack.directory import channel_directory, user_directory
+
+    try:
+        user_directory.refresh()
+        channel_directory.refresh()
+    except Exception as error:
+        logger.exception(
+            "error refreshing slack cache in scheduled job", error=error
+        )
+
+
+if settings.platform == "slack":
+    process.scheduler.add_job(
+        id="refresh_slack_cache",
+        func=refresh_slack_cache,
+        trigger="interval",
+        name="Read back Slack cache changes from other replicas",
+        seconds=settings.jobs.update_slack_cache.refresh_seconds,
+        replace_existing=True,
+        cluster_wide=False,
+    )
+
 if settings.platform == "slack" and settings.jobs.update_slack_cache.enabled:
     process.scheduler.add_job(
         id="update_slack_channel_list",
@@ -228,13 +321,17 @@ if (
     and settings.integrations.pagerduty.enabled
     and settings.jobs.update_pagerduty_oc_data.enabled
 ):
-    from incidentbot.pagerduty.api import PagerDutyInterface
+    from incidentbot.pagerduty.api import (
+        escalation_policy_catalog,
+        PagerDutyInterface,
+    )
 
     pagerduty_interface = PagerDutyInterface()
 
     def update_pagerduty_oc_data():
         """
-        Uses PagerDuty API to fetch information about on-call schedules
+        Uses PagerDuty API to fetch information about on-call schedules and
+        escalation policies
         """
 
         logger.info("running task update_pagerduty_oc_data")
@@ -246,6 +343,13 @@ if (
                 "error updating pagerduty on-call information in scheduled job", error=error
             )
 
+        try:
+            escalation_policy_catalog.refresh()
+        except Exception as error:
+            logger.exception(
+                "error updating pagerduty escalation policies in scheduled job", error=error
+            )
+
     process.scheduler.add_job(
         id="update_pagerduty_oc_data",
         func=update_pagerduty_oc_data,
@@ -0,0 +1,250 @@
+import datetime
+import functools
+import os
+import socket
+import threading
+import time
+
+from collections.abc import Callable
+from incidentbot.configuration.settings import settings
+from incidentbot.logging import logger
+from incidentbot.models.database import engine, SchedulerLease
+from incidentbot.util import metrics
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+leader_gauge = metrics.gauge(
+    "incidentbot_scheduler_leader",
+    "1 while this node holds the scheduler lease and runs scheduled jobs",
+    ("node",),
+)
+leader_changes = metrics.counter(
+    "incidentbot_scheduler_leader_changes_total",
+    "Times this node gained or lost the scheduler lease",
+    ("node", "change"),
+)
+skipped_runs = metrics.counter(
+    "incidentbot_scheduler_job_skipped_total",
+    "Scheduled job runs skipped because another node holds the lease",
+    ("job",),
+)
+
+
+def _to_db(ts: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(
+        ts, datetime.UTC
+    ).replace(tzinfo=None)
+
+
+def default_node_id() -> str:
+    return settings.SCHEDULER_NODE_ID or f"{socket.gethostname()}-{os.getpid()}"
+
+
+class LeaderElector:
+    """
+    Decides which of several replicas runs the cluster-wide scheduled jobs
+
+    The lease is a row in the schedulerlease table naming its holder and when
+    it expires. A background thread tries to take or renew it every
+    renew_seconds with a single conditional update, which only succeeds for
+    the current holder or once the lease has expired, so at most one node
+    holds it at a time. A node that stops renewing loses the lease after
+    lease_seconds; one that shuts down cleanly releases it so another node
+    takes over on its next attempt.
+
+    Expiry times come from each node's clock, so lease_seconds must comfortably
+    exceed the clock skew between nodes.
+    """
+
+    def __init__(
+        self,
+        name: str = "scheduler",
+        node_id: str | None = None,
+        lease_seconds: float | None = None,
+        renew_seconds: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.name = name
+        self._node_id = node_id
+        self._lease_seconds = lease_seconds
+        self._renew_seconds = renew_seconds
+        self._clock = clock
+        # Local deadline for the lease we last took or renewed
+        self._held_until = 0.0
+        self._leader = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def node_id(self) -> str:
+        if self._node_id is None:
+            self._node_id = default_node_id()
+
+        return self._node_id
+
+    @property
+    def enabled(self) -> bool:
+        return settings.jobs.leader_election.enabled
+
+    def _timings(self) -> tuple[float, float]:
+        config = settings.jobs.leader_election
+        lease = self._lease_seconds
+        if lease is None:
+            lease = config.lease_seconds
+        renew = self._renew_seconds
+        if renew is None:
+            renew = config.renew_seconds
+
+        return lease, min(renew, lease / 2)
+
+    @property
+    def is_leader(self) -> bool:
+        """
+        Whether this node should run scheduled jobs right now
+        """
+
+        if not self.enabled:
+            return True
+
+        return self._leader and self._clock() < self._held_until
+
+    def _set_leader(self, leader: bool):
+        if leader != self._leader:
+            logger.info(
+                "scheduler leadership changed",
+                node=self.node_id,
+                leader=leader,
+            )
+            leader_changes.inc(
+                node=self.node_id, change="acquired" if leader else "lost"
+            )
+        self._leader = leader
+        leader_gauge.set(1 if leader else 0, node=self.node_id)
+
+    def try_acquire(self) -> bool:
+        """
+        Take the lease if it is free or expired, or renew it if this node
+        already holds it
+        """
+
+        lease_seconds, _ = self._timings()
+        now = self._clock()
+        expires_at = _to_db(now + lease_seconds)
+
+        try:
+            with Session(engine) as session:
+                result = session.exec(
+                    update(SchedulerLease)
+                    .where(
+                        SchedulerLease.name == self.name,
+                        or_(
+                            SchedulerLease.holder == self.node_id,
+                            SchedulerLease.expires_at <= _to_db(now),
+                        ),
+                    )
+                    .values(holder=self.node_id, expires_at=expires_at)
+                )
+                acquired = result.rowcount == 1
+                if not acquired:
+                    session.add(
+                        SchedulerLease(
+                            name=self.name,
+                            holder=self.node_id,
+                            expires_at=expires_at,
+                        )
+                    )
+                    try:
+                        session.flush()
+                        acquired = True
+                    except IntegrityError:
+                        # Held by another node
+                        session.rollback()
+                if acquired:
+                    session.commit()
+        except Exception as error:
+            logger.exception(
+                "error renewing scheduler lease", node=self.node_id, error=error
+            )
+            # Keep running jobs until the lease we hold runs out
+            acquired = self._leader and now < self._held_until
+
+        if acquired:
+            self._held_until = max(self._held_until, now + lease_seconds)
+        self._set_leader(acquired)
+
+        return acquired
+
+    def release(self):
+        """
+        Give up the lease so another node can take it straight away
+        """
+
+        was_leader = self._leader
+        self._held_until = 0.0
+        self._set_leader(False)
+        if not was_leader:
+            return
+
+        try:
+            with Session(engine) as session:
+                session.exec(
+                    update(SchedulerLease)
+                    .where(
+                        SchedulerLease.name == self.name,
+                        SchedulerLease.holder == self.node_id,
+                    )
+                    .values(expires_at=_to_db(self._clock()))
+                )
+                session.commit()
+        except Exception as error:
+            logger.exception(
+                "error releasing scheduler lease", node=self.node_id, error=error
+            )
+
+    def _work(self):
+        while not self._stop.wait(self._timings()[1]):
+            self.try_acquire()
+
+    def start(self):
+        if not self.enabled:
+            leader_gauge.set(1, node=self.node_id)
+            return
+
+        if self._thread is None:
+            self._stop.clear()
+            # Settle leadership before the scheduler's first runs
+            self.try_acquire()
+            self._thread = threading.Thread(
+                target=self._work, daemon=True, name="scheduler-leader"
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self.enabled:
+            self.release()
+
+
+def leader_only(elector: LeaderElector, func: Callable) -> Callable:
+    """
+    Wrap a scheduled job so it only runs on the node holding the lease
+    """
+
+    name = getattr(func, "__name__", "unknown")
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        if not elector.is_leader:
+            skipped_runs.inc(job=name)
+            return None
+
+        return func(*args, **kwargs)
+
+    return run
+
+
+leader_elector = LeaderElector()
@@ -1,17 +1,15 @@
 import datetime
+import functools
 import json
-import time
 
 from functools import lru_cache
 from incidentbot.configuration.settings import settings
 from incidentbot.exceptions import IndexNotFoundError
 from incidentbot.logging import logger
-from incidentbot.models.database import engine, ApplicationData
-from incidentbot.util import gen
+from incidentbot.slack.directory import channel_directory, user_directory
+from incidentbot.slack.gateway import gateway
+from incidentbot.util.tracing import span
 from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-from sqlalchemy import update
-from sqlmodel import Session, select
 
 from typing import Any
 
@@ -21,6 +19,22 @@ from typing import Any
 # settings.platform is not "slack" (or when no token is configured).
 slack_web_client = WebClient(token=settings.SLACK_BOT_TOKEN)
 
+def _traced_api_call(api_call):
+    @functools.wraps(api_call)
+    def call(api_method: str, **kwargs):
+        with span("slack", api_method):
+            return api_call(api_method, **kwargs)
+
+    return call
+
+
+# Every Web API method goes through api_call, so wrapping it sends each Slack
+# call made with the shared client through the rate limiting gateway, and
+# times each attempt
+slack_web_client.api_call = gateway.wrap(
+    _traced_api_call(slack_web_client.api_call)
+)
+
 """
 Reusable variables
 """
@@ -75,19 +89,6 @@ def __getattr__(name: str):
 skip_invite_for_users = ["api", "web"]
 
 
-def _slack_call_with_retry(fn, *args, **kwargs):
-    """Execute a single Slack API call, retrying once on HTTP 429."""
-    try:
-        return fn(*args, **kwargs)
-    except SlackApiError as error:
-        if error.response.status_code == 429:
-            delay = int(error.response.headers.get("Retry-After", 5))
-            logger.warning("rate limited by slack api, retrying", delay_seconds=delay)
-            time.sleep(delay)
-            return fn(*args, **kwargs)
-        raise
-
-
 """
 Conversations
 """
@@ -102,14 +103,11 @@ def get_channel_history(channel_id: str) -> str:
     """
 
     history: list = []
-    res = _slack_call_with_retry(
-        slack_web_client.conversations_history, channel=channel_id, limit=200
-    )
+    res = slack_web_client.conversations_history(channel=channel_id, limit=200)
     while res:
         history += res.get("messages", [])
         if res.get("has_more"):
-            res = _slack_call_with_retry(
-                slack_web_client.conversations_history,
+            res = slack_web_client.conversations_history(
                 channel=channel_id,
                 limit=200,
                 cursor=res.get("response_metadata", {}).get("next_cursor"),
@@ -119,22 +117,24 @@ def get_channel_history(channel_id: str) -> str:
     return json.dumps(list(reversed(history)))
 
 
-def get_channel_list() -> dict[str, str]:
+def get_channel_list(exclude_archived: bool = True) -> list[dict]:
     """
     Return a list of Slack channels
+
+    Parameters:
+        exclude_archived (bool): Leave out archived channels
     """
 
     channels = []
-    res = _slack_call_with_retry(
-        slack_web_client.conversations_list, exclude_archived=True, limit=1000
+    res = slack_web_client.conversations_list(
+        exclude_archived=exclude_archived, limit=1000
     )
     while res:
         channels += res.get("channels", [])
         next_cursor = res.get("response_metadata", {}).get("next_cursor", "")
         if next_cursor:
-            res = _slack_call_with_retry(
-                slack_web_client.conversations_list,
-                exclude_archived=True,
+            res = slack_web_client.conversations_list(
+                exclude_archived=exclude_archived,
                 limit=1000,
                 cursor=next_cursor,
             )
@@ -153,19 +153,12 @@ def get_channel_name(channel_id: str) -> str:
         channel_id (str): Channel ID
     """
 
-    channels = get_slack_channel_list_db()
-    index = gen.find_index_in_list(channels, "id", channel_id)
-    if index == -1:
+    channel = channel_directory.get(channel_id)
+    if channel is None:
         raise IndexNotFoundError(
             "Could not find index for channel in Slack conversations list"
         )
-    return channels[index].get("name")
-
-
-@lru_cache(maxsize=1)
-def _get_slack_channel_list_cached(bucket: int):
-    # bucket changes every TTL seconds -> cache invalidates automatically
-    return get_slack_channel_list_db()
+    return channel.get("name")
 
 
 def get_digest_channel_id() -> str:
@@ -177,18 +170,12 @@ def get_digest_channel_id() -> str:
     if not value:
         raise ValueError("settings.digest_channel is empty")
 
-    channels = _get_slack_channel_list_cached(int(time.time() // 300))
-
-    # ID first
-    for ch in channels:
-        if ch.get("id") == value:
-            return ch["id"]
-
-    # name (case-insensitive)
-    v = value.lower()
-    for ch in channels:
-        if (name := ch.get("name")) and name.lower() == v:
-            return ch["id"]
+    # ID first, then name (case-insensitive)
+    channel = channel_directory.get(value) or channel_directory.get_by_name(
+        value
+    )
+    if channel is not None:
+        return channel["id"]
 
     raise IndexNotFoundError(
         f"Could not resolve digest channel '{value}' from Slack conversations list"
@@ -204,7 +191,7 @@ def get_formatted_channel_history(channel_id: str, channel_name: str) -> str:
         channel_name (str): The name of the Slack channel to retrieve history from
     """
 
-    users = _slack_call_with_retry(slack_web_client.users_list)["members"]
+    users = slack_web_client.users_list()["members"]
     replaced_messages_string = replace_user_ids(get_channel_history(channel_id), users)
 
     formatted_channel_history = f"Slack channel history for incident {channel_name}\n"
@@ -234,15 +221,12 @@ def get_conversation_members(channel_id: str) -> list[str]:
     """
 
     members = []
-    res = _slack_call_with_retry(
-        slack_web_client.conversations_members, channel=channel_id, limit=200
-    )
+    res = slack_web_client.conversations_members(channel=channel_id, limit=200)
     while res:
         members += res.get("members", [])
         next_cursor = res.get("response_metadata", {}).get("next_cursor", "")
         if next_cursor:
-            res = _slack_call_with_retry(
-                slack_web_client.conversations_members,
+            res = slack_web_client.conversations_members(
                 channel=channel_id,
                 cursor=next_cursor,
                 limit=200,
@@ -262,8 +246,7 @@ def get_message_content(conversation_id: str, ts: str):
         ts (str): Timestamp field
     """
 
-    result = _slack_call_with_retry(
-        slack_web_client.conversations_history,
+    result = slack_web_client.conversations_history(
         channel=conversation_id,
         inclusive=True,
         oldest=ts,
@@ -272,26 +255,6 @@ def get_message_content(conversation_id: str, ts: str):
     return result["messages"][0]
 
 
-def get_slack_channel_list_db() -> list[dict]:
-    """
-    Get Slack channel list from database
-    """
-
-    try:
-        with Session(engine) as session:
-            record = session.exec(
-                select(ApplicationData).filter(
-                    ApplicationData.name == "slack_channels"
-                )
-            ).first()
-
-            return record.json_data
-    except Exception as error:
-        logger.exception(
-            "error retrieving list of slack channels from db", error=error
-        )
-
-
 def invite_user_to_channel(channel_id: str, user: str):
     """
     Invites a user to a Slack channel, checks if they're in it first
@@ -305,51 +268,29 @@ def invite_user_to_channel(channel_id: str, user: str):
         user not in get_conversation_members(channel_id)
         and user not in skip_invite_for_users
     ):
-        _slack_call_with_retry(
-            slack_web_client.conversations_invite, channel=channel_id, users=user
-        )
+        slack_web_client.conversations_invite(channel=channel_id, users=user)
 
 
-def store_slack_channel_list_db():
+def store_slack_channel_list_db(force: bool = False):
     """
-    Retrieves information about Slack channels for a workspace and stores
-    it in the database
+    Reconciles the channel cache with the full channel list from Slack
+
+    Channel events keep the cache current between runs, so the full list
+    (archived channels included) is only pulled when the last reconciliation
+    is older than jobs.update_slack_cache.reconcile_interval_hours, or when
+    force is set.
+
+    Parameters:
+        force (bool): Reconcile regardless of when it was last done
     """
 
     logger.info("running task update_slack_channel_list")
 
-    try:
-        with Session(engine) as session:
-            record_name = "slack_channels"
-
-            # Create the row if it doesn't exist
-            if not session.exec(
-                select(ApplicationData).filter(
-                    ApplicationData.name == record_name
-                )
-            ).all():
-                try:
-                    row = ApplicationData(name=record_name)
-                    session.add(row)
-                    session.commit()
-                except Exception as error:
-                    logger.exception(
-                        "applicationdata row create failed", record_name=record_name, error=error
-                    )
-
-            session.exec(
-                update(ApplicationData)
-                .where(ApplicationData.name == record_name)
-                .values(
-                    json_data=get_channel_list(),
-                )
-            )
-            session.commit()
-            logger.info("stored current slack channels in database")
-    except Exception as error:
-        logger.exception(
-            "applicationdata row edit failed", record_name=record_name, error=error
-        )
+    max_age = datetime.timedelta(
+        hours=settings.jobs.update_slack_cache.reconcile_interval_hours
+    )
+    if force or channel_directory.needs_reconcile(max_age):
+        channel_directory.reconcile(get_channel_list(exclude_archived=False))
 
 
 """
@@ -363,9 +304,7 @@ def check_bot_user_in_digest_channel():
     """
 
     digest_channel_id = get_digest_channel_id()
-    members = _slack_call_with_retry(
-        slack_web_client.conversations_members, channel=digest_channel_id
-    )["members"]
+    members = slack_web_client.conversations_members(channel=digest_channel_id)["members"]
     channel_name = get_channel_name(channel_id=digest_channel_id)
 
     if _bot_user_id() not in members:
@@ -392,8 +331,7 @@ def check_user_in_group(user_id: str, group_name: str) -> bool:
         logger.error("group not found", group=group_name)
         return False
 
-    target_group_members = _slack_call_with_retry(
-        slack_web_client.usergroups_users_list,
+    target_group_members = slack_web_client.usergroups_users_list(
         usergroup=target_group[0].get("id"),
     ).get("users", [])
 
@@ -404,25 +342,15 @@ def get_slack_user(user_id: str) -> dict | None:
     """
     Get a single user object by id
 
-    This is done against the local database so it won't work unless the job to store
-    slack user data has been run
+    This is served from the in-memory user directory, which is loaded from the
+    local database so it won't work unless the job to store slack user data has
+    been run
 
     Parameters:
         user_id (str): User ID
     """
 
-    with Session(engine) as session:
-        ulist = session.exec(
-            select(ApplicationData).filter(
-                ApplicationData.name == "slack_users"
-            )
-        ).first()
-
-    for obj in ulist.json_data:
-        if user_id in obj.values():
-            return obj
-
-    return None
+    return user_directory.get(user_id)
 
 
 def get_slack_users() -> list[dict[str, Any]]:
@@ -431,12 +359,12 @@ def get_slack_users() -> list[dict[str, Any]]:
     """
 
     users: list = []
-    res = _slack_call_with_retry(slack_web_client.users_list)
+    res = slack_web_client.users_list()
     while res:
         users += res.get("members") or []
         next_cursor = res.get("response_metadata", {}).get("next_cursor")
         if next_cursor:
-            res = _slack_call_with_retry(slack_web_client.users_list, cursor=next_cursor)
+            res = slack_web_client.users_list(cursor=next_cursor)
         else:
             res = None
 
@@ -474,41 +402,22 @@ def replace_user_ids(json_string: str, user_list: dict[str, str]) -> str:
     return json.loads(json_string)
 
 
-def store_slack_user_list_db():
+def store_slack_user_list_db(force: bool = False):
     """
-    Retrieves list of users from Slack organization and stores them using a clean format
-    to be retrieved locally to avoid querying the Slack API every time this data
-    is desired
+    Reconciles the user cache with the full user list from Slack
+
+    user_change and team_join events keep the cache current between runs, so
+    the full list is only pulled when the last reconciliation is older than
+    jobs.update_slack_cache.reconcile_interval_hours, or when force is set.
+
+    Parameters:
+        force (bool): Reconcile regardless of when it was last done
     """
 
     logger.info("running task update_slack_user_list")
 
-    try:
-        with Session(engine) as session:
-            # Delete if exists
-            if session.exec(
-                select(ApplicationData).filter(
-                    ApplicationData.name == "slack_users"
-                )
-            ).first():
-                existing = session.exec(
-                    select(ApplicationData).filter(
-                        ApplicationData.name == "slack_users"
-                    )
-                ).first()
-                session.delete(existing)
-                session.commit()
-
-            # Store
-            row = ApplicationData(
-                name="slack_users",
-                json_data=get_slack_users(),
-            )
-
-            session.add(row)
-            session.commit()
-            logger.info("stored current slack users in database")
-    except Exception as error:
-        logger.exception(
-            "applicationdata row create failed", record_name="slack_users", error=error
-        )
+    max_age = datetime.timedelta(
+        hours=settings.jobs.update_slack_cache.reconcile_interval_hours
+    )
+    if force or user_directory.needs_reconcile(max_age):
+        user_directory.reconcile(get_slack_users())
@@ -500,7 +500,7 @@ def show_incident_events(ack, body):
 
     channel_id = body.get("channel").get("id")
     record = IncidentDatabaseInterface.get_one(channel_id=channel_id)
-    events = EventLogHandler.read(incident_id=record.id) or []
+    events = EventLogHandler.read_summary(incident_id=record.id) or []
     user = User(**body.get("user"))
 
     try:
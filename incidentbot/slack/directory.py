@@ -0,0 +1,581 @@
+import datetime
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from incidentbot.logging import logger
+from incidentbot.models.database import (
+    engine,
+    ApplicationData,
+    SlackCacheRecord,
+)
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from typing import Any, NamedTuple
+
+# How far back refresh() reads before its last run, to allow for clock skew
+# between replicas
+_REFRESH_OVERLAP_SECONDS = 60
+
+
+def _to_db(ts: float) -> datetime.datetime:
+    return datetime.datetime.fromtimestamp(
+        ts, datetime.UTC
+    ).replace(tzinfo=None)
+
+
+def _holds(names: dict[str, dict[str, Any]], key: str, entry: dict[str, Any]) -> bool:
+    """
+    Whether a secondary index maps key to entry rather than to another entry
+    """
+
+    held = names.get(key)
+
+    return held is not None and held.get("id") == entry["id"]
+
+
+class _SlackCacheDirectory(ABC):
+    """
+    Process-wide, indexed view of one kind of row in the Slack cache table
+
+    Rows are loaded from the database on first use. Events are applied with
+    upsert() and remove(), which write the single row they touch, and a full
+    list from Slack is applied with reconcile(), which writes only the rows
+    that differ. The time of the last reconciliation is kept in the
+    record_name ApplicationData record so every process can tell when the
+    next one is due.
+
+    Slack delivers each event to one replica only, so every process calls
+    refresh() periodically to pick up the rows others have written since.
+
+    Entries are small dicts that are replaced rather than modified, so a
+    reader never sees a half-updated entry.
+    """
+
+    kind: str
+    record_name: str
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        # Wall-clock time the index was last read from or synced with the
+        # database
+        self._refreshed_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    @abstractmethod
+    def _entry(item: dict[str, Any]) -> dict[str, Any]:
+        """
+        Reduce an object from Slack to the fields the cache keeps
+        """
+
+    @abstractmethod
+    def _new_index(self):
+        """
+        Return an empty index
+        """
+
+    @abstractmethod
+    def _add(self, index, entry: dict[str, Any]):
+        """
+        Add an entry to every lookup in index
+        """
+
+    @abstractmethod
+    def _discard(self, index, entry: dict[str, Any]):
+        """
+        Remove an entry from every lookup in index
+        """
+
+    def _build(self, entries: list[dict[str, Any]]):
+        index = self._new_index()
+        for entry in entries:
+            if entry.get("id"):
+                self._add(index, entry)
+
+        return index
+
+    def _ensure_loaded(self):
+        index = self._index
+        if index is not None:
+            return index
+
+        with self._lock:
+            if self._index is None:
+                refreshed_at = time.time()
+                self._index = self._build(self._read_db())
+                self._refreshed_at = refreshed_at
+
+            return self._index
+
+    def _read_db(self) -> list[dict[str, Any]]:
+        try:
+            with Session(engine) as session:
+                return list(
+                    session.exec(
+                        select(SlackCacheRecord.data).where(
+                            SlackCacheRecord.kind == self.kind
+                        )
+                    ).all()
+                )
+        except Exception as error:
+            logger.exception(
+                "error loading slack cache from db", kind=self.kind, error=error
+            )
+
+        return []
+
+    def _write(
+        self,
+        changed: list[dict[str, Any]] = (),
+        removed: list[str] = (),
+    ):
+        # Stamped here rather than by the database so refresh() on other
+        # processes compares like with like
+        updated_at = _to_db(time.time())
+        with Session(engine) as session:
+            for entry in changed:
+                session.merge(
+                    SlackCacheRecord(
+                        kind=self.kind,
+                        id=entry["id"],
+                        data=entry,
+                        updated_at=updated_at,
+                    )
+                )
+            if removed:
+                session.exec(
+                    delete(SlackCacheRecord).where(
+                        SlackCacheRecord.kind == self.kind,
+                        SlackCacheRecord.id.in_(removed),
+                    )
+                )
+            session.commit()
+
+    def _record(self, entry: dict | None) -> dict | None:
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return entry
+
+    def load(self, items: list[dict[str, Any]]):
+        """
+        Replace the in-memory contents without writing to the database
+
+        Parameters:
+            items (list[dict[str, Any]]): Objects as returned by Slack
+        """
+
+        refreshed_at = time.time()
+        index = self._build([self._entry(item) for item in items or []])
+        with self._lock:
+            self._index = index
+            self._refreshed_at = refreshed_at
+
+        logger.info(
+            "loaded slack cache", kind=self.kind, count=len(index.by_id)
+        )
+
+    def invalidate(self):
+        """
+        Drop the in-memory index so the next lookup reloads it from the database
+        """
+
+        with self._lock:
+            self._index = None
+            self._refreshed_at = None
+
+    def refresh(self):
+        """
+        Apply rows other processes have written since the index was loaded
+        or last refreshed
+
+        Rows are read back from a little before that time, as they are
+        stamped with the writer's clock; applying a change twice is harmless.
+        Entries whose rows were deleted are dropped. Does nothing until the
+        index has been loaded.
+        """
+
+        with self._lock:
+            index, since = self._index, self._refreshed_at
+            if index is None or since is None:
+                return
+
+            known = set(index.by_id)
+        refreshed_at = time.time()
+        try:
+            with Session(engine) as session:
+                entries = session.exec(
+                    select(SlackCacheRecord.data).where(
+                        SlackCacheRecord.kind == self.kind,
+                        SlackCacheRecord.updated_at
+                        >= _to_db(since - _REFRESH_OVERLAP_SECONDS),
+                    )
+                ).all()
+                stored = set(
+                    session.exec(
+                        select(SlackCacheRecord.id).where(
+                            SlackCacheRecord.kind == self.kind
+                        )
+                    ).all()
+                )
+        except Exception as error:
+            logger.exception(
+                "error refreshing slack cache from db", kind=self.kind, error=error
+            )
+            return
+
+        changed = removed = 0
+        with self._lock:
+            if self._index is not index:
+                # Replaced while reading; the new index is already current
+                return
+
+            for entry in entries:
+                current = index.by_id.get(entry.get("id"))
+                if current == entry or not entry.get("id"):
+                    continue
+                if current:
+                    self._discard(index, current)
+                self._add(index, entry)
+                changed += 1
+            # Only entries that were here before the read, so one upserted
+            # meanwhile isn't mistaken for a deleted row
+            for entry_id in known - stored:
+                if entry := index.by_id.get(entry_id):
+                    self._discard(index, entry)
+                    removed += 1
+            self._refreshed_at = refreshed_at
+
+        if changed or removed:
+            logger.debug(
+                "refreshed slack cache",
+                kind=self.kind,
+                changed=changed,
+                removed=removed,
+            )
+
+    def reconcile(self, items: list[dict[str, Any]]) -> dict[str, int]:
+        """
+        Bring the cache in line with a full list from Slack, writing only the
+        rows that were added, changed or removed
+
+        Parameters:
+            items (list[dict[str, Any]]): Objects as returned by Slack
+        """
+
+        index = self._ensure_loaded()
+        # Copied under the lock, as events update the index concurrently
+        with self._lock:
+            current = dict(index.by_id)
+        entries = {}
+        for item in items or []:
+            if item.get("id"):
+                entries[item["id"]] = self._entry(item)
+
+        changed = [
+            entry
+            for entry_id, entry in entries.items()
+            if current.get(entry_id) != entry
+        ]
+        removed = [entry_id for entry_id in current if entry_id not in entries]
+
+        refreshed_at = time.time()
+        if changed or removed:
+            self._write(changed, removed)
+        self._set_reconciled_at(datetime.datetime.now(datetime.UTC))
+
+        index = self._build(list(entries.values()))
+        with self._lock:
+            self._index = index
+            self._refreshed_at = refreshed_at
+
+        counts = {
+            "changed": len(changed),
+            "removed": len(removed),
+            "size": len(entries),
+        }
+        logger.info("reconciled slack cache", kind=self.kind, **counts)
+
+        return counts
+
+    def upsert(self, item: dict[str, Any]):
+        """
+        Add an entry or update the fields present in item
+
+        Parameters:
+            item (dict[str, Any]): Object from a Slack event with at least an id
+        """
+
+        index = self._ensure_loaded()
+        with self._lock:
+            current = index.by_id.get(item["id"])
+            entry = {**(current or {}), **self._entry(item)}
+            if current:
+                self._discard(index, current)
+            self._add(index, entry)
+
+        self._write(changed=[entry])
+
+    def remove(self, entry_id: str):
+        """
+        Drop an entry
+
+        Parameters:
+            entry_id (str): Slack ID
+        """
+
+        index = self._ensure_loaded()
+        with self._lock:
+            entry = index.by_id.get(entry_id)
+            if entry is None:
+                return
+            self._discard(index, entry)
+
+        self._write(removed=[entry_id])
+
+    def get(self, entry_id: str) -> dict | None:
+        """
+        Return an entry by Slack id
+
+        Parameters:
+            entry_id (str): Slack ID
+        """
+
+        return self._record(self._ensure_loaded().by_id.get(entry_id))
+
+    def reconciled_at(self) -> datetime.datetime | None:
+        """
+        When the cache was last reconciled with a full list from Slack, by
+        any process
+        """
+
+        with Session(engine) as session:
+            record = session.exec(
+                select(ApplicationData).filter(
+                    ApplicationData.name == self.record_name
+                )
+            ).first()
+
+        if record and record.data:
+            try:
+                return datetime.datetime.fromisoformat(record.data)
+            except ValueError:
+                pass
+
+        return None
+
+    def _set_reconciled_at(self, reconciled_at: datetime.datetime):
+        with Session(engine) as session:
+            record = session.exec(
+                select(ApplicationData).filter(
+                    ApplicationData.name == self.record_name
+                )
+            ).first()
+            if record is None:
+                record = ApplicationData(name=self.record_name, json_data=None)
+            record.data = reconciled_at.isoformat()
+            session.add(record)
+            session.commit()
+
+    def needs_reconcile(self, max_age: datetime.timedelta) -> bool:
+        """
+        Whether the last reconciliation is missing or older than max_age
+        """
+
+        reconciled_at = self.reconciled_at()
+
+        return (
+            reconciled_at is None
+            or datetime.datetime.now(datetime.UTC) - reconciled_at
+            > max_age
+        )
+
+    def stats(self) -> dict[str, int]:
+        index = self._index
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(index.by_id) if index is not None else 0,
+        }
+
+
+class _UserIndex(NamedTuple):
+    by_id: dict[str, dict[str, Any]]
+    by_email: dict[str, dict[str, Any]]
+    by_real_name: dict[str, dict[str, Any]]
+
+
+class SlackUserDirectory(_SlackCacheDirectory):
+    """
+    Indexed view of the workspace's Slack users
+
+    Entries have id, name, real_name and email. user_change and team_join
+    events keep it current between reconciliations.
+    """
+
+    kind = "user"
+    record_name = "slack_users"
+
+    @staticmethod
+    def _entry(user: dict[str, Any]) -> dict[str, Any]:
+        if "profile" not in user:
+            return {
+                key: user[key]
+                for key in ("id", "name", "real_name", "email")
+                if key in user
+            }
+
+        entry = {
+            "name": user["name"],
+            "real_name": user["profile"].get("real_name", ""),
+            "id": user["id"],
+        }
+        # Events only carry the email when the app can read it; keep the
+        # cached one rather than clearing it
+        if "email" in user["profile"]:
+            entry["email"] = user["profile"]["email"]
+
+        return entry
+
+    def _new_index(self) -> _UserIndex:
+        return _UserIndex({}, {}, {})
+
+    def _add(self, index: _UserIndex, user: dict[str, Any]):
+        index.by_id[user["id"]] = user
+        if email := user.get("email"):
+            index.by_email[email.lower()] = user
+        if real_name := user.get("real_name"):
+            index.by_real_name.setdefault(real_name.lower(), user)
+
+    def _discard(self, index: _UserIndex, user: dict[str, Any]):
+        index.by_id.pop(user["id"], None)
+        # The email or name may belong to another user by now
+        email = (user.get("email") or "").lower()
+        if email and _holds(index.by_email, email, user):
+            del index.by_email[email]
+        real_name = (user.get("real_name") or "").lower()
+        if real_name and _holds(index.by_real_name, real_name, user):
+            del index.by_real_name[real_name]
+            # Pass the name on to the first remaining user with it, as _add
+            # would have
+            for other in index.by_id.values():
+                if (other.get("real_name") or "").lower() == real_name:
+                    index.by_real_name[real_name] = other
+                    break
+
+    def get_by_email(self, email: str) -> dict | None:
+        """
+        Return a user by email address (case-insensitive)
+
+        Parameters:
+            email (str): Email address
+        """
+
+        if not email:
+            return self._record(None)
+
+        return self._record(
+            self._ensure_loaded().by_email.get(email.lower())
+        )
+
+    def get_by_real_name(self, real_name: str) -> dict | None:
+        """
+        Return a user by real name (case-insensitive)
+
+        Parameters:
+            real_name (str): The user's real name as shown in their profile
+        """
+
+        if not real_name:
+            return self._record(None)
+
+        return self._record(
+            self._ensure_loaded().by_real_name.get(real_name.lower())
+        )
+
+
+user_directory = SlackUserDirectory()
+
+
+class _ChannelIndex(NamedTuple):
+    by_id: dict[str, dict[str, Any]]
+    by_name: dict[str, dict[str, Any]]
+
+
+class SlackChannelDirectory(_SlackCacheDirectory):
+    """
+    Indexed view of the workspace's Slack channels
+
+    Entries have id, name, is_archived and is_private. Channel events
+    (created, renamed, archived, unarchived, deleted) keep it current between
+    reconciliations.
+    """
+
+    kind = "channel"
+    record_name = "slack_channels"
+
+    @staticmethod
+    def _entry(channel: dict[str, Any]) -> dict[str, Any]:
+        entry = {"id": channel["id"]}
+        if "name" in channel:
+            entry["name"] = channel["name"]
+        for key in ("is_archived", "is_private"):
+            if key in channel:
+                entry[key] = bool(channel[key])
+
+        return entry
+
+    def _new_index(self) -> _ChannelIndex:
+        return _ChannelIndex({}, {})
+
+    def _add(self, index: _ChannelIndex, channel: dict[str, Any]):
+        index.by_id[channel["id"]] = channel
+        if name := channel.get("name"):
+            index.by_name[name.lower()] = channel
+
+    def _discard(self, index: _ChannelIndex, channel: dict[str, Any]):
+        index.by_id.pop(channel["id"], None)
+        name = (channel.get("name") or "").lower()
+        if name and _holds(index.by_name, name, channel):
+            del index.by_name[name]
+
+    def set_archived(self, channel_id: str, archived: bool = True):
+        """
+        Mark a channel archived or unarchived
+
+        Parameters:
+            channel_id (str): Channel ID
+            archived (bool): Whether the channel is now archived
+        """
+
+        if channel_id in self._ensure_loaded().by_id:
+            self.upsert({"id": channel_id, "is_archived": archived})
+
+    def get_by_name(
+        self, name: str, include_archived: bool = False
+    ) -> dict | None:
+        """
+        Return a channel by name (case-insensitive)
+
+        Parameters:
+            name (str): Channel name without the leading #
+            include_archived (bool): Also return archived channels
+        """
+
+        if not name:
+            return self._record(None)
+
+        channel = self._ensure_loaded().by_name.get(name.lower())
+        if channel and channel.get("is_archived") and not include_archived:
+            channel = None
+
+        return self._record(channel)
+
+
+channel_directory = SlackChannelDirectory()
@@ -0,0 +1,273 @@
+import asyncio
+import functools
+import threading
+import time
+
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from incidentbot.configuration.schema import SLACK_LISTENER_KINDS
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+from slack_bolt import App
+from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from slack_bolt.async_app import AsyncApp
+from slack_bolt.context.say import Say
+from slack_bolt.context.say.async_say import AsyncSay
+from slack_sdk import WebClient
+
+handler_queue_depth = metrics.gauge(
+    "incidentbot_slack_handler_queue_depth",
+    "Slack listeners waiting for a concurrency slot, by listener type",
+    ("kind",),
+)
+handler_in_flight = metrics.gauge(
+    "incidentbot_slack_handler_in_flight",
+    "Slack listeners currently running, by listener type",
+    ("kind",),
+)
+handler_queue_wait = metrics.histogram(
+    "incidentbot_slack_handler_queue_wait_seconds",
+    "Time Slack listeners spent waiting for a concurrency slot",
+    ("kind",),
+)
+handler_duration = metrics.histogram(
+    "incidentbot_slack_handler_duration_seconds",
+    "Time spent running Slack listeners",
+    ("kind",),
+)
+
+
+class ListenerRegistry:
+    """
+    Collects Slack listeners so they can be mounted on either a sync App or
+    an AsyncApp
+
+    Listeners are registered with the same decorators slack_bolt.App offers
+    and are returned unchanged, so they remain plain functions.
+    """
+
+    def __init__(self):
+        self._listeners: list[tuple[str, tuple, dict, Callable]] = []
+        self._error_handler: Callable | None = None
+
+    def _register(self, kind: str, *args, **kwargs) -> Callable:
+        def decorator(func: Callable) -> Callable:
+            self._listeners.append((kind, args, kwargs, func))
+            return func
+
+        return decorator
+
+    def action(self, *args, **kwargs) -> Callable:
+        return self._register("action", *args, **kwargs)
+
+    def command(self, *args, **kwargs) -> Callable:
+        return self._register("command", *args, **kwargs)
+
+    def event(self, *args, **kwargs) -> Callable:
+        return self._register("event", *args, **kwargs)
+
+    def options(self, *args, **kwargs) -> Callable:
+        return self._register("options", *args, **kwargs)
+
+    def shortcut(self, *args, **kwargs) -> Callable:
+        return self._register("shortcut", *args, **kwargs)
+
+    def view(self, *args, **kwargs) -> Callable:
+        return self._register("view", *args, **kwargs)
+
+    def error(self, func: Callable) -> Callable:
+        self._error_handler = func
+        return func
+
+    @property
+    def listeners(self) -> list[tuple[str, tuple, dict, Callable]]:
+        return list(self._listeners)
+
+    def build_app(self, client: WebClient, workers: int, **kwargs) -> App:
+        """
+        Create a sync App running listeners on a pool of workers threads
+
+        The App uses client for its own calls and passes it to listeners, so
+        say() and client.* calls share the client's rate limiting.
+        """
+
+        app = App(
+            client=client,
+            listener_executor=ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="slack-handler"
+            ),
+            **kwargs,
+        )
+        for kind, args, kw, func in self._listeners:
+            getattr(app, kind)(*args, **kw)(func)
+        if self._error_handler is not None:
+            app.error(self._error_handler)
+
+        return app
+
+    def build_async_app(
+        self, token: str, dispatcher: AsyncDispatcher, **kwargs
+    ) -> AsyncApp:
+        """
+        Create an AsyncApp whose listeners are run through dispatcher
+        """
+
+        app = AsyncApp(token=token, **kwargs)
+        for kind, args, kw, func in self._listeners:
+            getattr(app, kind)(*args, **kw)(dispatcher.wrap(kind, func))
+        if self._error_handler is not None:
+            app.error(dispatcher.wrap_error_handler(self._error_handler))
+
+        return app
+
+
+def _acknowledged(*args, **kwargs):
+    if args or kwargs:
+        logger.warning(
+            "slack request was already acknowledged, ignoring ack arguments"
+        )
+
+
+class AsyncDispatcher:
+    """
+    Runs Slack listeners for an AsyncApp
+
+    Socket Mode and request acknowledgement live on a dedicated event loop in
+    a background thread. Listener bodies, which make blocking Slack, database
+    and integration calls, run on a bounded thread pool instead of the loop.
+    Each listener type has its own concurrency limit so a burst of slow
+    actions can't starve slash commands or modal submissions; listeners over
+    the limit wait on the loop and are counted in the queue-depth gauge.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        default_concurrency: int,
+        concurrency: dict[str, int] | None = None,
+    ):
+        self._limits = {
+            kind: (concurrency or {}).get(kind, default_concurrency)
+            for kind in SLACK_LISTENER_KINDS
+        }
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="slack-handler"
+        )
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, daemon=True, name="slack-io"
+        )
+        self._thread.start()
+
+    def run(self, coro, timeout: int | None = None):
+        """
+        Run a coroutine on the dispatcher's event loop and wait for it
+        """
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        return future.result(timeout=timeout)
+
+    def _blocking(self, func: Callable) -> Callable:
+        # Lets listeners on worker threads call the async say/respond helpers
+        # Bolt provides as if they were the sync versions
+        def call(*args, **kwargs):
+            return self.run(func(*args, **kwargs))
+
+        return call
+
+    def _semaphore(self, kind: str) -> asyncio.Semaphore:
+        # Created on first use so they are bound to the running loop
+        if kind not in self._semaphores:
+            self._semaphores[kind] = asyncio.Semaphore(self._limits[kind])
+
+        return self._semaphores[kind]
+
+    def _listener_kwargs(self, kwargs: dict) -> dict:
+        from incidentbot.slack.client import slack_web_client
+
+        kwargs = dict(kwargs)
+        if "ack" in kwargs:
+            kwargs["ack"] = _acknowledged
+        say = kwargs.get("say")
+        for name in ("say", "respond", "complete", "fail"):
+            if name in kwargs:
+                kwargs[name] = self._blocking(kwargs[name])
+        if isinstance(say, AsyncSay):
+            # Post through the shared client so messages are rate limited
+            # with everything else
+            kwargs["say"] = Say(
+                slack_web_client, channel=say.channel, thread_ts=say.thread_ts
+            )
+        if "client" in kwargs:
+            kwargs["client"] = slack_web_client
+
+        return kwargs
+
+    def wrap(self, kind: str, func: Callable) -> Callable:
+        """
+        Wrap a sync listener as a coroutine for an AsyncApp
+
+        The request is acknowledged on the loop before the listener is queued,
+        so waiting for a slot never runs past Slack's three second deadline.
+        """
+
+        @functools.wraps(func)
+        async def listener(**kwargs):
+            ack = kwargs.get("ack")
+            if ack is not None:
+                await ack()
+
+            semaphore = self._semaphore(kind)
+            queued = time.perf_counter()
+            handler_queue_depth.inc(kind=kind)
+            try:
+                await semaphore.acquire()
+            finally:
+                handler_queue_depth.dec(kind=kind)
+            handler_queue_wait.observe(time.perf_counter() - queued, kind=kind)
+
+            handler_in_flight.inc(kind=kind)
+            start = time.perf_counter()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor,
+                    functools.partial(func, **self._listener_kwargs(kwargs)),
+                )
+            finally:
+                handler_duration.observe(time.perf_counter() - start, kind=kind)
+                handler_in_flight.dec(kind=kind)
+                semaphore.release()
+
+        return listener
+
+    def wrap_error_handler(self, func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def error_handler(**kwargs):
+            return await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                functools.partial(func, **self._listener_kwargs(kwargs)),
+            )
+
+        return error_handler
+
+    def connect(
+        self, registry: ListenerRegistry, bot_token: str, app_token: str
+    ) -> AsyncSocketModeHandler:
+        """
+        Build the AsyncApp and connect it over Socket Mode (non-blocking)
+        """
+
+        async def _connect():
+            app = registry.build_async_app(bot_token, self)
+            handler = AsyncSocketModeHandler(app, app_token)
+            await handler.connect_async()
+            return handler
+
+        return self.run(_connect())
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,322 @@
+import functools
+import json
+import random
+import threading
+import time
+
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import Any
+
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+from slack_sdk.errors import SlackApiError
+
+# Requests per minute and burst size for each of Slack's rate limit tiers
+TIERS = {
+    1: (1, 1),
+    2: (20, 5),
+    3: (50, 10),
+    4: (100, 20),
+}
+
+# Tier of each Web API method the bot calls, from Slack's method reference;
+# methods not listed are treated as tier 3
+METHOD_TIERS = {
+    "bookmarks.add": 2,
+    "conversations.archive": 2,
+    "conversations.create": 2,
+    "conversations.history": 3,
+    "conversations.info": 3,
+    "conversations.invite": 3,
+    "conversations.join": 3,
+    "conversations.list": 2,
+    "conversations.members": 4,
+    "conversations.rename": 2,
+    "conversations.setTopic": 2,
+    "conversations.unarchive": 2,
+    "chat.delete": 3,
+    "chat.postEphemeral": 4,
+    "chat.update": 3,
+    "files.info": 4,
+    "files.revokePublicURL": 3,
+    "files.sharedPublicURL": 3,
+    "pins.add": 2,
+    "reactions.add": 3,
+    "usergroups.list": 2,
+    "usergroups.users.list": 2,
+    "users.info": 4,
+    "users.list": 2,
+    "views.open": 4,
+    "views.publish": 4,
+    "views.update": 4,
+}
+
+# Methods limited per channel instead of per method
+PER_CHANNEL_LIMITS = {
+    "chat.postMessage": (60, 3),
+}
+
+# Read-only methods: identical concurrent calls share one request, and
+# connection errors are safe to retry
+READ_METHODS = frozenset(
+    {
+        "auth.test",
+        "bookmarks.list",
+        "conversations.history",
+        "conversations.info",
+        "conversations.list",
+        "conversations.members",
+        "files.info",
+        "pins.list",
+        "team.info",
+        "usergroups.list",
+        "usergroups.users.list",
+        "users.info",
+        "users.list",
+        "users.lookupByEmail",
+        "users.profile.get",
+    }
+)
+
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+api_calls = metrics.counter(
+    "incidentbot_slack_api_calls_total",
+    "Slack Web API calls made through the gateway, by outcome",
+    ("method", "outcome"),
+)
+rate_limited = metrics.counter(
+    "incidentbot_slack_rate_limited_total",
+    "Slack API calls rejected with HTTP 429",
+    ("method",),
+)
+retries = metrics.counter(
+    "incidentbot_slack_api_retries_total",
+    "Slack API calls retried, by reason",
+    ("method", "reason"),
+)
+throttle_wait = metrics.histogram(
+    "incidentbot_slack_api_throttle_wait_seconds",
+    "Time Slack API calls waited for a rate limit token",
+    ("method",),
+)
+coalesced = metrics.counter(
+    "incidentbot_slack_api_coalesced_total",
+    "Slack API reads answered by an identical call already in flight",
+    ("method",),
+)
+
+
+class TokenBucket:
+    """
+    Paces calls to rate per second, allowing bursts of up to capacity
+
+    Callers reserve a token and are told how long to wait for it, so the
+    lock is never held while sleeping. pause() holds every caller back until
+    a Retry-After interval has passed.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        # The time _tokens was last brought up to date; ahead of the clock
+        # while paused
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token and return the seconds to wait before using it
+        """
+
+        with self._lock:
+            now = self._clock()
+            if now > self._updated:
+                self._tokens = min(
+                    self.capacity,
+                    self._tokens + (now - self._updated) * self.rate,
+                )
+                self._updated = now
+            self._tokens -= 1
+
+            return (self._updated - now) + max(-self._tokens, 0) / self.rate
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            self._sleep(wait)
+
+        return wait
+
+    def pause(self, seconds: float):
+        with self._lock:
+            resume = self._clock() + seconds
+            if resume > self._updated:
+                self._updated = resume
+                self._tokens = min(self._tokens, 1)
+
+
+def _channel(kwargs: dict) -> str | None:
+    for key in ("json", "data", "params"):
+        payload = kwargs.get(key)
+        if isinstance(payload, dict) and payload.get("channel"):
+            return str(payload["channel"])
+
+    return None
+
+
+def _fingerprint(kwargs: dict) -> str | None:
+    try:
+        return json.dumps(kwargs, sort_keys=True)
+    except TypeError:
+        return None
+
+
+class SlackGateway:
+    """
+    Single path for Slack Web API calls
+
+    Every call waits for a token from its method's tier bucket (or its
+    channel's bucket for chat.postMessage), so a burst of activity during a
+    large incident queues inside the bot instead of tripping Slack's limits.
+    A 429 pauses the whole bucket for Retry-After and is retried, along with
+    connection errors on read-only methods, up to max_retries times with
+    jittered backoff. Identical read-only calls made while one is already in
+    flight wait for and share its response.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = MAX_RETRIES,
+        backoff_seconds: float = BACKOFF_SECONDS,
+        max_backoff_seconds: float = MAX_BACKOFF_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._sleep = sleep
+        self._buckets: dict[tuple[str, ...], TokenBucket] = {}
+        self._in_flight: dict[tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, method: str, kwargs: dict) -> TokenBucket:
+        if method in PER_CHANNEL_LIMITS:
+            key = (method, _channel(kwargs) or "")
+            per_minute, burst = PER_CHANNEL_LIMITS[method]
+        else:
+            key = (method,)
+            per_minute, burst = TIERS[METHOD_TIERS.get(method, 3)]
+
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(
+                    per_minute / 60, burst, sleep=self._sleep
+                )
+
+        return bucket
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: spreads out callers that failed at the same moment
+        return random.uniform(
+            0, min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt)
+        )
+
+    def _send(self, api_call: Callable, method: str, kwargs: dict) -> Any:
+        bucket = self.bucket(method, kwargs)
+
+        for attempt in range(self.max_retries + 1):
+            waited = bucket.acquire()
+            if waited > 0:
+                throttle_wait.observe(waited, method=method)
+
+            try:
+                response = api_call(method, **kwargs)
+            except SlackApiError as error:
+                if error.response.status_code != 429:
+                    api_calls.inc(method=method, outcome="error")
+                    raise
+
+                rate_limited.inc(method=method)
+                if attempt == self.max_retries:
+                    api_calls.inc(method=method, outcome="rate_limited")
+                    raise
+
+                retry_after = float(error.response.headers.get("Retry-After", 5))
+                bucket.pause(retry_after + random.uniform(0, 1))
+                reason, delay = "rate_limited", 0.0
+            except OSError:
+                if method not in READ_METHODS or attempt == self.max_retries:
+                    api_calls.inc(method=method, outcome="error")
+                    raise
+
+                reason, delay = "connection", self._backoff(attempt)
+            else:
+                api_calls.inc(method=method, outcome="ok")
+                return response
+
+            retries.inc(method=method, reason=reason)
+            logger.warning(
+                "slack api call failed, retrying",
+                method=method,
+                reason=reason,
+                attempt=attempt + 1,
+            )
+            if delay:
+                self._sleep(delay)
+
+    def call(self, api_call: Callable, method: str, **kwargs) -> Any:
+        fingerprint = _fingerprint(kwargs) if method in READ_METHODS else None
+        if fingerprint is None:
+            return self._send(api_call, method, kwargs)
+
+        key = (method, fingerprint)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+
+        if not leader:
+            coalesced.inc(method=method)
+            return future.result()
+
+        try:
+            response = self._send(api_call, method, kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def wrap(self, api_call: Callable) -> Callable:
+        """
+        Route a WebClient's api_call, which every Web API method goes
+        through, via this gateway
+        """
+
+        @functools.wraps(api_call)
+        def call(api_method: str, **kwargs):
+            return self.call(api_call, api_method, **kwargs)
+
+        return call
+
+
+gateway = SlackGateway()
@@ -1,13 +1,14 @@
 import asyncio
 import re
-import requests
 import slack_sdk
 
+from incidentbot.attachments.ingest import attachment_ingestor
 from incidentbot.configuration.settings import settings
 from incidentbot.version import APP_VERSION
 from incidentbot.incident.actions import (
     archive_incident_channel,
     export_chat_logs,
+    ingest_pinned_image,
     join_incident_as_role,
     leave_incident_as_role,
     set_severity as set_incident_severity,
@@ -16,13 +17,14 @@ from incidentbot.incident.actions import (
 )
 from incidentbot.incident.event import EventLogHandler
 from incidentbot.logging import logger
-from incidentbot.models.database import ApplicationData, engine
 from incidentbot.models.incident import IncidentDatabaseInterface
 from incidentbot.models.slack import SlackBlockActionsResponse
 from incidentbot.slack.client import (
     get_slack_user,
     slack_web_client,
 )
+from incidentbot.slack.directory import channel_directory, user_directory
+from incidentbot.slack.dispatch import ListenerRegistry
 from incidentbot.slack.messages import (
     BlockBuilder,
 )
@@ -31,12 +33,11 @@ from incidentbot.slack.postmortem_sync_guard import (
     end_postmortem_sync,
 )
 from incidentbot.util import gen
-from slack_bolt import App
 from slack_sdk.errors import SlackApiError
-from sqlmodel import Session, select
 
-## The xoxb oauth token for the bot is called here to provide bot privileges.
-app = App(token=settings.SLACK_BOT_TOKEN)
+## Listeners are collected here and mounted on a sync App or an AsyncApp by
+## startup.connect_platform depending on settings.slack.handler_mode.
+app = ListenerRegistry()
 
 
 @app.error
@@ -306,7 +307,7 @@ def handle_incident_export_chat_logs(ack, body):
     )
 
 
-for role in [key for key, _ in settings.roles.items()]:
+for role in settings.lookups.roles:
 
     @app.action(f"incident.join_this_incident_{role}")
     def handle_join_this_incident(ack, body, logger):
@@ -491,6 +492,42 @@ def handle_static_action(ack, body, logger):  # noqa: F811
     logger.info(body)
 
 
+"""
+Slack cache
+"""
+
+
+@app.event("channel_created")
+@app.event("channel_rename")
+@app.event("group_rename")
+def handle_channel_changed(event):
+    channel_directory.upsert(event["channel"])
+
+
+@app.event("channel_archive")
+@app.event("group_archive")
+def handle_channel_archived(event):
+    channel_directory.set_archived(event["channel"], True)
+
+
+@app.event("channel_unarchive")
+@app.event("group_unarchive")
+def handle_channel_unarchived(event):
+    channel_directory.set_archived(event["channel"], False)
+
+
+@app.event("channel_deleted")
+@app.event("group_deleted")
+def handle_channel_deleted(event):
+    channel_directory.remove(event["channel"])
+
+
+@app.event("team_join")
+@app.event("user_change")
+def handle_user_changed(event):
+    user_directory.upsert(event["user"])
+
+
 """
 Reactions
 """
@@ -525,72 +562,16 @@ def reaction_added(event, say):
                     if settings.enable_pinned_images:
                         for file in message["files"]:
                             if "image" in file["mimetype"]:
-                                if not file["public_url_shared"]:
-                                    # Make the attachment public temporarily
-                                    try:
-                                        slack_web_client.files_sharedPublicURL(
-                                            file=file["id"],
-                                            token=settings.SLACK_USER_TOKEN,
-                                        )
-                                    except SlackApiError as error:
-                                        logger.exception(
-                                            "error preparing pinned file for copy", error=error
-                                        )
-
-                                # Copy the attachment into the database
-                                pub_secret = file["permalink_public"].split(
-                                    "-"
-                                )[3]
-
-                                response = requests.get(
-                                    file["url_private"],
-                                    headers={
-                                        "Authorization": f"Bearer {settings.SLACK_BOT_TOKEN}"
-                                    },
-                                    params={"pub_secret": pub_secret},
+                                # Download and store in the background so the
+                                # listener returns straight away; the job
+                                # reacts or replies in the channel when done
+                                attachment_ingestor.submit(
+                                    ingest_pinned_image,
+                                    incident,
+                                    message,
+                                    file,
+                                    channel_id,
                                 )
-
-                                # Revoke public access
-                                try:
-                                    slack_web_client.files_revokePublicURL(
-                                        file=file["id"],
-                                        token=settings.SLACK_USER_TOKEN,
-                                    )
-                                except SlackApiError as error:
-                                    logger.exception(
-                                        "error revoking public url for pinned file", error=error
-                                    )
-
-                                try:
-                                    result = EventLogHandler.create(
-                                        image=response.content,
-                                        incident_id=incident.id,
-                                        incident_slug=incident.slug,
-                                        message_ts=message["ts"],
-                                        mimetype=file["mimetype"],
-                                        title=file["name"],
-                                        source="pin",
-                                        user=get_slack_user(
-                                            message.get("user")
-                                        ).get("real_name", "NotAvailable"),
-                                    )
-
-                                    slack_web_client.reactions_add(
-                                        channel=channel_id,
-                                        name="white_check_mark",
-                                        timestamp=message_timestamp,
-                                    )
-                                except Exception as error:
-                                    if "already_reacted" in str(error):
-                                        reason = "It looks like I've already pinned that content."
-                                    else:
-                                        reason = (
-                                            f"Something went wrong: {error}"
-                                        )
-                                    say(
-                                        channel=channel_id,
-                                        text=f":wave: I was unable to pin that message. {reason}",
-                                    )
                             else:
                                 say(
                                     channel=channel_id,
@@ -655,59 +636,36 @@ def parse_pinned_message_content(message: str) -> str:
     username_pattern = r"<@([A-Z0-9]+)>"
 
     if re.search(channel_pattern, message):
-        with Session(engine) as session:
-            match = re.search(channel_pattern, message)
-            channel_list = session.exec(
-                select(ApplicationData).filter(
-                    ApplicationData.name == "slack_channels"
-                )
-            ).one()
-            matched_channels = [
-                channel
-                for channel in channel_list.json_data
-                if channel.get("id") == match.group(1)
-            ]
-            if matched_channels:
-                matched_channel = matched_channels[0]
-                message = message.replace(
-                    match.group(0),
-                    f"#{matched_channel.get("name")}",
-                )
-            else:
-                # Keep original format if channel not found
-                pass
+        match = re.search(channel_pattern, message)
+        matched_channel = channel_directory.get(match.group(1))
+        if matched_channel:
+            message = message.replace(
+                match.group(0),
+                f"#{matched_channel.get("name")}",
+            )
+        else:
+            # Keep original format if channel not found
+            pass
 
     for pattern in url_patterns:
         if re.search(pattern, message):
-            with Session(engine) as session:
-                match = re.search(pattern, message)
-                message = message.replace(
-                    match.group(0),
-                    match.group(1),
-                )
+            match = re.search(pattern, message)
+            message = message.replace(
+                match.group(0),
+                match.group(1),
+            )
 
     if re.search(username_pattern, message):
-        with Session(engine) as session:
-            match = re.search(username_pattern, message)
-            user_list = session.exec(
-                select(ApplicationData).filter(
-                    ApplicationData.name == "slack_users"
-                )
-            ).one()
-            matched_users = [
-                user
-                for user in user_list.json_data
-                if user.get("id") == match.group(1)
-            ]
-            if matched_users:
-                matched_user = matched_users[0]
-                message = message.replace(
-                    match.group(0),
-                    f"@{matched_user.get("real_name")}",
-                )
-            else:
-                # Keep original format if user not found
-                pass
+        match = re.search(username_pattern, message)
+        matched_user = get_slack_user(match.group(1))
+        if matched_user:
+            message = message.replace(
+                match.group(0),
+                f"@{matched_user.get("real_name")}",
+            )
+        else:
+            # Keep original format if user not found
+            pass
 
     return message
 
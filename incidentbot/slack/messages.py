@@ -192,7 +192,7 @@ class BlockBuilder:
                 )
 
         if reminder.include_role_buttons:
-            for role in settings.roles:
+            for role in settings.lookups.roles:
                 elements.append(
                     {
                         "type": "button",
@@ -223,7 +223,7 @@ class BlockBuilder:
         Parameters:
             security_selected (bool): Whether or not the security option is selected
         """
-        placeholder = [sev for sev, _ in settings.severities.items()][-1]
+        placeholder = settings.lookups.severities[-1]
 
         security_default = {
             "type": "section",
@@ -426,7 +426,7 @@ class BlockBuilder:
                             },
                             "value": sev,
                         }
-                        for sev, _ in settings.severities.items()
+                        for sev in settings.lookups.severities
                     ],
                 },
             },
@@ -979,12 +979,7 @@ class BlockBuilder:
                     ]
                 )
 
-        final_statuses = [
-            status
-            for status, config in settings.statuses.items()
-            if config.final
-        ]
-        status_definition = final_statuses[0] if final_statuses else "resolved"
+        status_definition = settings.lookups.final_status or "resolved"
 
         blocks = [
             {
@@ -1150,7 +1145,7 @@ class BlockBuilder:
             {"type": "divider"},
         ]
 
-        for role, _cfg in settings.roles.items():
+        for role in settings.lookups.roles:
             role_normalized = " ".join(role.split("_")).title()
             assignees = [p for p in participants if p.role == role]
 
@@ -1306,7 +1301,7 @@ class BlockBuilder:
                                 },
                                 "value": sev,
                             }
-                            for sev, _ in settings.severities.items()
+                            for sev in settings.lookups.severities
                         ],
                     }
                 ],
@@ -1416,7 +1411,7 @@ class BlockBuilder:
                                 },
                                 "value": st,
                             }
-                            for st in settings.statuses
+                            for st in settings.lookups.statuses
                         ],
                     }
                 ],
@@ -1481,14 +1476,7 @@ class BlockBuilder:
                 created_at = inc["created_at"]
                 updated_at = inc["updated_at"]
                 shortlink = inc["shortlink"]
-                final_statuses = [
-                    status
-                    for status, config in settings.statuses.items()
-                    if config.final
-                ]
-                final_status = (
-                    final_statuses[0] if final_statuses else "resolved"
-                )
+                final_status = settings.lookups.final_status or "resolved"
 
                 if inc["status"] != final_status:
                     formatted_incidents.append(
@@ -1703,7 +1691,7 @@ class BlockBuilder:
                 "value": f"join_this_incident_{role}",
                 "action_id": f"incident.join_this_incident_{role}",
             }
-            for role in [key for key, _ in settings.roles.items()]
+            for role in settings.lookups.roles
         ]
 
         other_buttons = [
@@ -264,11 +264,7 @@ def show_incident_update_modal(ack, body, client):
                             )
                             for inc in database_data
                             if inc.status
-                            not in [
-                                status
-                                for status, config in settings.statuses.items()
-                                if config.final
-                            ]
+                            not in settings.lookups.final_statuses
                         ],
                     },
                 },
@@ -503,12 +499,7 @@ def show_pager_modal(ack, body, client):
                         }
                     )
                     for inc in IncidentDatabaseInterface.list_open()
-                    if inc.status
-                    not in [
-                        status
-                        for status, config in settings.statuses.items()
-                        if config.final
-                    ]
+                    if inc.status not in settings.lookups.final_statuses
                 ],
             },
         },
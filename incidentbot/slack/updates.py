@@ -0,0 +1,152 @@
+import threading
+import time
+
+from collections.abc import Callable
+
+from incidentbot.configuration.settings import settings
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+
+updates_requested = metrics.counter(
+    "incidentbot_slack_message_updates_requested_total",
+    "Edits requested for coalesced Slack messages",
+    ("message",),
+)
+updates_sent = metrics.counter(
+    "incidentbot_slack_message_updates_sent_total",
+    "Edits actually sent for coalesced Slack messages",
+    ("message",),
+)
+
+
+class MessageUpdateCoalescer:
+    """
+    Batches edits to messages the bot keeps up to date, such as the roles
+    panel and the digest message
+
+    An update is a function that rebuilds the message from the current state
+    and sends it. Updates for the same message are debounced: each one pushes
+    the send back by the window, up to max_delay after the first, and only the
+    latest is run. A background thread runs updates as they fall due, one at
+    a time, so two edits to the same message never race.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float | None = None,
+        max_delay_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._window_seconds = window_seconds
+        self._max_delay_seconds = max_delay_seconds
+        self._clock = clock
+        # (message, key) -> [send at, send no later than, update]
+        self._pending: dict[tuple[str, str], list] = {}
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    def _limits(self) -> tuple[float, float]:
+        window = self._window_seconds
+        if window is None:
+            window = settings.slack.message_update_window_seconds
+        max_delay = self._max_delay_seconds
+        if max_delay is None:
+            max_delay = settings.slack.message_update_max_delay_seconds
+
+        return window, max(window, max_delay)
+
+    def submit(self, message: str, key: str, update: Callable[[], None]):
+        """
+        Schedule update for the message identified by message and key,
+        replacing any update for it that has not been sent yet
+        """
+
+        updates_requested.inc(message=message)
+        window, max_delay = self._limits()
+        if window <= 0 or self._stopped:
+            self._run(message, key, update)
+            return
+
+        with self._cond:
+            now = self._clock()
+            pending = self._pending.get((message, key))
+            if pending is None:
+                self._pending[(message, key)] = [
+                    now + window,
+                    now + max_delay,
+                    update,
+                ]
+            else:
+                pending[0] = min(now + window, pending[1])
+                pending[2] = update
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._work, daemon=True, name="message-updates"
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self, message: str, key: str, update: Callable[[], None]):
+        updates_sent.inc(message=message)
+        try:
+            update()
+        except Exception as error:
+            logger.exception(
+                "error updating slack message", message=message, key=key, error=error
+            )
+
+    def _take(self, due_by: float) -> list[tuple[tuple[str, str], Callable]]:
+        due = [
+            (name, pending[2])
+            for name, pending in self._pending.items()
+            if pending[0] <= due_by
+        ]
+        for name, _ in due:
+            del self._pending[name]
+
+        return due
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    due = self._take(self._clock())
+                    if due:
+                        break
+                    timeout = None
+                    if self._pending:
+                        timeout = (
+                            min(pending[0] for pending in self._pending.values())
+                            - self._clock()
+                        )
+                    self._cond.wait(timeout)
+
+            for (message, key), update in due:
+                self._run(message, key, update)
+
+    def flush(self):
+        """
+        Send every pending update now, on the calling thread
+        """
+
+        with self._cond:
+            due = self._take(float("inf"))
+        for (message, key), update in due:
+            self._run(message, key, update)
+
+    def shutdown(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self.flush()
+
+
+message_updates = MessageUpdateCoalescer()
@@ -13,6 +13,20 @@ def db_check() -> None:
         sys.exit(1)
 
 
+def attachment_check() -> None:
+    # Only Slack pins images, and only while enable_pinned_images is on
+    if settings.platform != "slack" or not settings.enable_pinned_images:
+        return
+
+    from incidentbot.attachments.store import get_attachment_store
+
+    try:
+        get_attachment_store()
+    except ValueError as error:
+        logger.fatal(str(error))
+        sys.exit(1)
+
+
 def startup_tasks() -> None:
     match settings.platform:
         case "slack":
@@ -24,6 +38,11 @@ def startup_tasks() -> None:
             update_slack_channel_list()
             update_slack_user_list()
 
+    if settings.reminders:
+        from incidentbot.incident.reminders import reminder_sweeper
+
+        reminder_sweeper.rehydrate()
+
     if (
         settings.integrations
         and settings.integrations.atlassian
@@ -122,10 +141,29 @@ def connect_platform() -> None:
     """Start the platform event listener in a background thread (non-blocking)."""
     match settings.platform:
         case "slack":
-            from incidentbot.slack.handler import app as slack_app
-            from slack_bolt.adapter.socket_mode import SocketModeHandler
-
-            SocketModeHandler(slack_app, settings.SLACK_APP_TOKEN).connect()
+            from incidentbot.slack.handler import app as slack_listeners
+
+            if settings.slack.handler_mode == "async":
+                from incidentbot.slack.dispatch import AsyncDispatcher
+
+                AsyncDispatcher(
+                    workers=settings.slack.handler_workers,
+                    default_concurrency=settings.slack.default_handler_concurrency,
+                    concurrency=settings.slack.handler_concurrency,
+                ).connect(
+                    slack_listeners,
+                    settings.SLACK_BOT_TOKEN,
+                    settings.SLACK_APP_TOKEN,
+                )
+            else:
+                from incidentbot.slack.client import slack_web_client
+                from slack_bolt.adapter.socket_mode import SocketModeHandler
+
+                slack_app = slack_listeners.build_app(
+                    slack_web_client,
+                    workers=settings.slack.handler_workers,
+                )
+                SocketModeHandler(slack_app, settings.SLACK_APP_TOKEN).connect()
         case "matrix":
             from incidentbot.matrix.handler import MatrixHandler
             from incidentbot.platform import get_adapter
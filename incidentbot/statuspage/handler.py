@@ -6,6 +6,7 @@ from incidentbot.logging import logger
 from incidentbot.models.database import engine, StatuspageIncidentRecord
 from incidentbot.models.incident import IncidentDatabaseInterface
 from incidentbot.slack.client import slack_web_client
+from incidentbot.util.tracing import traced
 from sqlmodel import Session, select
 from typing import Any
 
@@ -37,6 +38,7 @@ class StatuspageIncident:
             }
         }
 
+    @traced("statuspage", "create_incident")
     def start(self) -> str:
         """
         Start the incident
@@ -112,6 +114,7 @@ class StatuspageIncidentUpdate:
     """
 
     @staticmethod
+    @traced("statuspage", "update_incident")
     def update(channel_id: str, message: str, status: str):
         """
         Update Statuspage incident
@@ -0,0 +1,303 @@
+import threading
+
+from collections.abc import Iterator
+
+# Default latency buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class _Metric:
+    """
+    Base class for in-process metrics
+
+    Each thread writes to its own shard so the hot path never takes a lock;
+    the shards are only summed when the metric is collected.
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._retire_dead_shards()
+                self._shards.append((threading.current_thread(), shard))
+
+        return shard
+
+    def _retire_dead_shards(self):
+        # Fold shards owned by finished threads into a single dict so
+        # short-lived worker threads don't grow the shard list without bound
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for key, value in shard.items():
+                    self._merge(self._retired, key, value)
+        self._shards = live
+
+    def _merge(self, into: dict, key: tuple[str, ...], value):
+        into[key] = into.get(key, 0) + value
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _snapshot(self) -> dict:
+        with self._shards_lock:
+            self._retire_dead_shards()
+            totals = {}
+            for key, value in self._retired.items():
+                self._merge(totals, key, value)
+            for _, shard in self._shards:
+                for key, value in list(shard.items()):
+                    self._merge(totals, key, value)
+
+        return totals
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        return self._snapshot()
+
+    def value(self, **labels) -> float:
+        return self.samples().get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """
+    A value that can go up and down
+
+    Gauges are set far less often than counters are incremented, so a single
+    shared mapping is used and set() simply overwrites the last value.
+    """
+
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._shards_lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> dict[tuple[str, ...], float]:
+        return dict(self._values)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # [per-bucket counts..., +Inf count, sum]
+            state = shard[key] = [0] * (len(self.buckets) + 2)
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        else:
+            state[len(self.buckets)] += 1
+
+        state[-1] += value
+
+    def _merge(self, into: dict, key: tuple[str, ...], value: list[float]):
+        total = into.setdefault(key, [0] * len(value))
+        for i, v in enumerate(list(value)):
+            total[i] += v
+
+    def samples(self) -> dict[tuple[str, ...], list[float]]:
+        return self._snapshot()
+
+    def count(self, **labels) -> int:
+        state = self.samples().get(self._key(labels))
+
+        return int(sum(state[:-1])) if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self.samples().get(self._key(labels))
+
+        return state[-1] if state else 0.0
+
+
+class Registry:
+    """
+    Process-wide collection of metrics, keyed by name
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, *args, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(
+                    f"metric {name} is already registered as a {metric.type}"
+                )
+
+            return metric
+
+    def __iter__(self) -> Iterator[_Metric]:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return iter(metrics)
+
+    def get(self, name: str) -> _Metric | None:
+        return self._metrics.get(name)
+
+
+REGISTRY = Registry()
+
+
+def counter(
+    name: str, documentation: str, labelnames: tuple[str, ...] = ()
+) -> Counter:
+    """
+    Return the counter registered under name, creating it if needed
+    """
+
+    return REGISTRY._get_or_create(Counter, name, documentation, labelnames)
+
+
+def gauge(
+    name: str, documentation: str, labelnames: tuple[str, ...] = ()
+) -> Gauge:
+    """
+    Return the gauge registered under name, creating it if needed
+    """
+
+    return REGISTRY._get_or_create(Gauge, name, documentation, labelnames)
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: tuple[str, ...] = (),
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+) -> Histogram:
+    """
+    Return the histogram registered under name, creating it if needed
+    """
+
+    return REGISTRY._get_or_create(
+        Histogram, name, documentation, labelnames, buckets=buckets
+    )
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(names, values, strict=True), *extra.items()]
+    if not pairs:
+        return ""
+
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(registry: Registry = REGISTRY) -> str:
+    """
+    Render every metric in registry in the Prometheus text exposition format
+    """
+
+    lines = []
+    for metric in sorted(registry, key=lambda m: m.name):
+        lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+
+        for key, value in sorted(metric.samples().items()):
+            if not isinstance(metric, Histogram):
+                lines.append(
+                    f"{metric.name}{_labels(metric.labelnames, key)} {_number(value)}"
+                )
+                continue
+
+            # Observations only land in their own bucket, Prometheus buckets
+            # are cumulative
+            cumulative = 0
+            for bound, count in zip(
+                (*metric.buckets, float("inf")), value[:-1], strict=True
+            ):
+                cumulative += count
+                le = _labels(metric.labelnames, key, le=_number(bound))
+                lines.append(f"{metric.name}_bucket{le} {_number(cumulative)}")
+            labels = _labels(metric.labelnames, key)
+            lines.append(f"{metric.name}_sum{labels} {_number(value[-1])}")
+            lines.append(f"{metric.name}_count{labels} {_number(cumulative)}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,344 @@
+import contextvars
+import functools
+import inspect
+import os
+import queue
+import threading
+import time
+
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+import requests
+
+from incidentbot.configuration.settings import settings
+from incidentbot.logging import logger
+from incidentbot.util import metrics
+
+span_duration = metrics.histogram(
+    "incidentbot_span_duration_seconds",
+    "Duration of incident lifecycle steps and the external calls they make",
+    ("system", "operation"),
+)
+span_errors = metrics.counter(
+    "incidentbot_span_errors_total",
+    "Spans that ended with an exception",
+    ("system", "operation"),
+)
+
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "incidentbot_span", default=None
+)
+
+
+class Span:
+    """
+    A timed unit of work, such as one Slack API call or one status change
+
+    Spans nest through a context variable: a span started while another is
+    current becomes its child, shares its trace id and inherits the incident
+    slug it is tagged with.
+    """
+
+    __slots__ = (
+        "system",
+        "operation",
+        "attributes",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "incident",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_start",
+    )
+
+    def __init__(
+        self,
+        system: str,
+        operation: str,
+        parent: Span | None = None,
+        **attributes: Any,
+    ):
+        self.system = system
+        self.operation = operation
+        self.attributes = attributes
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.incident = parent.incident if parent else None
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.error: BaseException | None = None
+        self._start = time.perf_counter()
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self._start
+
+    def end(self, error: BaseException | None = None):
+        if self.end_ns is not None:
+            return
+
+        elapsed = self.duration
+        self.end_ns = time.time_ns()
+        self.error = error
+
+        span_duration.observe(elapsed, system=self.system, operation=self.operation)
+        if error is not None:
+            span_errors.inc(system=self.system, operation=self.operation)
+
+        exporter = get_exporter()
+        if exporter is not None:
+            exporter.export(self)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def start_span(system: str, operation: str, **attributes: Any) -> Span:
+    """
+    Start a span without making it current
+
+    For work whose start and end happen in separate callbacks; call end()
+    on the returned span when it finishes.
+    """
+
+    return Span(system, operation, parent=_current.get(), **attributes)
+
+
+@contextmanager
+def span(system: str, operation: str, **attributes: Any) -> Iterator[Span]:
+    """
+    Time a block of work as a span of system (slack, jira, db, ...)
+
+    Spans started inside the block, including in worker threads that were
+    handed a copy of the current context, become children of this one.
+    """
+
+    current = start_span(system, operation, **attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as error:
+        current.end(error)
+        raise
+    finally:
+        _current.reset(token)
+        current.end()
+
+
+def traced(system: str, operation: str | None = None) -> Callable:
+    """
+    Decorator that runs a function, or coroutine function, inside a span
+    named after it
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = operation or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(system, name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(system, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def set_incident(slug: str | None):
+    """
+    Tag the current span, and every span started under it from now on, with
+    an incident slug
+    """
+
+    current = _current.get()
+    if current is not None and slug:
+        current.incident = slug
+
+
+class OTLPExporter:
+    """
+    Sends finished spans to an OpenTelemetry collector using OTLP/HTTP with
+    JSON encoding
+
+    Spans are queued and posted in batches from a background thread so the
+    calls being timed never wait on the collector. When the queue is full new
+    spans are dropped rather than blocking.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service_name: str = "incidentbot",
+        batch_size: int = 256,
+        flush_interval_seconds: float = 5.0,
+        max_queue_size: int = 4096,
+    ):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: queue.Queue[Span] = queue.Queue(maxsize=max_queue_size)
+        self._session = requests.Session()
+        self._stopped = threading.Event()
+        self.dropped = 0
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="otlp-exporter"
+        )
+        self._thread.start()
+
+    def export(self, finished: Span):
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _drain(self) -> list[Span]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval_seconds):
+            self.flush()
+
+    def flush(self):
+        while batch := self._drain():
+            try:
+                self._session.post(
+                    self.url, json=self.encode(batch), timeout=10
+                ).raise_for_status()
+            except Exception as error:
+                logger.warning(
+                    "failed to export spans", url=self.url, spans=len(batch), error=error
+                )
+
+    def shutdown(self):
+        self._stopped.set()
+        self.flush()
+        self._session.close()
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> dict:
+        if isinstance(value, bool):
+            encoded = {"boolValue": value}
+        elif isinstance(value, int):
+            encoded = {"intValue": str(value)}
+        elif isinstance(value, float):
+            encoded = {"doubleValue": value}
+        else:
+            encoded = {"stringValue": str(value)}
+
+        return {"key": key, "value": encoded}
+
+    def encode(self, batch: list[Span]) -> dict:
+        spans = []
+        for item in batch:
+            attributes = {"incidentbot.system": item.system, **item.attributes}
+            if item.incident:
+                attributes["incident.slug"] = item.incident
+
+            encoded = {
+                "traceId": item.trace_id,
+                "spanId": item.span_id,
+                "name": f"{item.system}.{item.operation}",
+                # SPAN_KIND_CLIENT for calls out, SPAN_KIND_INTERNAL otherwise
+                "kind": 1 if item.system == "incident" else 3,
+                "startTimeUnixNano": str(item.start_ns),
+                "endTimeUnixNano": str(item.end_ns),
+                "attributes": [
+                    self._attribute(key, value) for key, value in attributes.items()
+                ],
+                "status": (
+                    {"code": 2, "message": repr(item.error)}
+                    if item.error is not None
+                    else {"code": 1}
+                ),
+            }
+            if item.parent_id:
+                encoded["parentSpanId"] = item.parent_id
+            spans.append(encoded)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            self._attribute("service.name", self.service_name)
+                        ]
+                    },
+                    "scopeSpans": [
+                        {"scope": {"name": "incidentbot"}, "spans": spans}
+                    ],
+                }
+            ]
+        }
+
+
+_exporter: OTLPExporter | None = None
+_exporter_lock = threading.Lock()
+_exporter_configured = False
+# Set for good by shutdown_exporter so spans ending afterwards, from threads
+# still winding down, don't start a new exporter and thread
+_exporter_shut_down = False
+
+
+def get_exporter() -> OTLPExporter | None:
+    """
+    Return the OTLP exporter if TRACING_OTLP_ENDPOINT is set, creating it on
+    first use
+
+    Returns None once shutdown_exporter has run.
+    """
+
+    global _exporter, _exporter_configured
+
+    if _exporter_shut_down:
+        return None
+
+    if not _exporter_configured:
+        with _exporter_lock:
+            if not _exporter_configured and not _exporter_shut_down:
+                endpoint = settings.TRACING_OTLP_ENDPOINT
+                if isinstance(endpoint, str) and endpoint:
+                    _exporter = OTLPExporter(
+                        endpoint, service_name=settings.TRACING_SERVICE_NAME
+                    )
+                    logger.info("exporting traces", endpoint=endpoint)
+                _exporter_configured = True
+
+    return _exporter
+
+
+def shutdown_exporter():
+    """
+    Flush and stop the OTLP exporter; spans that end afterwards are no longer
+    exported
+    """
+
+    global _exporter, _exporter_shut_down
+
+    with _exporter_lock:
+        _exporter_shut_down = True
+        if _exporter is not None:
+            _exporter.shutdown()
+        _exporter = None
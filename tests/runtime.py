@@ -2,6 +2,8 @@ import importlib
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
+from incidentbot.configuration.lookups import build_lookups
+
 
 def load_module(
     module_path: str,
@@ -53,6 +55,7 @@ def load_module(
         mock_settings.DATABASE_URI = "sqlite:///:memory:"
         mock_settings.options = mock_options
         mock_settings.statuses = default_statuses
+        mock_settings.lookups = build_lookups(statuses=default_statuses)
         mock_settings.icons = default_icons
         mock_settings.integrations = integrations
         mock_settings.links = links
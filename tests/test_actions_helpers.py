@@ -8,7 +8,7 @@ The settings object inside the loaded module is then patched per-test as needed.
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-
+from incidentbot.configuration.lookups import build_lookups
 from tests.runtime import load_module
 
 # ---------------------------------------------------------------------------
@@ -29,6 +29,7 @@ def _make_settings(
 ):
     s = MagicMock()
     s.statuses = statuses or {}
+    s.lookups = build_lookups(statuses=s.statuses)
     s.integrations = integrations
     s.pin_content_reacji = pin_content_reacji
     if atlassian_api_url is not None:
@@ -287,3 +288,76 @@ class TestIsPostmortemAnnouncementMessage:
             ]
         }
         assert _actions._is_postmortem_announcement_message(message) is True
+
+
+# ---------------------------------------------------------------------------
+# ingest_pinned_image
+# ---------------------------------------------------------------------------
+
+class TestIngestPinnedImage:
+    _incident = SimpleNamespace(id=7, slug="inc-7")
+    _message = {"ts": "1700000000.000100", "user": "U1"}
+    _file = {
+        "id": "F1",
+        "name": "graph.png",
+        "mimetype": "image/png",
+        "url_private": "https://files.slack.com/files-pri/T1-F1/graph.png",
+        "permalink_public": "https://slack-files.com/T1-F1-abc123",
+        "public_url_shared": True,
+    }
+
+    def _run(self, download):
+        client = MagicMock()
+        settings = _make_settings()
+        settings.attachments.max_size_mb = 25
+        with (
+            patch.object(_actions, "settings", settings),
+            patch.object(_actions, "slack_web_client", client),
+            patch.object(_actions.attachment_ingestor, "download", download),
+            patch.object(_actions, "EventLogHandler") as event_log,
+            patch.object(_actions, "get_slack_user", return_value={"real_name": "Ada"}),
+        ):
+            result = _actions.ingest_pinned_image(
+                self._incident, self._message, self._file, "C123"
+            )
+        return result, client, event_log
+
+    def test_success_records_event_and_reacts(self):
+        download = MagicMock(return_value=("a" * 64, 1234))
+
+        result, client, event_log = self._run(download)
+
+        assert result is True
+        assert download.call_args.kwargs["params"] == {"pub_secret": "abc123"}
+        kwargs = event_log.create.call_args.kwargs
+        assert kwargs["image_hash"] == "a" * 64
+        assert kwargs["image_size"] == 1234
+        assert "image" not in kwargs
+        assert kwargs["user"] == "Ada"
+        client.reactions_add.assert_called_once_with(
+            channel="C123", name="white_check_mark", timestamp=self._message["ts"]
+        )
+        client.chat_postMessage.assert_not_called()
+
+    def test_oversize_image_is_reported(self):
+        download = MagicMock(
+            side_effect=_actions.AttachmentTooLargeError("too big")
+        )
+
+        result, client, event_log = self._run(download)
+
+        assert result is False
+        event_log.create.assert_not_called()
+        text = client.chat_postMessage.call_args.kwargs["text"]
+        assert "25 MB limit" in text
+
+    def test_download_failure_is_reported(self):
+        download = MagicMock(side_effect=ConnectionError("reset by 10.0.0.5"))
+
+        result, client, event_log = self._run(download)
+
+        assert result is False
+        event_log.create.assert_not_called()
+        text = client.chat_postMessage.call_args.kwargs["text"]
+        assert "Something went wrong" in text
+        assert "10.0.0.5" not in text
@@ -5,6 +5,8 @@ in incidentbot/incident/actions.py
 import asyncio
 from unittest.mock import MagicMock, patch
 
+from incidentbot.configuration.lookups import build_lookups
+
 _mock_settings = MagicMock()
 _mock_settings.IS_TEST_ENVIRONMENT = True
 _mock_settings.DATABASE_URI = "sqlite:///:memory:"
@@ -12,6 +14,9 @@ _mock_settings.SLACK_BOT_TOKEN = "xoxb-test"
 _mock_settings.LOG_LEVEL = "INFO"
 _mock_settings.options.timezone = "UTC"
 _mock_settings.integrations = None
+# Send roles panel and digest edits straight away rather than batching them
+_mock_settings.slack.message_update_window_seconds = 0
+_mock_settings.slack.message_update_max_delay_seconds = 0
 _mock_settings.statuses = {
     "investigating": MagicMock(final=False, initial=True),
     "resolved": MagicMock(final=True, initial=False),
@@ -20,6 +25,9 @@ _mock_settings.roles = {
     "incident_commander": MagicMock(is_lead=True, description="The IC."),
     "scribe": MagicMock(is_lead=False, description="The scribe."),
 }
+_mock_settings.lookups = build_lookups(
+    statuses=_mock_settings.statuses, roles=_mock_settings.roles
+)
 
 with (
     patch("incidentbot.configuration.settings.settings", _mock_settings),
@@ -5,6 +5,8 @@ import unittest
 from datetime import datetime, UTC
 from unittest.mock import MagicMock, patch
 
+from incidentbot.configuration.lookups import build_lookups
+
 # ── Patch boot-time deps before any incidentbot import ────────────────────────
 _mock_settings = MagicMock()
 _mock_settings.API_KEY = None
@@ -17,6 +19,7 @@ _mock_settings.statuses = {
     "investigating": MagicMock(final=False),
     "resolved": MagicMock(final=True),
 }
+_mock_settings.lookups = build_lookups(statuses=_mock_settings.statuses)
 
 with (
     patch("incidentbot.configuration.settings.settings", _mock_settings),
@@ -25,7 +28,7 @@ with (
 ):
     from fastapi import FastAPI
     from fastapi.testclient import TestClient
-    from incidentbot.api.routes.incidents import router
+    from incidentbot.api.routes.incidents import _metrics_cache, router
 
 _app = FastAPI()
 _app.include_router(router)
@@ -73,9 +76,9 @@ def _make_session(incidents=None, participants=None, count=None):
         count if count is not None else len(incidents)
     )
 
-    # exec(...).all() is called once for the incident list, then once per
-    # incident for participants — wire up side_effect for sequential calls.
-    exec_all_values = [incidents] + [participants] * max(len(incidents), 1)
+    # exec(...).all() is called once for the incident list, then once for the
+    # participants of the whole page — wire up side_effect for sequential calls.
+    exec_all_values = [incidents, participants]
     exec_mock = MagicMock()
     exec_mock.all.side_effect = exec_all_values
     session.exec.return_value = exec_mock
@@ -83,44 +86,17 @@ def _make_session(incidents=None, participants=None, count=None):
     return session
 
 
-def _make_metrics_session(
-    total=0,
-    open_count=0,
-    severity_rows=None,
-    status_rows=None,
-    avg_seconds=None,
-    last_7=0,
-    last_30=0,
-):
-    """Return a mock Session context manager for the metrics route."""
+def _make_metrics_session(rows=None):
+    """Return a mock Session context manager for the metrics route.
+
+    rows are the per (severity, status) aggregates returned by the single
+    grouped query: (severity, status, count, last_7, last_30,
+    resolution_seconds, rows_with_updated_at).
+    """
     session = MagicMock()
     session.__enter__ = MagicMock(return_value=session)
     session.__exit__ = MagicMock(return_value=False)
-
-    # Build per-call results for session.execute in the order the route calls them:
-    #   1. total count         → scalar_one
-    #   2. open count          → scalar_one
-    #   3. by_severity GROUP BY → all
-    #   4. by_status  GROUP BY  → all
-    #   5. avg MTTR             → scalar
-    #   6. last_7_days count    → scalar_one
-    #   7. last_30_days count   → scalar_one
-    def _r(scalar_one=None, scalar=None, all_val=None):
-        m = MagicMock()
-        m.scalar_one.return_value = scalar_one
-        m.scalar.return_value = scalar
-        m.all.return_value = all_val or []
-        return m
-
-    session.execute.side_effect = [
-        _r(scalar_one=total),
-        _r(scalar_one=open_count),
-        _r(all_val=severity_rows or []),
-        _r(all_val=status_rows or []),
-        _r(scalar=avg_seconds),
-        _r(scalar_one=last_7),
-        _r(scalar_one=last_30),
-    ]
+    session.execute.return_value.all.return_value = rows or []
     return session
 
 
@@ -159,6 +135,7 @@ class TestListIncidents(unittest.TestCase):
         participant.user_id = "U001"
         participant.user_name = "alice"
         participant.is_lead = True
+        participant.parent = inc.id
         session = _make_session(incidents=[inc], participants=[participant])
         with patch("incidentbot.api.routes.incidents.Session", return_value=session):
             resp = client.get("/api/v1/incidents")
@@ -218,15 +195,24 @@ class TestGetIncident(unittest.TestCase):
 
 
 class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        _metrics_cache.clear()
+        patcher = patch(
+            "incidentbot.api.routes.incidents.settings.API_METRICS_CACHE_SECONDS",
+            30,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(_metrics_cache.clear)
+
     def test_returns_200_with_correct_shape(self):
         session = _make_metrics_session(
-            total=10,
-            open_count=3,
-            severity_rows=[("sev1", 2), ("sev2", 8)],
-            status_rows=[("investigating", 3), ("resolved", 7)],
-            avg_seconds=7200.0,
-            last_7=2,
-            last_30=5,
+            rows=[
+                ("sev1", "investigating", 2, 1, 2, None, 0),
+                ("sev1", "resolved", 0, 0, 0, None, 0),
+                ("sev2", "investigating", 1, 0, 1, None, 0),
+                ("sev2", "resolved", 7, 1, 2, 50400.0, 7),
+            ]
         )
         with patch("incidentbot.api.routes.incidents.Session", return_value=session):
             resp = client.get("/api/v1/metrics")
@@ -241,8 +227,47 @@ class TestMetrics(unittest.TestCase):
         self.assertEqual(body["last_7_days"], 2)
         self.assertEqual(body["last_30_days"], 5)
 
+    def test_issues_a_single_query(self):
+        session = _make_metrics_session(
+            rows=[("sev2", "investigating", 4, 4, 4, None, 0)]
+        )
+        with patch("incidentbot.api.routes.incidents.Session", return_value=session):
+            client.get("/api/v1/metrics")
+
+        self.assertEqual(session.execute.call_count, 1)
+
+    def test_null_severity_and_status_are_unknown(self):
+        session = _make_metrics_session(rows=[(None, None, 2, 0, 0, None, 0)])
+        with patch("incidentbot.api.routes.incidents.Session", return_value=session):
+            body = client.get("/api/v1/metrics").json()
+
+        self.assertEqual(body["by_severity"], {"unknown": 2})
+        self.assertEqual(body["by_status"], {"unknown": 2})
+        self.assertEqual(body["open"], 0)
+
+    def test_severities_are_listed_most_severe_first(self):
+        session = _make_metrics_session(
+            rows=[
+                (None, "investigating", 1, 0, 0, None, 0),
+                ("sev2", "investigating", 2, 0, 0, None, 0),
+                ("sev1", "investigating", 3, 0, 0, None, 0),
+            ]
+        )
+        lookups = build_lookups(
+            statuses=_mock_settings.statuses, severities={"sev1": "", "sev2": ""}
+        )
+        with (
+            patch("incidentbot.api.routes.incidents.Session", return_value=session),
+            patch("incidentbot.api.routes.incidents.settings.lookups", lookups),
+        ):
+            body = client.get("/api/v1/metrics").json()
+
+        self.assertEqual(list(body["by_severity"]), ["sev1", "sev2", "unknown"])
+
     def test_mttr_is_none_when_no_resolved_incidents(self):
-        session = _make_metrics_session(avg_seconds=None)
+        session = _make_metrics_session(
+            rows=[("sev2", "investigating", 3, 0, 0, 3600.0, 3)]
+        )
         with patch("incidentbot.api.routes.incidents.Session", return_value=session):
             resp = client.get("/api/v1/metrics")
         self.assertIsNone(resp.json()["mttr_hours"])
@@ -258,6 +283,52 @@ class TestMetrics(unittest.TestCase):
         self.assertEqual(body["by_status"], {})
         self.assertIsNone(body["mttr_hours"])
 
+    def test_repeated_polls_are_served_from_cache(self):
+        session = _make_metrics_session(
+            rows=[("sev2", "investigating", 1, 1, 1, None, 0)]
+        )
+        with patch("incidentbot.api.routes.incidents.Session", return_value=session):
+            first = client.get("/api/v1/metrics")
+            second = client.get("/api/v1/metrics")
+
+        self.assertEqual(session.execute.call_count, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first.headers["etag"], second.headers["etag"])
+
+    def test_cache_expires_after_ttl(self):
+        session = _make_metrics_session()
+        with (
+            patch("incidentbot.api.routes.incidents.Session", return_value=session),
+            patch(
+                "incidentbot.api.routes.incidents.settings.API_METRICS_CACHE_SECONDS",
+                0,
+            ),
+        ):
+            client.get("/api/v1/metrics")
+            client.get("/api/v1/metrics")
+
+        self.assertEqual(session.execute.call_count, 2)
+
+    def test_matching_if_none_match_returns_304(self):
+        session = _make_metrics_session()
+        with patch("incidentbot.api.routes.incidents.Session", return_value=session):
+            etag = client.get("/api/v1/metrics").headers["etag"]
+            resp = client.get(
+                "/api/v1/metrics", headers={"If-None-Match": f'"other", {etag}'}
+            )
+
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.headers["etag"], etag)
+        self.assertEqual(resp.content, b"")
+
+    def test_stale_if_none_match_returns_body(self):
+        session = _make_metrics_session()
+        with patch("incidentbot.api.routes.incidents.Session", return_value=session):
+            resp = client.get("/api/v1/metrics", headers={"If-None-Match": '"stale"'})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["total"], 0)
+
 
 # ── API key auth ──────────────────────────────────────────────────────────────
 
@@ -268,6 +339,7 @@ class TestApiKeyAuth(unittest.TestCase):
         m.configure_mock(**{k: getattr(_mock_settings, k) for k in dir(_mock_settings)})
         m.API_KEY = key
         m.statuses = _mock_settings.statuses
+        m.lookups = _mock_settings.lookups
         return m
 
     def test_no_key_set_allows_all_requests(self):
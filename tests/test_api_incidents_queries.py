@@ -0,0 +1,191 @@
+"""
+Query-count benchmarks for GET /api/v1/incidents against a SQLite engine.
+
+The number of SQL statements issued per request must not grow with page size.
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from incidentbot.api.routes.incidents import router
+from incidentbot.models.database import IncidentParticipant, IncidentRecord
+
+_app = FastAPI()
+_app.include_router(router)
+client = TestClient(_app)
+
+
+@contextmanager
+def count_statements(engine):
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture()
+def seeded_engine(db_engine):
+    base = datetime(2025, 1, 1)
+    with Session(db_engine) as session:
+        for i in range(1, 121):
+            session.add(
+                IncidentRecord(
+                    id=i,
+                    slug=f"inc-{i}",
+                    status="investigating",
+                    severity="sev2",
+                    created_at=base + timedelta(minutes=i),
+                )
+            )
+            for role in ("incident_commander", "scribe"):
+                session.add(
+                    IncidentParticipant(
+                        parent=i,
+                        role=role,
+                        user_id=f"U{i}",
+                        user_name=f"user-{i}",
+                        is_lead=role == "incident_commander",
+                    )
+                )
+        session.commit()
+
+    with (
+        patch("incidentbot.api.routes.incidents.engine", db_engine),
+        patch("incidentbot.api.routes.incidents.settings.API_KEY", None),
+    ):
+        yield db_engine
+
+
+class TestIncidentListQueryCount:
+    @pytest.mark.parametrize("limit", [1, 10, 100])
+    def test_constant_statements_per_page(self, seeded_engine, limit):
+        with count_statements(seeded_engine) as statements:
+            resp = client.get(f"/api/v1/incidents?limit={limit}")
+
+        assert resp.status_code == 200
+        incidents = resp.json()["incidents"]
+        assert len(incidents) == limit
+        assert all(len(i["participants"]) == 2 for i in incidents)
+        # count + page + participants for the whole page
+        assert len(statements) == 3
+
+    def test_get_incident_uses_two_statements(self, seeded_engine):
+        with count_statements(seeded_engine) as statements:
+            resp = client.get("/api/v1/incidents/7")
+
+        assert resp.status_code == 200
+        assert [p["role"] for p in resp.json()["participants"]] == [
+            "incident_commander",
+            "scribe",
+        ]
+        assert len(statements) == 2
+
+
+class TestIncidentListCursor:
+    def test_walks_every_incident_once(self, seeded_engine):
+        seen = []
+        resp = client.get("/api/v1/incidents?limit=50&include_total=false")
+        while True:
+            assert resp.status_code == 200
+            body = resp.json()
+            assert body["total"] is None
+            seen.extend(i["id"] for i in body["incidents"])
+            if not body["next_cursor"]:
+                break
+            resp = client.get(
+                "/api/v1/incidents",
+                params={
+                    "limit": 50,
+                    "include_total": "false",
+                    "cursor": body["next_cursor"],
+                },
+            )
+
+        assert seen == list(range(120, 0, -1))
+
+    def test_ties_on_created_at_are_broken_by_id(self, db_engine):
+        created_at = datetime(2025, 1, 1)
+        with Session(db_engine) as session:
+            for i in range(1, 6):
+                session.add(IncidentRecord(id=i, created_at=created_at))
+            session.commit()
+
+        with (
+            patch("incidentbot.api.routes.incidents.engine", db_engine),
+            patch("incidentbot.api.routes.incidents.settings.API_KEY", None),
+        ):
+            first = client.get("/api/v1/incidents?limit=2").json()
+            second = client.get(
+                "/api/v1/incidents",
+                params={"limit": 2, "cursor": first["next_cursor"]},
+            ).json()
+
+        assert [i["id"] for i in first["incidents"]] == [5, 4]
+        assert [i["id"] for i in second["incidents"]] == [3, 2]
+
+    def test_last_page_has_no_cursor(self, seeded_engine):
+        resp = client.get("/api/v1/incidents?limit=120")
+
+        assert resp.json()["next_cursor"] is None
+
+    def test_skipping_total_saves_a_statement(self, seeded_engine):
+        with count_statements(seeded_engine) as statements:
+            resp = client.get("/api/v1/incidents?limit=10&include_total=false")
+
+        assert resp.status_code == 200
+        assert len(statements) == 2
+
+    def test_cursor_with_offset_is_rejected(self, seeded_engine):
+        cursor = client.get("/api/v1/incidents?limit=1").json()["next_cursor"]
+        resp = client.get(
+            "/api/v1/incidents", params={"cursor": cursor, "offset": 5}
+        )
+
+        assert resp.status_code == 400
+
+    def test_invalid_cursor_is_rejected(self, seeded_engine):
+        resp = client.get("/api/v1/incidents?cursor=not-a-cursor")
+
+        assert resp.status_code == 400
+
+
+class TestIncidentListProjection:
+    def test_only_requested_fields_are_returned(self, seeded_engine):
+        resp = client.get("/api/v1/incidents?limit=3&fields=slug,status")
+
+        assert resp.status_code == 200
+        for incident in resp.json()["incidents"]:
+            assert set(incident) == {"id", "slug", "status"}
+
+    def test_participants_are_skipped_unless_requested(self, seeded_engine):
+        with count_statements(seeded_engine) as statements:
+            client.get("/api/v1/incidents?limit=10&fields=slug")
+        assert len(statements) == 2
+
+        with count_statements(seeded_engine) as statements:
+            resp = client.get("/api/v1/incidents?limit=10&fields=participants")
+        assert len(statements) == 3
+        assert all(len(i["participants"]) == 2 for i in resp.json()["incidents"])
+
+    def test_full_response_is_unchanged_without_fields(self, seeded_engine):
+        incident = client.get("/api/v1/incidents?limit=1").json()["incidents"][0]
+
+        assert "description" in incident and incident["description"] is None
+        assert incident["slug"] == "inc-120"
+
+    def test_unknown_field_is_rejected(self, seeded_engine):
+        resp = client.get("/api/v1/incidents?fields=slug,password")
+
+        assert resp.status_code == 400
@@ -0,0 +1,110 @@
+"""
+Tests for incidentbot/attachments/ingest.py :: AttachmentIngestor
+"""
+import hashlib
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+import requests
+import requests_mock
+
+from incidentbot.attachments.ingest import AttachmentIngestor
+from incidentbot.attachments.store import FilesystemAttachmentStore
+from incidentbot.exceptions import AttachmentTooLargeError
+
+URL = "https://files.slack.com/files-pri/T1-F1/graph.png"
+
+
+@pytest.fixture()
+def store(tmp_path):
+    store = FilesystemAttachmentStore(tmp_path / "attachments")
+    with patch("incidentbot.attachments.ingest.get_attachment_store", return_value=store):
+        yield store
+
+
+@pytest.fixture()
+def ingestor(store):
+    attachments = SimpleNamespace(
+        download_timeout_seconds=5, ingest_workers=2, max_size_mb=1
+    )
+    with patch("incidentbot.attachments.ingest.settings") as settings:
+        settings.attachments = attachments
+        ingestor = AttachmentIngestor()
+        yield ingestor
+        ingestor.shutdown()
+
+
+def _stored_files(store):
+    return [p for p in store.root.rglob("*") if p.is_file()]
+
+
+class TestDownload:
+    def test_streams_into_store(self, ingestor, store):
+        body = b"\x89PNG" + b"x" * 200_000
+        with requests_mock.Mocker() as m:
+            m.get(URL, content=body)
+            key, size = ingestor.download(URL, headers={"Authorization": "Bearer t"})
+
+        assert key == hashlib.sha256(body).hexdigest()
+        assert size == len(body)
+        assert store.get(key) == body
+        assert m.last_request.headers["Authorization"] == "Bearer t"
+        assert m.last_request.timeout == (5, 5)
+        assert m.last_request.stream is True
+
+    def test_duplicate_download_is_stored_once(self, ingestor, store):
+        with requests_mock.Mocker() as m:
+            m.get(URL, content=b"same image")
+            first = ingestor.download(URL)
+            second = ingestor.download(URL)
+
+        assert first == second
+        assert len(_stored_files(store)) == 1
+
+    def test_session_is_shared(self, ingestor):
+        assert ingestor.session() is ingestor.session()
+
+    def test_rejects_declared_oversize_before_reading(self, ingestor, store):
+        with requests_mock.Mocker() as m:
+            m.get(
+                URL,
+                content=b"small",
+                headers={"Content-Length": str(2 * 1024 * 1024)},
+            )
+            with pytest.raises(AttachmentTooLargeError):
+                ingestor.download(URL)
+
+        assert _stored_files(store) == []
+
+    def test_rejects_oversize_while_streaming(self, ingestor, store):
+        with requests_mock.Mocker() as m:
+            m.get(URL, content=b"x" * (1024 * 1024 + 1))
+            with pytest.raises(AttachmentTooLargeError):
+                ingestor.download(URL)
+
+        assert _stored_files(store) == []
+
+    def test_http_errors_are_raised(self, ingestor, store):
+        with requests_mock.Mocker() as m:
+            m.get(URL, status_code=404)
+            with pytest.raises(requests.HTTPError):
+                ingestor.download(URL)
+
+        assert _stored_files(store) == []
+
+
+class TestSubmit:
+    def test_runs_job_in_background(self, ingestor):
+        future = ingestor.submit(lambda a, b: a + b, 1, b=2)
+
+        assert future.result(timeout=5) == 3
+
+    def test_job_errors_are_surfaced_on_future(self, ingestor):
+        def boom():
+            raise RuntimeError("download failed")
+
+        future = ingestor.submit(boom)
+
+        with pytest.raises(RuntimeError):
+            future.result(timeout=5)
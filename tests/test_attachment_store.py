@@ -0,0 +1,162 @@
+"""
+Tests for incidentbot/attachments/store.py
+"""
+import hashlib
+import os
+from unittest.mock import patch
+
+import pytest
+
+from incidentbot.attachments import store as store_module
+from incidentbot.attachments.store import FilesystemAttachmentStore
+
+
+@pytest.fixture()
+def store(tmp_path):
+    return FilesystemAttachmentStore(tmp_path / "attachments")
+
+
+class TestFilesystemAttachmentStore:
+    def test_put_returns_content_hash(self, store):
+        key = store.put(b"image-bytes")
+
+        assert key == hashlib.sha256(b"image-bytes").hexdigest()
+        assert store.exists(key)
+        assert store.get(key) == b"image-bytes"
+
+    def test_files_are_fanned_out_by_prefix(self, store):
+        key = store.put(b"image-bytes")
+
+        assert (store.root / key[:2] / key[2:4] / key).is_file()
+
+    def test_same_content_is_stored_once(self, store):
+        assert store.put(b"same") == store.put(b"same")
+
+        files = [p for p in store.root.rglob("*") if p.is_file()]
+        assert len(files) == 1
+
+    def test_put_stream_hashes_and_counts_chunks(self, store):
+        key, size = store.put_stream([b"abc", b"def", b"ghi"])
+
+        assert key == hashlib.sha256(b"abcdefghi").hexdigest()
+        assert size == 9
+        assert store.get(key) == b"abcdefghi"
+
+    def test_failed_stream_leaves_no_partial_file(self, store):
+        def chunks():
+            yield b"partial"
+            raise ConnectionError("download interrupted")
+
+        with pytest.raises(ConnectionError):
+            store.put_stream(chunks())
+
+        assert [p for p in store.root.rglob("*") if p.is_file()] == []
+
+    def test_iter_chunks_streams_content(self, store):
+        key = store.put(b"x" * 10)
+
+        assert list(store.iter_chunks(key, chunk_size=4)) == [b"xxxx", b"xxxx", b"xx"]
+
+    def test_delete_removes_content(self, store):
+        key = store.put(b"gone")
+        store.delete(key)
+        store.delete(key)
+
+        assert not store.exists(key)
+
+    @pytest.mark.parametrize("key", ["../../etc/passwd", "abc", "Z" * 64])
+    def test_invalid_keys_are_rejected(self, store, key):
+        with pytest.raises(ValueError):
+            store.exists(key)
+
+
+    def test_delete_keeps_recently_stored_content(self, store):
+        key = store.put(b"image-bytes")
+
+        assert store.delete(key, idle_seconds=60) is False
+        assert store.exists(key)
+
+        os.utime(store._path(key), (0, 0))
+        assert store.delete(key, idle_seconds=60) is True
+        assert not store.exists(key)
+
+    def test_put_racing_a_delete_keeps_the_content(self, store):
+        key = store.put(b"image-bytes")
+        real_replace = os.replace
+
+        def racing(reuse_first):
+            raced = []
+
+            def replace(src, dst):
+                # The first replace is delete moving the file aside; a put of
+                # the same content lands just before or just after it
+                if raced:
+                    return real_replace(src, dst)
+                raced.append(True)
+                if reuse_first:
+                    store.put(b"image-bytes")
+                real_replace(src, dst)
+                if not reuse_first:
+                    store.put(b"image-bytes")
+
+            return replace
+
+        for reuse_first in (True, False):
+            os.utime(store._path(key), (0, 0))
+            with patch.object(store_module.os, "replace", racing(reuse_first)):
+                store.delete(key, idle_seconds=60)
+
+            assert store.get(key) == b"image-bytes"
+            assert not list(store.root.rglob(".delete-*"))
+
+
+class TestGetAttachmentStore:
+    def test_builds_configured_store_once(self, tmp_path):
+        with (
+            patch.object(store_module, "_store", None),
+            patch.object(store_module, "settings") as settings,
+        ):
+            settings.attachments.backend = "filesystem"
+            settings.attachments.path = str(tmp_path)
+
+            first = store_module.get_attachment_store()
+            second = store_module.get_attachment_store()
+
+        assert first is second
+        assert isinstance(first, FilesystemAttachmentStore)
+        assert first.root == tmp_path
+
+    def test_unknown_backend_is_rejected(self):
+        with patch.object(store_module, "settings") as settings:
+            settings.attachments.backend = "tape"
+
+            with pytest.raises(ValueError):
+                store_module.build_attachment_store()
+
+    def test_unset_path_is_rejected(self):
+        with patch.object(store_module, "settings") as settings:
+            settings.attachments.backend = "filesystem"
+            settings.attachments.path = None
+
+            with pytest.raises(ValueError, match="attachments.path"):
+                store_module.build_attachment_store()
+
+    def test_startup_only_requires_a_path_when_pinning_images(self):
+        from incidentbot import startup
+
+        with (
+            patch.object(startup, "settings") as settings,
+            patch.object(store_module, "get_attachment_store") as get_store,
+        ):
+            get_store.side_effect = ValueError("attachments.path is not set")
+            settings.platform = "slack"
+            settings.enable_pinned_images = False
+            startup.attachment_check()
+
+            settings.platform = "matrix"
+            settings.enable_pinned_images = True
+            startup.attachment_check()
+
+            settings.platform = "slack"
+            with pytest.raises(SystemExit):
+                startup.attachment_check()
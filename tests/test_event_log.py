@@ -4,14 +4,22 @@ Tests for incidentbot/incident/event.py :: EventLogHandler
 All tests run against a SQLite in-memory engine. The engine used by
 EventLogHandler is patched to use the test engine from conftest.py.
 """
+import os
+import tracemalloc
+
 from datetime import datetime, UTC
 from unittest.mock import patch
 
 import pytest
 from sqlmodel import Session, select
 
+from incidentbot.attachments.store import FilesystemAttachmentStore
 from incidentbot.incident.event import EventLogHandler
-from incidentbot.models.database import IncidentEvent, IncidentRecord
+from incidentbot.models.database import (
+    IncidentEvent,
+    IncidentEventBase,
+    IncidentRecord,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -28,6 +36,19 @@ def patched_engine(db_engine):
         yield db_engine
 
 
+@pytest.fixture()
+def attachment_store(tmp_path):
+    store = FilesystemAttachmentStore(tmp_path / "attachments")
+    with (
+        patch("incidentbot.incident.event.get_attachment_store", return_value=store),
+        patch(
+            "incidentbot.incident.event.settings.attachments.release_after_seconds",
+            3600,
+        ),
+    ):
+        yield store
+
+
 @pytest.fixture()
 def sample_incident(patched_engine):
     """Insert a minimal IncidentRecord and return it."""
@@ -192,6 +213,267 @@ class TestEventLogHandlerRead:
         assert ts_values == sorted(ts_values)
 
 
+class TestEventLogHandlerImages:
+    def _create_image(self, incident, message_ts, image=b"\x89PNG-data"):
+        EventLogHandler.create(
+            image=image,
+            incident_id=incident.id,
+            incident_slug=incident.slug,
+            message_ts=message_ts,
+            mimetype="image/png",
+            source="pin",
+            title="graph.png",
+        )
+
+    @staticmethod
+    def _age(store):
+        # Make every stored image look long unused, so releasing it removes it
+        for path in store.root.rglob("*"):
+            if path.is_file():
+                os.utime(path, (0, 0))
+
+    def test_image_bytes_go_to_the_attachment_store(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        self._create_image(sample_incident, "1.0")
+
+        event = EventLogHandler.read(incident_id=sample_incident.id)[0]
+        assert not hasattr(event, "image")
+        assert event.image_size == len(b"\x89PNG-data")
+        assert attachment_store.get(event.image_hash) == b"\x89PNG-data"
+
+    def test_identical_images_are_stored_once(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        self._create_image(sample_incident, "1.0")
+        self._create_image(sample_incident, "2.0")
+
+        events = EventLogHandler.read(incident_id=sample_incident.id)
+        assert len({e.image_hash for e in events}) == 1
+        files = [p for p in attachment_store.root.rglob("*") if p.is_file()]
+        assert len(files) == 1
+
+    def test_delete_keeps_image_still_referenced_elsewhere(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        self._create_image(sample_incident, "1.0")
+        self._create_image(sample_incident, "2.0")
+        first, second = EventLogHandler.read(incident_id=sample_incident.id)
+
+        self._age(attachment_store)
+        EventLogHandler.delete(id=first.id)
+        assert attachment_store.exists(second.image_hash)
+
+        EventLogHandler.delete(id=second.id)
+        assert not attachment_store.exists(second.image_hash)
+
+    def test_recently_stored_image_is_kept(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        self._create_image(sample_incident, "1.0")
+        event = EventLogHandler.read(incident_id=sample_incident.id)[0]
+
+        EventLogHandler.delete(id=event.id)
+
+        assert attachment_store.exists(event.image_hash)
+
+    def test_release_keeps_an_image_a_concurrent_pin_reuses(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        self._create_image(sample_incident, "1.0")
+        event = EventLogHandler.read(incident_id=sample_incident.id)[0]
+        self._age(attachment_store)
+        real_replace = os.replace
+        pinned = []
+
+        def pin_then_replace(src, dst):
+            # Another pin of the same image dedups onto the file after the
+            # release found no event referring to it
+            if not pinned:
+                pinned.append(attachment_store.put(b"\x89PNG-data"))
+            real_replace(src, dst)
+
+        with patch(
+            "incidentbot.attachments.store.os.replace", side_effect=pin_then_replace
+        ):
+            EventLogHandler.delete(id=event.id)
+        EventLogHandler.create(
+            image_hash=pinned[0],
+            image_size=len(b"\x89PNG-data"),
+            incident_id=sample_incident.id,
+            incident_slug=sample_incident.slug,
+            message_ts="2.0",
+            mimetype="image/png",
+            source="pin",
+        )
+
+        stored = EventLogHandler.read(incident_id=sample_incident.id)[0]
+        assert attachment_store.get(stored.image_hash) == b"\x89PNG-data"
+
+    def test_deleting_the_incident_releases_its_images(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        from incidentbot.incident.core import Incident
+
+        self._create_image(sample_incident, "1.0")
+        with Session(patched_engine) as session:
+            session.add(
+                IncidentRecord(
+                    id=2, channel_id="C_OTHER", channel_name="other",
+                    slug="inc-other", description="", severity="sev2",
+                    status="investigating", is_security_incident=False,
+                )
+            )
+            session.commit()
+        self._create_image(sample_incident, "2.0", image=b"shared")
+        EventLogHandler.create(
+            image=b"shared",
+            incident_id=2,
+            incident_slug="inc-other",
+            message_ts="3.0",
+            mimetype="image/png",
+            source="pin",
+        )
+        own, shared = (
+            e.image_hash for e in EventLogHandler.read(incident_id=sample_incident.id)
+        )
+        self._age(attachment_store)
+
+        with (
+            patch("incidentbot.incident.core.engine", patched_engine),
+            patch("incidentbot.incident.core.get_adapter"),
+        ):
+            assert Incident.delete(id=sample_incident.id) is True
+
+        assert not attachment_store.exists(own)
+        assert attachment_store.exists(shared)
+
+
+# ---------------------------------------------------------------------------
+# EventLogHandler.read_summary / read_image
+# ---------------------------------------------------------------------------
+
+class TestEventLogHandlerSummary:
+    def test_read_summary_returns_compact_rows(
+        self, sample_incident, patched_engine, attachment_store
+    ):
+        EventLogHandler.create(
+            incident_id=sample_incident.id,
+            incident_slug=sample_incident.slug,
+            message_ts="1.0",
+            source="user",
+            event="Rolled back deploy",
+        )
+        EventLogHandler.create(
+            image=b"png",
+            incident_id=sample_incident.id,
+            incident_slug=sample_incident.slug,
+            message_ts="2.0",
+            mimetype="image/png",
+            source="pin",
+            title="graph.png",
+        )
+
+        text_event, image_event = EventLogHandler.read_summary(
+            incident_id=sample_incident.id
+        )
+
+        assert isinstance(text_event, IncidentEventBase)
+        assert text_event.text == "Rolled back deploy"
+        assert text_event.image_hash is None
+        assert image_event.title == "graph.png"
+        assert image_event.image_hash == attachment_store.put(b"png")
+
+    def test_read_summary_by_slug(self, sample_incident, patched_engine):
+        EventLogHandler.create(
+            incident_id=sample_incident.id,
+            incident_slug=sample_incident.slug,
+            source="user",
+            event="By slug",
+        )
+
+        events = EventLogHandler.read_summary(incident_slug=sample_incident.slug)
+
+        assert [e.text for e in events] == ["By slug"]
+
+    def test_read_image(self, sample_incident, patched_engine, attachment_store):
+        EventLogHandler.create(
+            image=b"png-bytes",
+            incident_id=sample_incident.id,
+            incident_slug=sample_incident.slug,
+            source="pin",
+            title="graph.png",
+        )
+        EventLogHandler.create(
+            incident_id=sample_incident.id,
+            incident_slug=sample_incident.slug,
+            source="user",
+            event="No image",
+        )
+        image_event, text_event = sorted(
+            EventLogHandler.read_summary(incident_id=sample_incident.id),
+            key=lambda e: e.image_hash is None,
+        )
+
+        assert EventLogHandler.read_image(image_event.id) == b"png-bytes"
+        assert EventLogHandler.read_image(text_event.id) is None
+
+
+class TestTimelineMemory:
+    """
+    An incident with 500 events, 50 of them 200 KiB images: reading the
+    timeline must not load any image bytes.
+    """
+
+    IMAGE_SIZE = 200 * 1024
+
+    @pytest.fixture()
+    def busy_incident(self, sample_incident, patched_engine, attachment_store):
+        for i in range(500):
+            has_image = i % 10 == 0
+            EventLogHandler.create(
+                event=None if has_image else f"Update {i}: " + "details " * 10,
+                image=bytes([i % 256]) * self.IMAGE_SIZE if has_image else None,
+                incident_id=sample_incident.id,
+                incident_slug=sample_incident.slug,
+                message_ts=f"{1700000000 + i}.000000",
+                mimetype="image/png" if has_image else None,
+                source="pin" if has_image else "user",
+                title=f"screenshot-{i}.png" if has_image else None,
+            )
+
+        return sample_incident
+
+    def test_summary_read_never_touches_images(
+        self, busy_incident, attachment_store
+    ):
+        with patch.object(
+            attachment_store, "open", side_effect=AssertionError("image loaded")
+        ):
+            tracemalloc.start()
+            events = EventLogHandler.read_summary(incident_id=busy_incident.id)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        assert len(events) == 500
+        assert sum(1 for e in events if e.image_hash) == 50
+        # The 50 images total 10 MiB; the whole timeline read must stay well
+        # below that
+        assert peak < 10 * self.IMAGE_SIZE
+
+    def test_images_are_only_loaded_on_request(self, busy_incident):
+        events = EventLogHandler.read_summary(incident_id=busy_incident.id)
+        image_event = next(e for e in events if e.image_hash)
+
+        tracemalloc.start()
+        image = EventLogHandler.read_image(image_event.id)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert len(image) == self.IMAGE_SIZE
+        assert peak < 3 * self.IMAGE_SIZE
+
+
 # ---------------------------------------------------------------------------
 # EventLogHandler.delete
 # ---------------------------------------------------------------------------
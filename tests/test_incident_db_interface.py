@@ -4,12 +4,16 @@ Tests for incidentbot/models/incident.py :: IncidentDatabaseInterface
 All tests run against a SQLite in-memory engine via the ``db_engine`` fixture
 from conftest.py. The real postgres engine is patched out in each test.
 """
+import datetime
+
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import insert
 from sqlmodel import Session
 
+from incidentbot.configuration.lookups import build_lookups
 from incidentbot.models.database import (
     IncidentRecord,
     IncidentParticipant,
@@ -139,6 +143,7 @@ class TestListOpen:
             "investigating": SimpleNamespace(final=False),
             "resolved": SimpleNamespace(final=True),
         }
+        mock_settings.lookups = build_lookups(statuses=mock_settings.statuses)
         with patch("incidentbot.models.incident.settings", mock_settings):
             result = IncidentDatabaseInterface.list_open()
 
@@ -157,12 +162,103 @@ class TestListOpen:
 
         mock_settings = MagicMock()
         mock_settings.statuses = {}  # no final statuses
+        mock_settings.lookups = build_lookups(statuses=mock_settings.statuses)
         with patch("incidentbot.models.incident.settings", mock_settings):
             result = IncidentDatabaseInterface.list_open()
 
         assert len(result) >= 1
 
 
+    def test_participant_counts_in_one_query(self, sample_incident, sample_user, patched_engine):
+        with Session(patched_engine) as session:
+            session.add(IncidentRecord(
+                id=40, channel_id="C_B", channel_name="incident-b",
+                slug="inc-b", description="B", severity="sev3",
+                status="investigating", is_security_incident=False,
+            ))
+            session.add(IncidentRecord(
+                id=41, channel_id="C_C", channel_name="incident-c",
+                slug="inc-c", description="C", severity="sev3",
+                status="resolved", is_security_incident=False,
+            ))
+            session.commit()
+        for role in ("incident_commander", "scribe"):
+            IncidentDatabaseInterface.associate_role(
+                incident=sample_incident, is_lead=False, role=role, user=sample_user
+            )
+
+        mock_settings = MagicMock()
+        mock_settings.statuses = {
+            "investigating": SimpleNamespace(final=False),
+            "resolved": SimpleNamespace(final=True),
+        }
+        mock_settings.lookups = build_lookups(statuses=mock_settings.statuses)
+        with patch("incidentbot.models.incident.settings", mock_settings):
+            rows = IncidentDatabaseInterface.list_open_with_participant_counts()
+            only_b = IncidentDatabaseInterface.list_open_with_participant_counts(
+                slugs=["inc-b", "inc-c"]
+            )
+
+        assert sorted((r.slug, count) for r, count in rows) == [
+            ("inc-b", 0),
+            ("inc-test", 2),
+        ]
+        assert [(r.slug, count) for r, count in only_b] == [("inc-b", 0)]
+
+
+class TestListAging:
+    STATUSES = {
+        "investigating": SimpleNamespace(final=False),
+        "monitoring": SimpleNamespace(final=False),
+        "resolved": SimpleNamespace(final=True),
+    }
+
+    def _seed(self, engine, now, count=20_000):
+        """Years of mostly resolved history, with a few open incidents"""
+
+        rows = []
+        for i in range(count):
+            status = "resolved"
+            if i % 1000 == 0:
+                status = "investigating"
+            elif i % 1000 == 500:
+                status = "monitoring"
+            rows.append({
+                "id": i + 1, "channel_id": f"C{i}", "channel_name": f"inc-{i}",
+                "slug": f"inc-{i}", "description": "", "severity": "sev3",
+                "status": status, "is_security_incident": False,
+                # One incident every two hours, newest first
+                "created_at": now - datetime.timedelta(hours=2 * i),
+            })
+        with Session(engine) as session:
+            session.execute(insert(IncidentRecord), rows)
+            session.commit()
+
+    def test_returns_only_old_open_incidents(self, patched_engine):
+        now = datetime.datetime(2026, 10, 18, 12, 0)
+        self._seed(patched_engine, now)
+
+        mock_settings = MagicMock()
+        mock_settings.statuses = self.STATUSES
+        mock_settings.lookups = build_lookups(statuses=mock_settings.statuses)
+        with patch("incidentbot.models.incident.settings", mock_settings):
+            rows = IncidentDatabaseInterface.list_aging(
+                created_before=now - datetime.timedelta(days=7)
+            )
+            monitoring = IncidentDatabaseInterface.list_aging(
+                created_before=now - datetime.timedelta(days=7),
+                ignore_statuses=["investigating"],
+            )
+
+        # i == 0 is open but only just created
+        expected = list(range(19_500, 0, -500))
+        assert [r.channel_id for r in rows] == [f"C{i}" for i in expected]
+        assert rows[0]._fields == ("channel_id", "created_at", "severity", "status")
+        assert rows[0].created_at == now - datetime.timedelta(hours=2 * expected[0])
+        assert {r.status for r in monitoring} == {"monitoring"}
+        assert len(monitoring) == 20
+
+
 # ---------------------------------------------------------------------------
 # list_recent
 # ---------------------------------------------------------------------------
@@ -180,6 +276,7 @@ class TestListRecent:
 
         mock_settings = MagicMock()
         mock_settings.statuses = {"resolved": SimpleNamespace(final=True)}
+        mock_settings.lookups = build_lookups(statuses=mock_settings.statuses)
         with patch("incidentbot.models.incident.settings", mock_settings):
             result = IncidentDatabaseInterface.list_recent(limit=3)
 
@@ -197,6 +294,7 @@ class TestListRecent:
 
         mock_settings = MagicMock()
         mock_settings.statuses = {"resolved": SimpleNamespace(final=True)}
+        mock_settings.lookups = build_lookups(statuses=mock_settings.statuses)
         with patch("incidentbot.models.incident.settings", mock_settings):
             result = IncidentDatabaseInterface.list_recent()
 
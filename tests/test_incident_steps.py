@@ -0,0 +1,289 @@
+"""
+Incident setup step graph, and Incident.start running its setup through it.
+"""
+import threading
+import time
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlmodel import Session, select
+
+from incidentbot.configuration.settings import settings
+from incidentbot.incident.core import Incident, IncidentRequestParameters
+from incidentbot.incident.steps import StepGraph, step_duration, step_failures
+from incidentbot.models.database import (
+    ApplicationData,
+    IncidentEvent,
+    IncidentRecord,
+)
+
+DELAY = 0.1
+
+
+class TestStepGraph:
+    def test_independent_steps_run_concurrently(self):
+        graph = StepGraph("test")
+        for name in ("a", "b", "c", "d"):
+            graph.add(name, lambda name=name: time.sleep(DELAY) or name)
+
+        start = time.perf_counter()
+        results = graph.run()
+        elapsed = time.perf_counter() - start
+
+        assert results.values == {"a": "a", "b": "b", "c": "c", "d": "d"}
+        assert elapsed < 3 * DELAY
+        assert set(results.timings) == {"a", "b", "c", "d"}
+
+    def test_steps_wait_for_their_dependencies(self):
+        order = []
+        lock = threading.Lock()
+
+        def step(name):
+            def run():
+                time.sleep(DELAY if name == "first" else 0)
+                with lock:
+                    order.append(name)
+
+            return run
+
+        graph = StepGraph("test")
+        graph.add("first", step("first"))
+        graph.add("second", step("second"), after=("first",))
+        graph.add("third", step("third"), after=("second",))
+        graph.run()
+
+        assert order == ["first", "second", "third"]
+
+    def test_failure_skips_dependents_only(self):
+        failures_before = step_failures.value(step="broken")
+
+        def broken():
+            raise RuntimeError("boom")
+
+        graph = StepGraph("test")
+        graph.add("broken", broken)
+        graph.add("downstream", lambda: "never", after=("broken",))
+        graph.add("further", lambda: "never", after=("downstream",))
+        graph.add("independent", lambda: "ok")
+        results = graph.run()
+
+        assert results.values == {"independent": "ok"}
+        assert isinstance(results.failed["broken"], RuntimeError)
+        assert results.skipped == ["downstream", "further"]
+        assert step_failures.value(step="broken") == failures_before + 1
+        assert "broken failed" in results.summary()
+
+    def test_dependencies_must_already_be_added(self):
+        graph = StepGraph("test")
+
+        with pytest.raises(ValueError):
+            graph.add("b", lambda: None, after=("a",))
+
+    def test_records_step_latency(self):
+        before = step_duration.count(step="timed")
+        graph = StepGraph("test")
+        graph.add("timed", lambda: time.sleep(0.01))
+        results = graph.run()
+
+        assert step_duration.count(step="timed") == before + 1
+        assert results.timings["timed"] >= 0.01
+
+
+class _SlowAdapter:
+    """
+    Platform adapter stand-in where every call takes DELAY seconds
+    """
+
+    def __init__(self, room_id="C0001"):
+        self.room_id = room_id
+        self.posts = []
+        self.calls = []
+        # Started and finished calls that pin, to check they never overlap
+        self.pins = []
+        self._lock = threading.Lock()
+
+    def _call(self, name):
+        time.sleep(DELAY)
+        with self._lock:
+            self.calls.append(name)
+
+    def create_room(self, name, private=False):
+        self._call("create_room")
+        return {"id": self.room_id} if self.room_id else None
+
+    def room_url(self, room_id):
+        return f"https://example.slack.com/archives/{room_id}"
+
+    def post_digest_notification(self, **kwargs):
+        self._call("digest")
+        return "100.1"
+
+    def set_room_topic(self, room_id, topic):
+        self._call("topic")
+
+    def post_incident_boilerplate(self, incident):
+        self._call("boilerplate")
+        self.posts.append("boilerplate")
+        return "200.1"
+
+    def post_welcome_message(self, room_id):
+        self._call("welcome")
+        self.posts.append("welcome")
+
+    def post_roles_panel(self, room_id, incident, participants):
+        self._call("roles_panel")
+        self.posts.append("roles_panel")
+        return "300.1"
+
+    def add_bookmark(self, room_id, title, url, emoji=""):
+        self.pins.append("bookmark started")
+        self._call("bookmark")
+        self.pins.append("bookmark finished")
+
+    def send_text(self, room_id, text):
+        self._call("send_text")
+        return "$event"
+
+    def pin_message(self, room_id, event_id):
+        self.pins.append("pin started")
+        self._call("pin")
+        self.pins.append("pin finished")
+
+    def invite_user(self, room_id, user_id):
+        self._call("invite")
+
+    def make_room_admin(self, room_id, user_id):
+        self._call("admin")
+
+    def get_user_display_name(self, user_id):
+        self._call("display_name")
+        return "Jane Responder"
+
+
+def _settings(platform="slack", **options):
+    return settings.model_copy(
+        update={
+            "integrations": None,
+            "matrix": None,
+            "options": settings.options.model_copy(
+                update={"meeting_link": "https://meet.example.com/room", **options}
+            ),
+            "platform": platform,
+        }
+    )
+
+
+def _start(db_engine, adapter, test_settings):
+    params = IncidentRequestParameters(
+        incident_components="api",
+        incident_description="Checkout is down",
+        severity="sev1",
+        user="U123",
+    )
+
+    with (
+        patch("incidentbot.incident.core.engine", db_engine),
+        patch("incidentbot.incident.event.engine", db_engine),
+        patch("incidentbot.incident.core.get_adapter", return_value=adapter),
+        patch.object(
+            Incident, "handle_incident_optional_features", new=AsyncMock()
+        ),
+        patch("incidentbot.incident.core.settings", test_settings),
+    ):
+        start = time.perf_counter()
+        channel_id = Incident(params).start()
+        elapsed = time.perf_counter() - start
+
+    return channel_id, elapsed
+
+
+@pytest.fixture()
+def started(db_engine):
+    adapter = _SlowAdapter()
+    channel_id, elapsed = _start(db_engine, adapter, _settings())
+
+    yield adapter, channel_id, elapsed, db_engine
+
+
+class TestIncidentStart:
+    def test_setup_steps_run_concurrently(self, started):
+        adapter, channel_id, elapsed, _ = started
+
+        assert channel_id == "C0001"
+        # create_room, then the boilerplate → welcome → roles panel chain is
+        # the longest path; run one after another this would take 9 calls
+        assert elapsed < 7 * DELAY
+        assert set(adapter.calls) == {
+            "create_room",
+            "digest",
+            "topic",
+            "boilerplate",
+            "welcome",
+            "roles_panel",
+            "bookmark",
+            "invite",
+            "admin",
+            "display_name",
+        }
+
+    def test_room_messages_keep_their_order(self, started):
+        adapter, *_ = started
+
+        assert adapter.posts == ["boilerplate", "welcome", "roles_panel"]
+
+    def test_record_and_event_log_are_written(self, started):
+        _, channel_id, _, engine = started
+
+        with Session(engine) as session:
+            record = session.exec(
+                select(IncidentRecord).filter(IncidentRecord.channel_id == channel_id)
+            ).one()
+            panel = session.exec(
+                select(ApplicationData).filter(
+                    ApplicationData.name == f"role_panel_{channel_id}"
+                )
+            ).one()
+            events = session.exec(
+                select(IncidentEvent).filter(IncidentEvent.parent == record.id)
+            ).all()
+
+        assert record.digest_message_ts == "100.1"
+        assert record.boilerplate_message_ts == "200.1"
+        assert record.meeting_link == "https://meet.example.com/room"
+        assert panel.json_data == {"ts": "300.1"}
+
+        texts = {event.title: event.text for event in events}
+        assert texts[None] == "The incident was reported by Jane Responder"
+        assert texts["Incident setup"].startswith("Incident room set up in ")
+        assert "create_room" in texts["Incident setup"]
+        assert "digest" in texts["Incident setup"]
+
+    def test_no_meeting_is_created_without_a_room(self, db_engine):
+        adapter = _SlowAdapter(room_id=None)
+
+        with patch.object(Incident, "generate_meeting_link") as meeting:
+            channel_id, _ = _start(db_engine, adapter, _settings())
+
+        assert channel_id is None
+        meeting.assert_not_called()
+        assert adapter.calls == ["create_room"]
+        with Session(db_engine) as session:
+            assert session.exec(select(IncidentRecord)).all() == []
+
+    def test_matrix_pins_do_not_overlap(self, db_engine):
+        adapter = _SlowAdapter(room_id="!room:example.org")
+
+        _start(
+            db_engine,
+            adapter,
+            _settings(platform="matrix", pin_meeting_link_to_channel=True),
+        )
+
+        assert adapter.pins == [
+            "bookmark started",
+            "bookmark finished",
+            "pin started",
+            "pin finished",
+        ]
+        assert adapter.calls.index("bookmark") > adapter.calls.index("roles_panel")
@@ -15,6 +15,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from incidentbot.configuration.lookups import build_lookups
 from tests.runtime import load_module
 
 
@@ -75,6 +76,9 @@ def _make_settings():
     s.statuses = _STATUSES
     s.severities = _SEVERITIES
     s.roles = _ROLES
+    s.lookups = build_lookups(
+        statuses=_STATUSES, severities=_SEVERITIES, roles=_ROLES
+    )
     s.root_slash_command = "/inc"
     s.links = None
     # gitlab_incident_message accesses integrations.gitlab.issue_type
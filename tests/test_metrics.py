@@ -0,0 +1,258 @@
+"""
+Tests for incidentbot/util/metrics.py
+"""
+import inspect
+import sys
+import threading
+
+from unittest.mock import PropertyMock, patch
+
+import pytest
+
+from incidentbot.util.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    Registry,
+    exposition,
+)
+
+
+class TestCounter:
+    def test_sums_increments_across_threads(self):
+        c = Counter("t_total", "test", ("kind",))
+
+        def work():
+            for _ in range(1000):
+                c.inc(kind="a")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        c.inc(2, kind="b")
+        assert c.value(kind="a") == 4000
+        assert c.value(kind="b") == 2
+
+    def test_retires_shards_of_finished_threads(self):
+        c = Counter("t_retired_total", "test")
+        for _ in range(5):
+            t = threading.Thread(target=c.inc)
+            t.start()
+            t.join()
+
+        assert c.value() == 5
+        assert len(c._shards) == 0
+
+    def test_rejects_unknown_labels(self):
+        c = Counter("t_labels_total", "test", ("kind",))
+        with pytest.raises(ValueError):
+            c.inc(other="x")
+
+
+class TestGauge:
+    def test_set_inc_dec(self):
+        g = Gauge("t_gauge", "test")
+        g.set(5)
+        g.inc()
+        g.dec(3)
+        assert g.value() == 3
+
+
+class TestHistogram:
+    def test_buckets_count_and_sum(self):
+        h = Histogram("t_seconds", "test", buckets=(0.1, 1.0))
+        for v in (0.05, 0.5, 5):
+            h.observe(v)
+
+        assert h.samples()[()] == [1, 1, 1, 5.55]
+        assert h.count() == 3
+        assert h.sum() == pytest.approx(5.55)
+
+
+class TestRegistry:
+    def test_get_or_create_returns_same_metric(self):
+        registry = Registry()
+        a = registry._get_or_create(Counter, "x_total", "doc", ())
+        assert registry._get_or_create(Counter, "x_total", "doc", ()) is a
+
+    def test_type_conflict_raises(self):
+        registry = Registry()
+        registry._get_or_create(Counter, "x_total", "doc", ())
+        with pytest.raises(ValueError):
+            registry._get_or_create(Gauge, "x_total", "doc", ())
+
+
+class TestExposition:
+    def test_renders_counters_and_gauges(self):
+        registry = Registry()
+        c = registry._get_or_create(Counter, "x_total", "Things", ("kind",))
+        g = registry._get_or_create(Gauge, "x_open", "Open things")
+        c.inc(2, kind='say "hi"\n')
+        g.set(1.5)
+
+        assert exposition(registry).splitlines() == [
+            "# HELP x_open Open things",
+            "# TYPE x_open gauge",
+            "x_open 1.5",
+            "# HELP x_total Things",
+            "# TYPE x_total counter",
+            'x_total{kind="say \\"hi\\"\\n"} 2',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        h = registry._get_or_create(
+            Histogram, "x_seconds", "Latency", ("op",), buckets=(0.1, 1.0)
+        )
+        for v in (0.05, 0.5, 0.7, 5):
+            h.observe(v, op="get")
+
+        assert exposition(registry).splitlines()[2:] == [
+            'x_seconds_bucket{op="get",le="0.1"} 1',
+            'x_seconds_bucket{op="get",le="1.0"} 3',
+            'x_seconds_bucket{op="get",le="+Inf"} 4',
+            'x_seconds_sum{op="get"} 6.25',
+            'x_seconds_count{op="get"} 4',
+        ]
+
+
+class TestMetricsEndpoint:
+    def test_serves_prometheus_text_and_times_requests(self):
+        from fastapi.testclient import TestClient
+
+        from incidentbot.api.main import app, request_duration
+
+        client = TestClient(app)
+        before = request_duration.count(method="GET", route="/health", status="200")
+
+        assert client.get("/health").status_code == 200
+        with patch("incidentbot.api.main.settings.ENABLE_PROMETHEUS_METRICS", True):
+            resp = client.get("/metrics")
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert (
+            request_duration.count(method="GET", route="/health", status="200")
+            == before + 1
+        )
+        assert (
+            'incidentbot_api_request_duration_seconds_count{method="GET",'
+            'route="/health",status="200"}' in resp.text
+        )
+
+    def test_disabled_by_default(self):
+        from fastapi.testclient import TestClient
+
+        from incidentbot.api.main import app
+
+        assert TestClient(app).get("/metrics").status_code == 404
+
+    def test_requires_the_api_key_when_set(self):
+        from fastapi.testclient import TestClient
+
+        from incidentbot.api.main import app
+
+        client = TestClient(app)
+        with (
+            patch("incidentbot.api.main.settings.ENABLE_PROMETHEUS_METRICS", True),
+            patch("incidentbot.api.routes.incidents.settings.API_KEY", "secret"),
+        ):
+            assert client.get("/metrics").status_code == 403
+            resp = client.get("/metrics", headers={"X-Api-Key": "secret"})
+
+        assert resp.status_code == 200
+
+    def test_unmatched_paths_share_one_series(self):
+        from fastapi.testclient import TestClient
+
+        from incidentbot.api.main import app, request_duration
+
+        before = request_duration.count(method="GET", route="unmatched", status="404")
+        TestClient(app).get("/nope/12345")
+
+        assert (
+            request_duration.count(method="GET", route="unmatched", status="404")
+            == before + 1
+        )
+
+
+class TestScheduledJobs:
+    @pytest.fixture()
+    def scheduler_core(self):
+        from tests.runtime import load_module
+
+        # conftest replaces the scheduler module with a mock for every other
+        # test; load the real one and put the mock back afterwards
+        with patch.dict(sys.modules):
+            yield load_module("incidentbot.scheduler.core")
+
+    def test_job_runs_are_timed_by_function(self, scheduler_core):
+        job_duration = scheduler_core.job_duration
+        job_errors = scheduler_core.job_errors
+
+        def sweep(fail=False):
+            if fail:
+                raise RuntimeError("boom")
+            return "done"
+
+        before = job_duration.count(job="sweep")
+        errors_before = job_errors.value(job="sweep")
+        timed = scheduler_core._timed_job(sweep)
+
+        assert timed() == "done"
+        with pytest.raises(RuntimeError):
+            timed(fail=True)
+
+        assert job_duration.count(job="sweep") == before + 2
+        assert job_errors.value(job="sweep") == errors_before + 1
+
+    def test_added_jobs_are_wrapped(self, scheduler_core):
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        def sweep():
+            return "done"
+
+        with patch.object(scheduler_core, "BackgroundScheduler", BackgroundScheduler):
+            process = scheduler_core.TaskScheduler()
+        process.scheduler.add_job(
+            id="sweep", func=sweep, trigger="interval", minutes=1
+        )
+
+        job = process.get_job("sweep")
+        assert inspect.unwrap(job.func) is sweep
+
+        is_leader = patch.object(
+            type(scheduler_core.leader_elector), "is_leader", new_callable=PropertyMock
+        )
+        with is_leader as leader:
+            leader.return_value = True
+            assert job.func() == "done"
+            leader.return_value = False
+            assert job.func() is None
+
+    def test_per_process_jobs_run_on_every_node(self, scheduler_core):
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        def refresh():
+            return "done"
+
+        with patch.object(scheduler_core, "BackgroundScheduler", BackgroundScheduler):
+            process = scheduler_core.TaskScheduler()
+        process.scheduler.add_job(
+            id="refresh",
+            func=refresh,
+            trigger="interval",
+            minutes=1,
+            cluster_wide=False,
+        )
+
+        with patch.object(
+            type(scheduler_core.leader_elector),
+            "is_leader",
+            new_callable=PropertyMock,
+            return_value=False,
+        ):
+            assert process.get_job("refresh").func() == "done"
@@ -0,0 +1,95 @@
+"""
+Tests for incidentbot/pagerduty/client.py
+"""
+from unittest.mock import patch
+
+import httpx
+
+from incidentbot.pagerduty.client import (
+    pagerduty_rate_limited,
+    PagerDutyClientPool,
+    RateLimitAwareTransport,
+)
+
+
+class _ScriptedTransport(RateLimitAwareTransport):
+    """RateLimitAwareTransport whose upstream responses are scripted."""
+
+    def __init__(self, responses, **kwargs):
+        super().__init__(**kwargs)
+        self.responses = list(responses)
+        self.calls = 0
+
+    def handle_request(self, request):
+        with patch.object(
+            httpx.HTTPTransport, "handle_request", side_effect=self._next
+        ):
+            return super().handle_request(request)
+
+    def _next(self, request):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+def _request():
+    return httpx.Request("GET", "https://api.pagerduty.com/oncalls")
+
+
+class TestRateLimitAwareTransport:
+    def test_honors_retry_after_header(self):
+        transport = _ScriptedTransport(
+            [
+                httpx.Response(429, headers={"Retry-After": "2"}),
+                httpx.Response(200),
+            ],
+            max_rate_limit_retries=3,
+        )
+        before = pagerduty_rate_limited.value()
+        with patch("incidentbot.pagerduty.client.time.sleep") as sleep:
+            response = transport.handle_request(_request())
+
+        assert response.status_code == 200
+        assert transport.calls == 2
+        assert 2 <= sleep.call_args.args[0] <= 2.5
+        assert pagerduty_rate_limited.value() == before + 1
+
+    def test_uses_ratelimit_reset_header(self):
+        transport = _ScriptedTransport(
+            [
+                httpx.Response(429, headers={"ratelimit-reset": "7"}),
+                httpx.Response(200),
+            ]
+        )
+        with patch("incidentbot.pagerduty.client.time.sleep") as sleep:
+            transport.handle_request(_request())
+
+        assert 7 <= sleep.call_args.args[0] <= 7.5
+
+    def test_gives_up_after_bounded_retries(self):
+        transport = _ScriptedTransport(
+            [httpx.Response(429) for _ in range(3)],
+            max_rate_limit_retries=2,
+        )
+        with patch("incidentbot.pagerduty.client.time.sleep") as sleep:
+            response = transport.handle_request(_request())
+
+        assert response.status_code == 429
+        assert transport.calls == 3
+        assert sleep.call_count == 2
+
+
+class TestPagerDutyClientPool:
+    def test_reuses_client_until_closed(self):
+        pool = PagerDutyClientPool()
+        with patch("incidentbot.pagerduty.client.settings") as mock_settings:
+            mock_settings.PAGERDUTY_API_TOKEN = "token"
+            mock_settings.PAGERDUTY_API_USERNAME = "bot@example.com"
+            mock_settings.integrations = None
+            client = pool.get()
+
+        assert pool.get() is client
+        assert isinstance(client._transport, RateLimitAwareTransport)
+        assert client.retry[429] == 1
+
+        pool.close()
+        assert client.is_closed
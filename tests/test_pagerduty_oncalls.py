@@ -0,0 +1,205 @@
+"""
+Tests for the on-call ingestion pipeline and escalation policy catalog in
+incidentbot/pagerduty/api.py
+
+Local stubs stand in for the PagerDuty REST client and count the API calls
+issued per refresh or page.
+"""
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from sqlmodel import Session, select
+
+from incidentbot.models.database import ApplicationData
+from incidentbot.pagerduty.api import (
+    EscalationPolicyCatalog,
+    page_escalation_policies,
+    PagerDutyInterface,
+)
+from incidentbot.slack.directory import SlackUserDirectory
+
+
+def _oncall(policy: str, level: int, user: str, email: str | None = None, start="s"):
+    return {
+        "escalation_policy": {"id": f"P-{policy}", "summary": policy},
+        "escalation_level": level,
+        "user": {"summary": user, "name": user, "email": email},
+        "start": start,
+        "end": "e" if start else None,
+    }
+
+
+class StubPagerDutyClient:
+    """Minimal stand-in for RestApiV2Client that records sweeps."""
+
+    def __init__(self, oncalls: list[dict]):
+        self.oncalls = oncalls
+        self.sweeps = []
+
+    def iter_all(self, path, params=None):
+        self.sweeps.append(path)
+        yield from self.oncalls
+
+
+@pytest.fixture()
+def directory():
+    d = SlackUserDirectory()
+    d.load(
+        [
+            {"name": "ann", "real_name": "Ann Oncall", "email": "ann@example.com", "id": "U_ANN"},
+            {"name": "ben", "real_name": "Ben Oncall", "email": "ben@corp.example", "id": "U_BEN"},
+        ]
+    )
+    with patch("incidentbot.pagerduty.api.user_directory", d):
+        yield d
+
+
+@pytest.fixture()
+def stub():
+    client = StubPagerDutyClient(
+        [
+            _oncall("platform", 2, "Ben Oncall", email="BEN@corp.example"),
+            _oncall("platform", 1, "Ann Oncall"),
+            _oncall("data", 1, "Unknown Person"),
+            _oncall("always", 1, "Ann Oncall", start=None),
+        ]
+    )
+    with patch.object(PagerDutyInterface, "session", return_value=client):
+        yield client
+
+
+class TestBuildOnCallViews:
+    def test_groups_entries_by_policy_and_sorts_by_level(self, stub, directory):
+        on_call = PagerDutyInterface.get_on_calls()
+
+        assert [e["user"] for e in on_call["platform"]] == ["Ann Oncall", "Ben Oncall"]
+        assert [e["user"] for e in on_call["data"]] == ["Unknown Person"]
+        assert on_call["always"] == []
+
+    def test_resolves_slack_ids_by_email_then_name(self, stub, directory):
+        on_call = PagerDutyInterface.get_on_calls()
+
+        by_user = {e["user"]: e["slack_user_id"] for e in on_call["platform"]}
+        assert by_user == {"Ann Oncall": ["U_ANN"], "Ben Oncall": ["U_BEN"]}
+        assert on_call["data"][0]["slack_user_id"] == []
+
+    def test_short_returns_auto_mapping(self, stub, directory):
+        assert PagerDutyInterface.get_on_calls(short=True) == {
+            "platform": "platform",
+            "data": "data",
+            "always": "always",
+        }
+
+    def test_empty_response_returns_empty_dict(self, directory):
+        with patch.object(
+            PagerDutyInterface, "session", return_value=StubPagerDutyClient([])
+        ):
+            assert PagerDutyInterface.get_on_calls() == {}
+
+
+class TestStoreOnCallData:
+    def test_single_sweep_per_refresh(self, stub, directory, db_engine):
+        with patch("incidentbot.pagerduty.api.engine", db_engine):
+            PagerDutyInterface.store_on_call_data()
+
+        assert stub.sweeps == ["oncalls"]
+
+        with Session(db_engine) as session:
+            rows = {
+                r.name: r.json_data
+                for r in session.exec(select(ApplicationData)).all()
+            }
+        assert set(rows["pagerduty_oc_data"]) == {"platform", "data", "always"}
+        assert rows["pagerduty_auto_mapping"]["data"] == "data"
+
+
+class StubPagingClient:
+    """Stand-in for RestApiV2Client covering the catalog and incident POST."""
+
+    def __init__(self, policies: list[dict]):
+        self.policies = policies
+        self.sweeps = 0
+        self.posts = []
+
+    def iter_all(self, path, params=None):
+        assert path == "escalation_policies"
+        self.sweeps += 1
+        yield from self.policies
+
+    def post(self, path, json=None):
+        self.posts.append(json)
+        response = MagicMock()
+        response.ok = True
+        response.text = (
+            '{"incident": {"html_url": "https://pd.example/incidents/'
+            + json["incident"]["escalation_policy"]["id"]
+            + '"}}'
+        )
+        return response
+
+
+@pytest.fixture()
+def paging_stub():
+    client = StubPagingClient(
+        [
+            {"id": "P1", "name": "platform", "services": [{"id": "S1"}]},
+            {"id": "P2", "name": "data", "services": [{"id": "S2"}]},
+            {"id": "P3", "name": "orphan", "services": []},
+        ]
+    )
+    catalog = EscalationPolicyCatalog(ttl_seconds=3600)
+    with (
+        patch.object(PagerDutyInterface, "session", return_value=client),
+        patch("incidentbot.pagerduty.api.escalation_policy_catalog", catalog),
+        patch("incidentbot.slack.client.slack_workspace_id", "ws", create=True),
+        patch("incidentbot.pagerduty.api.Session"),
+    ):
+        yield client
+
+
+class TestEscalationPolicyCatalog:
+    def test_indexes_by_name_and_id(self, paging_stub):
+        catalog = EscalationPolicyCatalog(ttl_seconds=3600)
+        assert catalog.get("platform") == {"id": "P1", "name": "platform", "service_id": "S1"}
+        assert catalog.get("P2")["service_id"] == "S2"
+        assert catalog.get("orphan")["service_id"] is None
+        assert catalog.get("missing") is None
+        assert paging_stub.sweeps == 1
+
+    def test_refreshes_after_ttl(self, paging_stub):
+        catalog = EscalationPolicyCatalog(ttl_seconds=0)
+        catalog.get("platform")
+        catalog.get("platform")
+        assert paging_stub.sweeps == 2
+
+    def test_page_issues_single_post_per_team(self, paging_stub):
+        urls = page_escalation_policies(
+            escalation_policies=["platform", "data", "missing"],
+            channel_id="C1",
+            channel_name="inc-test",
+            paging_user="auto",
+            priority="low",
+        )
+
+        assert urls == {
+            "platform": "https://pd.example/incidents/P1",
+            "data": "https://pd.example/incidents/P2",
+            "missing": None,
+        }
+        assert paging_stub.sweeps == 1
+        assert len(paging_stub.posts) == 2
+
+    def test_transport_errors_do_not_escape_paging(self, paging_stub):
+        paging_stub.iter_all = MagicMock(side_effect=httpx.ConnectTimeout("timed out"))
+
+        urls = page_escalation_policies(
+            escalation_policies=["platform", "data"],
+            channel_id="C1",
+            channel_name="inc-test",
+            paging_user="auto",
+            priority="low",
+        )
+
+        assert urls == {"platform": None, "data": None}
+        assert paging_stub.posts == []
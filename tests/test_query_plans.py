@@ -0,0 +1,143 @@
+"""
+Query plan checks for the hot lookup paths.
+
+Each lookup the bot performs on nearly every Slack action is EXPLAINed and
+must be served by an index rather than a full table scan. The checks always
+run against SQLite and additionally against Postgres when the POSTGRES_*
+environment (as provided in CI) points at a reachable server; the Postgres
+run disables sequential scans so the plan proves an index is usable even on
+the near-empty test tables.
+"""
+import os
+import uuid
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select, SQLModel
+
+from tests.conftest import make_test_engine
+from incidentbot.models.database import (
+    ApplicationData,
+    GitlabIssueRecord,
+    IncidentParticipant,
+    IncidentRecord,
+    JiraIssueRecord,
+    PagerDutyIncidentRecord,
+    PhareIncidentRecord,
+    PostmortemRecord,
+    StatuspageIncidentRecord,
+)
+
+HOT_LOOKUPS = {
+    "incident_by_channel_id": select(IncidentRecord).where(
+        IncidentRecord.channel_id == "C0001"
+    ),
+    "incident_by_slug": select(IncidentRecord).where(
+        IncidentRecord.slug == "inc-1"
+    ),
+    "incidents_by_status": select(IncidentRecord).where(
+        IncidentRecord.status == "investigating"
+    ),
+    "incidents_aging": select(
+        IncidentRecord.channel_id,
+        IncidentRecord.created_at,
+        IncidentRecord.severity,
+        IncidentRecord.status,
+    ).where(
+        IncidentRecord.status.in_(["investigating", "identified", "monitoring"]),
+        IncidentRecord.created_at < datetime(2026, 1, 1),
+    ),
+    "incidents_newest_first": select(IncidentRecord)
+    .order_by(IncidentRecord.created_at.desc(), IncidentRecord.id.desc())
+    .limit(50),
+    "application_data_by_name": select(ApplicationData).where(
+        ApplicationData.name == "slack_users"
+    ),
+    **{
+        f"{model.__tablename__}_by_parent": select(model).where(
+            model.parent == 1
+        )
+        for model in (
+            GitlabIssueRecord,
+            IncidentParticipant,
+            JiraIssueRecord,
+            PagerDutyIncidentRecord,
+            PhareIncidentRecord,
+            PostmortemRecord,
+            StatuspageIncidentRecord,
+        )
+    },
+}
+
+
+def _compile(engine, stmt) -> str:
+    return str(
+        stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    )
+
+
+def _sqlite_plan(engine, stmt) -> str:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {_compile(engine, stmt)}"))
+        return "\n".join(row[-1] for row in rows)
+
+
+def _postgres_plan(engine, stmt) -> str:
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+        rows = conn.execute(text(f"EXPLAIN {_compile(engine, stmt)}"))
+        return "\n".join(row[0] for row in rows)
+
+
+@pytest.fixture(scope="module")
+def sqlite_engine():
+    return make_test_engine()
+
+
+@pytest.fixture(scope="module")
+def postgres_engine():
+    if not os.getenv("POSTGRES_HOST"):
+        pytest.skip("POSTGRES_HOST is not set")
+
+    base = (
+        f"postgresql://{os.getenv('POSTGRES_USER')}:{os.getenv('POSTGRES_PASSWORD')}"
+        f"@{os.getenv('POSTGRES_HOST')}:{os.getenv('POSTGRES_PORT', '5432')}"
+        f"/{os.getenv('POSTGRES_DB')}"
+    )
+    schema = f"query_plans_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(base)
+    try:
+        with admin.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+    except OperationalError:
+        admin.dispose()
+        pytest.skip("postgres is not reachable")
+
+    engine = create_engine(
+        base, connect_args={"options": f"-csearch_path={schema}"}
+    )
+    SQLModel.metadata.create_all(engine)
+    yield engine
+
+    engine.dispose()
+    with admin.begin() as conn:
+        conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+    admin.dispose()
+
+
+@pytest.mark.parametrize("lookup", sorted(HOT_LOOKUPS))
+def test_sqlite_lookup_uses_index(sqlite_engine, lookup):
+    plan = _sqlite_plan(sqlite_engine, HOT_LOOKUPS[lookup])
+
+    assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, plan
+
+
+@pytest.mark.parametrize("lookup", sorted(HOT_LOOKUPS))
+def test_postgres_lookup_uses_index(postgres_engine, lookup):
+    plan = _postgres_plan(postgres_engine, HOT_LOOKUPS[lookup])
+
+    assert "Index" in plan, plan
+    assert "Seq Scan" not in plan, plan
@@ -2,6 +2,9 @@
 Tests for the config-driven reminders and automations system.
 """
 
+import timeit
+
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 from incidentbot.configuration.schema import (
@@ -16,6 +19,7 @@ from incidentbot.configuration.schema import (
     ScrapeForAgingIncidentsJob,
 )
 from incidentbot.incident.conditions import evaluate
+from incidentbot.configuration.lookups import build_lookups
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
@@ -71,6 +75,7 @@ class TestEvaluate:
             "incidentbot.incident.conditions.settings"
         ) as mock_settings:
             mock_settings.statuses = mock_statuses
+            mock_settings.lookups = build_lookups(statuses=mock_statuses)
             assert evaluate(cond, record) is True
 
     def test_status_is_final_false(self):
@@ -84,6 +89,7 @@ class TestEvaluate:
             "incidentbot.incident.conditions.settings"
         ) as mock_settings:
             mock_settings.statuses = mock_statuses
+            mock_settings.lookups = build_lookups(statuses=mock_statuses)
             assert evaluate(cond, record) is False
 
     def test_no_roles_claimed_passes_when_empty(self):
@@ -110,6 +116,49 @@ class TestEvaluate:
         assert evaluate(cond, _make_record(severity="sev2", status="investigating")) is False
         assert evaluate(cond, _make_record(severity="sev1", status="resolved")) is False
 
+    def test_evaluation_throughput(self):
+        """Reading the precomputed final statuses beats rebuilding them per call."""
+        statuses = {
+            "investigating": SimpleNamespace(initial=True),
+            "identified": SimpleNamespace(),
+            "monitoring": SimpleNamespace(),
+            "resolved": SimpleNamespace(final=True),
+        }
+        lookups = build_lookups(statuses=statuses)
+        cond = Conditions(severity_is=["sev1", "sev2"], status_is_final=True)
+        records = [
+            SimpleNamespace(severity=f"sev{i // 4 % 4 + 1}", status=status)
+            for i, status in enumerate(lookups.statuses * 256)
+        ]
+
+        class RebuildingSettings:
+            # What every call paid before the lookups were built at load
+            @property
+            def lookups(self):
+                return build_lookups(statuses=statuses)
+
+        def evaluate_all():
+            return sum(evaluate(cond, record) for record in records)
+
+        def best_of(settings):
+            with patch("incidentbot.incident.conditions.settings", settings):
+                return min(timeit.repeat(evaluate_all, number=10, repeat=5))
+
+        with patch(
+            "incidentbot.incident.conditions.settings",
+            SimpleNamespace(lookups=lookups),
+        ):
+            # sev1/sev2 records in the final status
+            assert evaluate_all() == len(records) // 8
+
+        precomputed = best_of(SimpleNamespace(lookups=lookups))
+        rebuilt = best_of(RebuildingSettings())
+        evaluations = 10 * len(records)
+        assert precomputed < rebuilt, (
+            f"{evaluations / precomputed:.0f}/s precomputed, "
+            f"{evaluations / rebuilt:.0f}/s rebuilt per call"
+        )
+
 
 # ── Schema ────────────────────────────────────────────────────────────────────
 
@@ -261,6 +310,7 @@ class TestRunAutomations:
              patch("incidentbot.incident.automations.evaluate", return_value=True):
             mock_s.automations = [auto]
             mock_s.statuses = mock_statuses
+            mock_s.lookups = build_lookups(statuses=mock_statuses)
             from incidentbot.incident.automations import run
             run("on_status_change", record)
             mock_exec.assert_called_once()
@@ -277,6 +327,7 @@ class TestRunAutomations:
              patch("incidentbot.incident.automations._execute") as mock_exec:
             mock_s.automations = [auto]
             mock_s.statuses = mock_statuses
+            mock_s.lookups = build_lookups(statuses=mock_statuses)
             from incidentbot.incident.automations import run
             run("on_status_change", record)
             mock_exec.assert_not_called()
@@ -2,9 +2,14 @@
 Tests for reminder execution functions in incidentbot/incident/reminders.py
 """
 import sys
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlmodel import Session, select
+
+from incidentbot.configuration.lookups import build_lookups
+from incidentbot.models.database import IncidentRecord, ReminderRecord
 
 # Evict the module so this file always gets a fresh import with its own
 # _mock_settings (other test files import incidentbot.incident.actions, which
@@ -22,10 +27,17 @@ _reminder = MagicMock()
 _reminder.id = "comms_reminder"
 _reminder.enabled = True
 _reminder.message = "Time to update?"
+_reminder.interval_minutes = 30
 _reminder.once = False
 _reminder.conditions = None
 
 _mock_settings.reminders = [_reminder]
+_mock_settings.jobs.sweep_reminders.catch_up = "fire"
+_mock_settings.statuses = {
+    "investigating": SimpleNamespace(final=False),
+    "resolved": SimpleNamespace(final=True),
+}
+_mock_settings.lookups = build_lookups(statuses=_mock_settings.statuses)
 
 with (
     patch("incidentbot.configuration.settings.settings", _mock_settings),
@@ -33,15 +45,30 @@ with (
     patch("slack_sdk.WebClient", return_value=MagicMock()),
 ):
     from incidentbot.incident.reminders import (
-        _job_id,
+        ReminderSweeper,
+        _from_db,
         cancel_reminder_jobs,
         handle_dismiss,
         handle_snooze,
         register_reminder_jobs,
-        run_reminder,
+        reminder_sweeper,
     )
 
 
+@pytest.fixture(autouse=True)
+def patched_engine(db_engine):
+    with patch("incidentbot.incident.reminders.engine", db_engine):
+        yield db_engine
+
+
+def _stored(engine) -> dict[tuple[str, str], ReminderRecord]:
+    with Session(engine) as session:
+        return {
+            (row.slug, row.reminder_id): row
+            for row in session.exec(select(ReminderRecord))
+        }
+
+
 def _make_record(channel_id="C123", slug="inc-test"):
     r = MagicMock()
     r.channel_id = channel_id
@@ -50,166 +77,327 @@ def _make_record(channel_id="C123", slug="inc-test"):
     return r
 
 
-class TestJobId:
-    def test_format(self):
-        assert _job_id("inc-test", "comms_reminder") == "inc-test_comms_reminder"
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return _Clock()
+
 
+@pytest.fixture()
+def sweeper(clock):
+    return ReminderSweeper(clock=clock)
 
-class TestRunReminder:
+
+def _sweep(sweeper, rows, evaluate=True, adapter=None):
+    adapter = adapter or MagicMock()
+    with (
+        patch(
+            "incidentbot.incident.reminders.IncidentDatabaseInterface.list_open_with_participant_counts",
+            return_value=rows,
+        ) as query,
+        patch("incidentbot.incident.reminders.evaluate", return_value=evaluate) as evaluated,
+        patch("incidentbot.incident.reminders.get_adapter", return_value=adapter),
+    ):
+        sweeper.sweep()
+    return query, evaluated, adapter
+
+
+class TestReminderSweeper:
     """Reminders post through the platform adapter, so they work on Slack and Matrix."""
 
-    def test_posts_message_when_conditions_pass(self):
+    def test_posts_due_reminder_and_schedules_the_next(self, sweeper, clock):
         record = _make_record()
-        mock_adapter = MagicMock()
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
 
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.evaluate", return_value=True),
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-        ):
-            run_reminder("C123", "comms_reminder")
+        _, evaluated, adapter = _sweep(sweeper, [(record, 2)])
 
-        mock_adapter.post_reminder.assert_called_once_with("C123", _reminder, record.slug)
+        adapter.post_reminder.assert_called_once_with("C123", _reminder, "inc-test")
+        evaluated.assert_called_once_with(_reminder.conditions, record, 2)
+        assert sweeper.next_due("inc-test", "comms_reminder") == clock.now + 30 * 60
 
-    def test_returns_early_when_reminder_not_found(self):
-        mock_adapter = MagicMock()
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one") as mock_db,
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-        ):
-            run_reminder("C123", "nonexistent_reminder")
-        mock_db.assert_not_called()
-        mock_adapter.post_reminder.assert_not_called()
+    def test_nothing_due_skips_the_database(self, sweeper, clock):
+        sweeper.schedule("inc-test", "comms_reminder", clock.now + 60)
 
-    def test_returns_early_when_reminder_disabled(self):
+        query, _, adapter = _sweep(sweeper, [])
+
+        query.assert_not_called()
+        adapter.post_reminder.assert_not_called()
+
+    def test_due_reminders_share_one_query(self, sweeper, clock):
+        for slug in ("inc-a", "inc-b", "inc-c"):
+            sweeper.schedule(slug, "comms_reminder", clock.now)
+        rows = [(_make_record(f"C-{s}", f"inc-{s}"), 0) for s in "abc"]
+
+        query, _, adapter = _sweep(sweeper, rows)
+
+        query.assert_called_once_with(slugs=["inc-a", "inc-b", "inc-c"])
+        assert adapter.post_reminder.call_count == 3
+
+    def test_failed_condition_keeps_reminder_scheduled(self, sweeper, clock):
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+
+        _, _, adapter = _sweep(sweeper, [(_make_record(), 1)], evaluate=False)
+
+        adapter.post_reminder.assert_not_called()
+        assert sweeper.next_due("inc-test", "comms_reminder") == clock.now + 30 * 60
+
+    def test_closed_incident_drops_reminder(self, sweeper, clock):
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+
+        _, _, adapter = _sweep(sweeper, [])
+
+        adapter.post_reminder.assert_not_called()
+        assert sweeper.pending() == 0
+
+    def test_unknown_or_disabled_reminder_is_dropped(self, sweeper, clock):
+        sweeper.schedule("inc-test", "nonexistent_reminder", clock.now)
         _reminder.enabled = False
-        mock_adapter = MagicMock()
-        with patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter):
-            run_reminder("C123", "comms_reminder")
-        mock_adapter.post_reminder.assert_not_called()
-        _reminder.enabled = True  # restore
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        try:
+            _, _, adapter = _sweep(sweeper, [(_make_record(), 0)])
+        finally:
+            _reminder.enabled = True  # restore
 
-    def test_returns_early_when_incident_not_found(self):
-        mock_adapter = MagicMock()
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=None),
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-        ):
-            run_reminder("C123", "comms_reminder")
-        mock_adapter.post_reminder.assert_not_called()
+        adapter.post_reminder.assert_not_called()
+        assert sweeper.pending() == 0
 
-    def test_returns_early_when_condition_fails(self):
-        record = _make_record()
-        mock_adapter = MagicMock()
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.evaluate", return_value=False),
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-        ):
-            run_reminder("C123", "comms_reminder")
-        mock_adapter.post_reminder.assert_not_called()
+    def test_failed_query_retries_on_next_sweep(self, sweeper, clock):
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
 
-    def test_does_not_delete_job_when_post_fails(self):
-        record = _make_record()
-        _reminder.once = True
-        mock_adapter = MagicMock()
-        mock_adapter.post_reminder.side_effect = RuntimeError("platform down")
+        _sweep(sweeper, None)
+        assert sweeper.next_due("inc-test", "comms_reminder") == clock.now
 
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.evaluate", return_value=True),
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-            patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched,
-        ):
-            run_reminder("C123", "comms_reminder")
-            mock_sched.delete_job.assert_not_called()
+        _, _, adapter = _sweep(sweeper, [(_make_record(), 0)])
+        adapter.post_reminder.assert_called_once()
+
+    def test_once_reminder_is_dropped_after_posting(self, sweeper, clock):
+        _reminder.once = True
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        try:
+            _sweep(sweeper, [(_make_record(), 0)])
+        finally:
+            _reminder.once = False  # restore
 
-        _reminder.once = False  # restore
+        assert sweeper.pending() == 0
 
-    def test_deletes_job_when_once_is_true(self):
+    def test_once_reminder_is_kept_when_post_fails(self, sweeper, clock):
         _reminder.once = True
-        record = _make_record()
-        mock_adapter = MagicMock()
-        mock_job = MagicMock()
-        mock_job.id = "inc-test_comms_reminder"
+        adapter = MagicMock()
+        adapter.post_reminder.side_effect = RuntimeError("platform down")
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        try:
+            _sweep(sweeper, [(_make_record(), 0)], adapter=adapter)
+        finally:
+            _reminder.once = False  # restore
 
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.evaluate", return_value=True),
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-            patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched,
-        ):
-            mock_sched.get_job.return_value = mock_job
-            run_reminder("C123", "comms_reminder")
-            mock_sched.delete_job.assert_called_once_with(mock_job.id)
+        assert sweeper.next_due("inc-test", "comms_reminder") == clock.now + 30 * 60
 
-        _reminder.once = False  # restore
+    def test_late_sweep_does_not_fire_missed_intervals(self, sweeper, clock):
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        clock.now += 3 * 30 * 60
 
-    def test_does_not_delete_job_when_once_is_false(self):
-        record = _make_record()
-        mock_adapter = MagicMock()
+        _sweep(sweeper, [(_make_record(), 0)])
 
-        with (
-            patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.evaluate", return_value=True),
-            patch("incidentbot.incident.reminders.get_adapter", return_value=mock_adapter),
-            patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched,
-        ):
-            run_reminder("C123", "comms_reminder")
-            mock_sched.delete_job.assert_not_called()
+        assert sweeper.next_due("inc-test", "comms_reminder") == clock.now + 30 * 60
+
+    def test_cancelled_reminder_is_not_sent(self, sweeper, clock):
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        sweeper.cancel("inc-test")
+
+        query, _, _ = _sweep(sweeper, [(_make_record(), 0)])
+
+        query.assert_not_called()
+        assert sweeper.pending() == 0
+
+
+class TestReminderState:
+    """Reminder state is written to reminderrecord and read back on startup."""
+
+    def _add_incident(self, engine, slug, status="investigating"):
+        with Session(engine) as session:
+            session.add(IncidentRecord(
+                channel_id=f"C-{slug}", channel_name=slug, slug=slug,
+                description="", severity="sev2", status=status,
+                is_security_incident=False,
+            ))
+            session.commit()
+
+    def test_changes_are_persisted(self, sweeper, clock, patched_engine):
+        sweeper.register("inc-a")
+        sweeper.register("inc-b")
+        sweeper.schedule("inc-a", "comms_reminder", clock.now + 60, snoozed=True)
+        sweeper.cancel("inc-b", "comms_reminder")
+
+        stored = _stored(patched_engine)
+        assert _from_db(stored["inc-a", "comms_reminder"].due_at) == clock.now + 60
+        assert stored["inc-a", "comms_reminder"].snoozed is True
+        assert stored["inc-b", "comms_reminder"].dismissed is True
+
+        sweeper.cancel("inc-a")
+        assert list(_stored(patched_engine)) == [("inc-b", "comms_reminder")]
+
+    def test_once_reminder_is_marked_fired(self, sweeper, clock, patched_engine):
+        _reminder.once = True
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        try:
+            _sweep(sweeper, [(_make_record(), 0)])
+        finally:
+            _reminder.once = False  # restore
+
+        assert _stored(patched_engine)["inc-test", "comms_reminder"].fired is True
+
+    def test_rehydrate_restores_schedule(self, sweeper, clock, patched_engine):
+        for slug in ("inc-due", "inc-dismissed", "inc-new"):
+            self._add_incident(patched_engine, slug)
+        self._add_incident(patched_engine, "inc-closed", status="resolved")
+
+        sweeper.schedule("inc-due", "comms_reminder", clock.now + 60)
+        sweeper.cancel("inc-dismissed", "comms_reminder")
+        sweeper.schedule("inc-closed", "comms_reminder", clock.now + 60)
+
+        restarted = ReminderSweeper(clock=clock)
+        restarted.rehydrate()
+
+        assert restarted.next_due("inc-due", "comms_reminder") == clock.now + 60
+        assert restarted.next_due("inc-dismissed", "comms_reminder") is None
+        assert restarted.next_due("inc-new", "comms_reminder") == clock.now + 30 * 60
+        assert restarted.next_due("inc-closed", "comms_reminder") is None
+        assert ("inc-closed", "comms_reminder") not in _stored(patched_engine)
+        assert ("inc-new", "comms_reminder") in _stored(patched_engine)
+
+    @pytest.mark.parametrize(
+        "catch_up, expected",
+        [("fire", 1000.0 - 45 * 60), ("skip", 1000.0 + 15 * 60)],
+    )
+    def test_rehydrate_catch_up(self, clock, patched_engine, catch_up, expected):
+        self._add_incident(patched_engine, "inc-test")
+        ReminderSweeper(clock=clock).schedule(
+            "inc-test", "comms_reminder", clock.now - 45 * 60
+        )
+
+        restarted = ReminderSweeper(clock=clock)
+        with patch.object(_mock_settings.jobs.sweep_reminders, "catch_up", catch_up):
+            restarted.rehydrate()
+
+        assert restarted.next_due("inc-test", "comms_reminder") == expected
+
+    def test_refresh_picks_up_other_replicas_changes(
+        self, sweeper, clock, patched_engine
+    ):
+        self._add_incident(patched_engine, "inc-a")
+        sweeper.schedule("inc-a", "comms_reminder", clock.now + 60)
+        sweeper.rehydrate()
+
+        other = ReminderSweeper(clock=clock)
+        other.register("inc-b")
+        other.schedule("inc-a", "comms_reminder", clock.now + 600, snoozed=True)
+        assert sweeper.next_due("inc-b", "comms_reminder") is None
+
+        sweeper.refresh()
+        assert sweeper.next_due("inc-a", "comms_reminder") == clock.now + 600
+        assert sweeper.next_due("inc-b", "comms_reminder") == clock.now + 30 * 60
+
+        other.cancel("inc-b", "comms_reminder")
+        sweeper.refresh()
+        assert sweeper.next_due("inc-b", "comms_reminder") is None
+
+    def test_snooze_is_decided_from_the_stored_row(
+        self, sweeper, clock, patched_engine
+    ):
+        sweeper.register("inc-a")
+        sweeper.register("inc-b")
+        sweeper.cancel("inc-b", "comms_reminder")
+        sweeper.schedule("inc-c", "comms_reminder", clock.now)
+        _reminder.once = True
+        try:
+            _sweep(sweeper, [(_make_record(slug="inc-c"), 0)])
+        finally:
+            _reminder.once = False  # restore
+
+        # A replica that doesn't sweep has none of these in memory
+        follower = ReminderSweeper(clock=clock)
+        assert follower.snooze("inc-a", "comms_reminder", clock.now + 600)
+        assert not follower.snooze("inc-b", "comms_reminder", clock.now + 600)
+        assert not follower.snooze("inc-c", "comms_reminder", clock.now + 600)
+        assert not follower.snooze("inc-x", "comms_reminder", clock.now + 600)
+
+        stored = _stored(patched_engine)
+        assert _from_db(stored["inc-a", "comms_reminder"].due_at) == clock.now + 600
+        assert stored["inc-a", "comms_reminder"].snoozed is True
+        assert stored["inc-b", "comms_reminder"].dismissed is True
+        assert stored["inc-c", "comms_reminder"].fired is True
+        assert ("inc-x", "comms_reminder") not in stored
+
+    def test_dismissed_reminders_are_not_rearmed(
+        self, sweeper, clock, patched_engine
+    ):
+        self._add_incident(patched_engine, "inc-test")
+        sweeper.schedule("inc-test", "comms_reminder", clock.now)
+        sweeper.rehydrate()
+
+        # Dismissed elsewhere after this replica last refreshed
+        ReminderSweeper(clock=clock).cancel("inc-test", "comms_reminder")
+        _sweep(sweeper, [(_make_record(), 0)])
+        sweeper.schedule("inc-test", "comms_reminder", clock.now + 60)
+
+        assert _stored(patched_engine)["inc-test", "comms_reminder"].dismissed is True
+        sweeper.refresh()
+        assert sweeper.next_due("inc-test", "comms_reminder") is None
 
 
 class TestRegisterReminderJobs:
-    def test_registers_job_for_enabled_reminder(self):
+    def test_schedules_enabled_reminders(self):
         record = _make_record()
-        with patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched:
+        with patch.object(reminder_sweeper, "_clock", return_value=500.0):
             register_reminder_jobs(record)
-        mock_sched.scheduler.add_job.assert_called_once()
-        call_kwargs = mock_sched.scheduler.add_job.call_args[1]
-        assert call_kwargs["id"] == "inc-test_comms_reminder"
-        assert call_kwargs["minutes"] == _reminder.interval_minutes
+        try:
+            assert reminder_sweeper.next_due("inc-test", "comms_reminder") == 500.0 + 30 * 60
+        finally:
+            reminder_sweeper.cancel("inc-test")
 
     def test_skips_disabled_reminders(self):
         _reminder.enabled = False
-        record = _make_record()
-        with patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched:
-            register_reminder_jobs(record)
-        mock_sched.scheduler.add_job.assert_not_called()
-        _reminder.enabled = True  # restore
+        try:
+            register_reminder_jobs(_make_record())
+        finally:
+            _reminder.enabled = True  # restore
+        assert reminder_sweeper.next_due("inc-test", "comms_reminder") is None
 
 
 class TestCancelReminderJobs:
-    def test_deletes_existing_jobs(self):
-        mock_job = MagicMock()
-        mock_job.id = "inc-test_comms_reminder"
-        with patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched:
-            mock_sched.get_job.return_value = mock_job
-            cancel_reminder_jobs("inc-test")
-        mock_sched.delete_job.assert_called_once_with(job_to_delete=mock_job.id)
+    def test_drops_all_reminders_for_the_incident(self):
+        reminder_sweeper.schedule("inc-test", "comms_reminder", 1.0)
+        reminder_sweeper.schedule("inc-other", "comms_reminder", 1.0)
+
+        cancel_reminder_jobs("inc-test")
 
-    def test_skips_when_job_not_found(self):
-        with patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched:
-            mock_sched.get_job.return_value = None
-            cancel_reminder_jobs("inc-test")
-        mock_sched.delete_job.assert_not_called()
+        assert reminder_sweeper.next_due("inc-test", "comms_reminder") is None
+        assert reminder_sweeper.next_due("inc-other", "comms_reminder") == 1.0
+        reminder_sweeper.cancel("inc-other")
 
 
 class TestHandleSnooze:
-    def test_reschedules_job_and_posts_ack(self):
+    def test_pushes_reminder_back_and_posts_ack(self):
         record = _make_record()
         mock_client = MagicMock()
-        mock_job = MagicMock()
-        mock_job.id = "inc-test_comms_reminder"
+        reminder_sweeper.schedule("inc-test", "comms_reminder", 1.0)
 
         with (
             patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched,
+            patch("incidentbot.incident.reminders.time.time", return_value=500.0),
             patch("incidentbot.slack.client.slack_web_client", mock_client),
         ):
-            mock_sched.get_job.return_value = mock_job
             handle_snooze("C123", "comms_reminder", 30, "ts-123")
 
-        mock_sched.reschedule_job.assert_called_once_with(job_id=mock_job.id, new_minutes=30)
+        assert reminder_sweeper.next_due("inc-test", "comms_reminder") == 500.0 + 30 * 60
+        reminder_sweeper.cancel("inc-test")
         mock_client.chat_postMessage.assert_called_once()
         mock_client.chat_delete.assert_called_once_with(channel="C123", ts="ts-123")
 
@@ -224,21 +412,18 @@ class TestHandleSnooze:
 
 
 class TestHandleDismiss:
-    def test_deletes_job_and_posts_ack(self):
+    def test_cancels_reminder_and_posts_ack(self):
         record = _make_record()
         mock_client = MagicMock()
-        mock_job = MagicMock()
-        mock_job.id = "inc-test_comms_reminder"
+        reminder_sweeper.schedule("inc-test", "comms_reminder", 1.0)
 
         with (
             patch("incidentbot.incident.reminders.IncidentDatabaseInterface.get_one", return_value=record),
-            patch("incidentbot.incident.reminders.TaskScheduler") as mock_sched,
             patch("incidentbot.slack.client.slack_web_client", mock_client),
         ):
-            mock_sched.get_job.return_value = mock_job
             handle_dismiss("C123", "comms_reminder", "ts-456")
 
-        mock_sched.delete_job.assert_called_once_with(job_to_delete=mock_job.id)
+        assert reminder_sweeper.next_due("inc-test", "comms_reminder") is None
         mock_client.chat_postMessage.assert_called_once()
         mock_client.chat_delete.assert_called_once_with(channel="C123", ts="ts-456")
 
@@ -253,8 +438,8 @@ class TestHandleDismiss:
 
 
 class TestAdaptersRaiseOnFailedReminder:
-    """run_reminder relies on post_reminder raising, otherwise it deletes a
-    once-only job after a post that never landed. Assert the real adapters do."""
+    """The sweeper relies on post_reminder raising, otherwise it drops a
+    once-only reminder after a post that never landed. Assert the real adapters do."""
 
     def test_slack_adapter_propagates_api_error(self):
         from incidentbot.platform.slack import SlackAdapter
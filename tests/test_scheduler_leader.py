@@ -0,0 +1,122 @@
+"""
+Tests for scheduler leader election in incidentbot/scheduler/leader.py
+"""
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlmodel import Session, select
+
+from incidentbot.models.database import SchedulerLease
+from incidentbot.scheduler.leader import (
+    LeaderElector,
+    leader_gauge,
+    leader_only,
+    skipped_runs,
+)
+
+LEASE = 30
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock():
+    return _Clock()
+
+
+@pytest.fixture(autouse=True)
+def patched_engine(db_engine):
+    with patch("incidentbot.scheduler.leader.engine", db_engine):
+        yield db_engine
+
+
+@pytest.fixture(autouse=True)
+def leader_election():
+    with patch("incidentbot.scheduler.leader.settings") as settings:
+        settings.jobs.leader_election.enabled = True
+        yield settings.jobs.leader_election
+
+
+def _elector(clock, node_id):
+    return LeaderElector(
+        node_id=node_id, lease_seconds=LEASE, renew_seconds=10, clock=clock
+    )
+
+
+class TestLeaderElector:
+    def test_only_one_node_holds_the_lease(self, clock):
+        a, b = _elector(clock, "a"), _elector(clock, "b")
+
+        assert a.try_acquire() is True
+        assert b.try_acquire() is False
+        assert a.is_leader and not b.is_leader
+        assert leader_gauge.value(node="a") == 1
+        assert leader_gauge.value(node="b") == 0
+
+    def test_holder_renews_its_lease(self, clock, patched_engine):
+        a, b = _elector(clock, "a"), _elector(clock, "b")
+        a.try_acquire()
+
+        for _ in range(5):
+            clock.now += LEASE - 1
+            assert a.try_acquire() is True
+            assert b.try_acquire() is False
+
+        with Session(patched_engine) as session:
+            assert session.exec(select(SchedulerLease.holder)).all() == ["a"]
+
+    def test_expired_lease_is_taken_over(self, clock):
+        a, b = _elector(clock, "a"), _elector(clock, "b")
+        a.try_acquire()
+
+        clock.now += LEASE + 1
+        assert not a.is_leader
+        assert b.try_acquire() is True
+        assert a.try_acquire() is False
+
+    def test_released_lease_is_taken_over_at_once(self, clock):
+        a, b = _elector(clock, "a"), _elector(clock, "b")
+        a.try_acquire()
+
+        a.release()
+
+        assert not a.is_leader
+        assert b.try_acquire() is True
+
+    def test_database_errors_keep_the_lease_until_it_runs_out(self, clock):
+        a = _elector(clock, "a")
+        a.try_acquire()
+
+        with patch(
+            "incidentbot.scheduler.leader.Session", side_effect=RuntimeError("down")
+        ):
+            clock.now += 10
+            assert a.try_acquire() is True
+            clock.now += LEASE
+            assert a.try_acquire() is False
+
+    def test_disabled_election_always_leads(self, clock, leader_election):
+        leader_election.enabled = False
+
+        assert _elector(clock, "a").is_leader
+
+
+class TestLeaderOnly:
+    def test_jobs_run_only_on_the_leader(self, clock):
+        a, b = _elector(clock, "a"), _elector(clock, "b")
+        a.try_acquire()
+        b.try_acquire()
+
+        job = MagicMock(return_value="ran", __name__="example_job")
+        skipped = skipped_runs.value(job="example_job")
+
+        assert leader_only(a, job)() == "ran"
+        assert leader_only(b, job)() is None
+        job.assert_called_once()
+        assert skipped_runs.value(job="example_job") == skipped + 1
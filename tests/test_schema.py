@@ -7,11 +7,13 @@ import pytest
 from pydantic import ValidationError
 
 from incidentbot.configuration.schema import (
+    Attachments,
     GitlabIntegration,
     StatusDefinition,
     RoleDefinition,
     Options,
     AdditionalWelcomeMessage,
+    SlackSettings,
 )
 
 # ---------------------------------------------------------------------------
@@ -128,3 +130,40 @@ class TestAdditionalWelcomeMessage:
     def test_pin_can_be_set(self):
         m = AdditionalWelcomeMessage(message="Hello!", pin=True)
         assert m.pin is True
+
+
+# ---------------------------------------------------------------------------
+# SlackSettings
+# ---------------------------------------------------------------------------
+
+
+class TestSlackSettings:
+    def test_defaults_to_sync_mode(self):
+        s = SlackSettings()
+        assert s.handler_mode == "sync"
+        assert s.handler_concurrency == {}
+
+    def test_accepts_limits_for_known_listener_types(self):
+        s = SlackSettings(handler_mode="async", handler_concurrency={"action": 2})
+        assert s.handler_concurrency == {"action": 2}
+
+    def test_rejects_unknown_listener_types(self):
+        with pytest.raises(ValidationError):
+            SlackSettings(handler_concurrency={"actions": 2})
+
+
+# ---------------------------------------------------------------------------
+# Attachments
+# ---------------------------------------------------------------------------
+
+
+class TestAttachments:
+    def test_path_must_be_configured(self):
+        assert Attachments().path is None
+
+    def test_accepts_absolute_path(self):
+        assert Attachments(path="/data/attachments").path == "/data/attachments"
+
+    def test_rejects_relative_path(self):
+        with pytest.raises(ValidationError):
+            Attachments(path="attachments")
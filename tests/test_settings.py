@@ -120,3 +120,39 @@ def test_invalid_platform_value_fails_fast(monkeypatch, tmp_path):
 
     with pytest.raises(ValidationError):
         Settings()
+
+
+def test_lookups_are_built_from_statuses_severities_and_roles(
+    monkeypatch, tmp_path
+):
+    _set_minimal_env(monkeypatch)
+    monkeypatch.setenv("IS_TEST_ENVIRONMENT", "true")
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(
+        "statuses:\n"
+        "  triage: {}\n"
+        "  investigating: {initial: true}\n"
+        "  resolved: {final: true}\n"
+        "  closed: {final: true}\n"
+        "severities:\n"
+        "  critical: Everything is down\n"
+        "  minor: Something is slow\n"
+        "roles:\n"
+        "  lead: {description: Runs the incident, is_lead: true}\n"
+        "  scribe: {description: Takes notes}\n"
+    )
+    _set_yaml_file(monkeypatch, config_file)
+
+    lookups = Settings().lookups
+
+    assert lookups.statuses == ("triage", "investigating", "resolved", "closed")
+    assert lookups.initial_status == "investigating"
+    assert lookups.final_status == "resolved"
+    assert lookups.final_statuses == {"resolved", "closed"}
+    assert lookups.open_statuses == ("triage", "investigating")
+    assert lookups.severities == ("critical", "minor")
+    assert lookups.severity_rank == {"critical": 0, "minor": 1}
+    assert lookups.roles == ("lead", "scribe")
+    assert lookups.lead_roles == {"lead"}
+    with pytest.raises(TypeError):
+        lookups.severity_rank["minor"] = 0
@@ -0,0 +1,291 @@
+"""
+Tests for incidentbot/slack/directory.py :: SlackUserDirectory and
+SlackChannelDirectory
+"""
+import datetime
+
+from unittest.mock import patch
+
+import pytest
+from sqlmodel import Session, select
+
+from incidentbot.models.database import ApplicationData, SlackCacheRecord
+from incidentbot.slack.directory import (
+    SlackChannelDirectory,
+    SlackUserDirectory,
+    _SlackCacheDirectory,
+)
+
+_USERS = [
+    {"name": "alice", "real_name": "Alice Example", "email": "Alice@example.com", "id": "U001"},
+    {"name": "bob", "real_name": "Bob Example", "email": None, "id": "U002"},
+]
+
+_CHANNELS = [
+    {"id": "C001", "name": "general", "is_archived": False, "is_private": False, "topic": {}},
+    {"id": "C002", "name": "Incidents", "is_archived": False, "is_private": False},
+    {"id": "C003", "name": "inc-old", "is_archived": True, "is_private": False},
+]
+
+
+@pytest.fixture()
+def patched_engine(db_engine):
+    with patch("incidentbot.slack.directory.engine", db_engine):
+        yield db_engine
+
+
+@pytest.fixture()
+def seeded_engine(patched_engine):
+    with Session(patched_engine) as session:
+        for user in _USERS:
+            session.add(SlackCacheRecord(kind="user", id=user["id"], data=user))
+        session.commit()
+    return patched_engine
+
+
+class TestSlackUserDirectory:
+    def test_lazy_loads_from_db_once(self, seeded_engine):
+        directory = SlackUserDirectory()
+        with patch.object(
+            directory, "_read_db", wraps=directory._read_db
+        ) as read_db:
+            assert directory.get("U001")["name"] == "alice"
+            assert directory.get("U002")["name"] == "bob"
+        read_db.assert_called_once()
+
+    def test_lookup_by_email_and_real_name_is_case_insensitive(self, seeded_engine):
+        directory = SlackUserDirectory()
+        assert directory.get_by_email("alice@EXAMPLE.com")["id"] == "U001"
+        assert directory.get_by_real_name("bob example")["id"] == "U002"
+        assert directory.get_by_email(None) is None
+
+    def test_counts_hits_and_misses(self, seeded_engine):
+        directory = SlackUserDirectory()
+        directory.get("U001")
+        directory.get("U999")
+        directory.get("U999")
+        assert directory.stats() == {"hits": 1, "misses": 2, "size": 2}
+
+    def test_load_replaces_index(self, seeded_engine):
+        directory = SlackUserDirectory()
+        assert directory.get("U001") is not None
+        directory.load([{"name": "carol", "real_name": "Carol", "id": "U003"}])
+        assert directory.get("U001") is None
+        assert directory.get("U003")["name"] == "carol"
+
+    def test_invalidate_forces_reload(self, seeded_engine):
+        directory = SlackUserDirectory()
+        directory.load([])
+        assert directory.get("U001") is None
+        directory.invalidate()
+        assert directory.get("U001")["name"] == "alice"
+
+    def test_user_change_event_updates_indexes(self, seeded_engine):
+        directory = SlackUserDirectory()
+
+        directory.upsert(
+            {
+                "id": "U001",
+                "name": "alice",
+                "profile": {"real_name": "Alice Renamed"},
+            }
+        )
+
+        assert directory.get_by_real_name("alice example") is None
+        assert directory.get_by_real_name("alice renamed")["id"] == "U001"
+        assert directory.get_by_email("alice@example.com")["id"] == "U001"
+        assert _stored(seeded_engine, "user")["U001"]["real_name"] == "Alice Renamed"
+
+    def test_removal_leaves_lookups_held_by_other_users(self, patched_engine):
+        directory = SlackUserDirectory()
+        directory.load(
+            [
+                {"id": "U001", "name": "sam", "real_name": "Sam", "email": "sam@example.com"},
+                {"id": "U002", "name": "sam2", "real_name": "Sam", "email": "sam2@example.com"},
+            ]
+        )
+
+        # The email moves to the other account before the first is removed
+        directory.upsert({"id": "U002", "name": "sam2", "email": "sam@example.com"})
+        directory.remove("U001")
+
+        assert directory.get_by_email("sam@example.com")["id"] == "U002"
+        assert directory.get_by_real_name("sam")["id"] == "U002"
+
+    def test_missing_record_yields_empty_directory(self, patched_engine):
+        directory = SlackUserDirectory()
+        assert directory.get("U001") is None
+        assert directory.stats()["size"] == 0
+
+    def test_refresh_picks_up_other_replicas_changes(self, patched_engine):
+        directory = SlackUserDirectory()
+        directory.reconcile(_USERS)
+
+        # Events delivered to another replica
+        other = SlackUserDirectory()
+        other.upsert({"id": "U003", "name": "carol", "real_name": "Carol"})
+        other.upsert({"id": "U001", "name": "alice", "email": "alice@new.example.com"})
+        other.remove("U002")
+        assert directory.get("U003") is None
+
+        directory.refresh()
+
+        assert directory.get("U003")["name"] == "carol"
+        assert directory.get_by_email("alice@new.example.com")["id"] == "U001"
+        assert directory.get_by_email("alice@example.com") is None
+        assert directory.get("U002") is None
+
+    def test_refresh_waits_for_the_first_load(self, patched_engine):
+        directory = SlackUserDirectory()
+        with patch.object(directory, "_read_db") as read_db:
+            directory.refresh()
+        read_db.assert_not_called()
+        assert directory._index is None
+
+    def test_subclasses_must_implement_the_hooks(self):
+        class Incomplete(_SlackCacheDirectory):
+            kind = "thing"
+            record_name = "slack_things"
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+def _stored(engine, kind: str) -> dict[str, dict]:
+    with Session(engine) as session:
+        return {
+            row.id: row.data
+            for row in session.exec(
+                select(SlackCacheRecord).where(SlackCacheRecord.kind == kind)
+            )
+        }
+
+
+class TestSlackChannelDirectory:
+    def test_warm_starts_from_stored_rows(self, patched_engine):
+        SlackChannelDirectory().reconcile(_CHANNELS)
+
+        directory = SlackChannelDirectory()
+
+        assert directory.get("C001") == {
+            "id": "C001",
+            "name": "general",
+            "is_archived": False,
+            "is_private": False,
+        }
+        assert directory.stats()["size"] == 3
+
+    def test_lookup_by_name_skips_archived_unless_asked(self, patched_engine):
+        directory = SlackChannelDirectory()
+        directory.load(_CHANNELS)
+
+        assert directory.get_by_name("incidents")["id"] == "C002"
+        assert directory.get_by_name("inc-old") is None
+        assert directory.get_by_name("inc-old", include_archived=True)["id"] == "C003"
+        assert directory.get("C003")["is_archived"] is True
+
+    def test_events_update_the_index_and_rows(self, patched_engine):
+        directory = SlackChannelDirectory()
+        directory.reconcile(_CHANNELS)
+
+        directory.upsert({"id": "C004", "name": "inc-new", "created": 1})
+        directory.upsert({"id": "C001", "name": "announcements"})
+        directory.set_archived("C002", True)
+        directory.set_archived("C003", False)
+        directory.remove("C003")
+
+        assert directory.get_by_name("general") is None
+        assert directory.get_by_name("announcements")["id"] == "C001"
+        assert directory.get("C001")["is_private"] is False
+        assert directory.get_by_name("incidents") is None
+        assert directory.get_by_name("inc-new")["id"] == "C004"
+        assert directory.get("C003") is None
+
+        stored = _stored(patched_engine, "channel")
+        assert sorted(stored) == ["C001", "C002", "C004"]
+        assert stored["C001"]["name"] == "announcements"
+        assert stored["C002"]["is_archived"] is True
+
+    def test_reconcile_writes_only_differences(self, patched_engine):
+        directory = SlackChannelDirectory()
+        directory.reconcile(_CHANNELS)
+
+        counts = directory.reconcile(
+            [
+                _CHANNELS[0],
+                {**_CHANNELS[1], "name": "incidents-renamed"},
+                {"id": "C005", "name": "inc-5", "is_archived": False},
+            ]
+        )
+
+        assert counts == {"changed": 2, "removed": 1, "size": 3}
+        assert sorted(_stored(patched_engine, "channel")) == ["C001", "C002", "C005"]
+        assert directory.get_by_name("incidents-renamed")["id"] == "C002"
+
+        with patch.object(directory, "_write") as write:
+            directory.reconcile(_CHANNELS[:1])
+            directory.reconcile(_CHANNELS[:1])
+        write.assert_called_once_with([], ["C002", "C005"])
+
+    def test_needs_reconcile(self, patched_engine):
+        directory = SlackChannelDirectory()
+        day = datetime.timedelta(hours=24)
+
+        assert directory.needs_reconcile(day)
+        directory.reconcile([])
+        assert not directory.needs_reconcile(day)
+
+        two_days_ago = datetime.datetime.now(datetime.UTC) - 2 * day
+        directory._set_reconciled_at(two_days_ago)
+        assert directory.reconciled_at() == two_days_ago
+        assert directory.needs_reconcile(day)
+
+        # Updated in place: the unique name index rejects a delete and re-add
+        with Session(patched_engine) as session:
+            rows = session.exec(
+                select(ApplicationData).filter(
+                    ApplicationData.name == directory.record_name
+                )
+            ).all()
+        assert len(rows) == 1
+
+
+class TestChannelLookups:
+    @pytest.fixture()
+    def channels(self, patched_engine):
+        directory = SlackChannelDirectory()
+        directory.reconcile(_CHANNELS)
+        with patch("incidentbot.slack.client.channel_directory", directory):
+            yield directory
+
+    def test_get_channel_name(self, channels):
+        from incidentbot.exceptions import IndexNotFoundError
+        from incidentbot.slack.client import get_channel_name
+
+        assert get_channel_name("C002") == "Incidents"
+        with pytest.raises(IndexNotFoundError):
+            get_channel_name("C999")
+
+    @pytest.mark.parametrize("value", ["C002", "incidents", "INCIDENTS"])
+    def test_get_digest_channel_id(self, channels, value):
+        from incidentbot.slack.client import get_digest_channel_id
+
+        with patch("incidentbot.slack.client.settings") as settings:
+            settings.digest_channel = value
+            assert get_digest_channel_id() == "C002"
+
+    def test_scheduled_job_skips_reconcile_while_fresh(self, channels):
+        from incidentbot.slack import client
+
+        with (
+            patch.object(client, "settings") as settings,
+            patch.object(
+                client, "get_channel_list", return_value=_CHANNELS
+            ) as get_channel_list,
+        ):
+            settings.jobs.update_slack_cache.reconcile_interval_hours = 24
+            client.store_slack_channel_list_db()
+            get_channel_list.assert_not_called()
+
+            client.store_slack_channel_list_db(force=True)
+            get_channel_list.assert_called_once_with(exclude_archived=False)
@@ -0,0 +1,197 @@
+"""
+Slack listener registry and the async dispatch mode.
+
+The dispatcher tests drive wrapped listeners on the dispatcher's own event
+loop the way AsyncApp would, passing async ack/say helpers and checking that
+listener bodies run on the worker pool within each listener type's
+concurrency limit.
+"""
+import asyncio
+import inspect
+import threading
+import time
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from slack_sdk import WebClient
+
+from incidentbot.slack.dispatch import (
+    AsyncDispatcher,
+    ListenerRegistry,
+    handler_in_flight,
+    handler_queue_depth,
+)
+
+
+def _registry() -> ListenerRegistry:
+    registry = ListenerRegistry()
+
+    @registry.action("incident.example")
+    def handle_action(ack, body):
+        ack()
+
+    @registry.view("incident.example_modal")
+    def handle_view(ack, body, view):
+        ack()
+
+    @registry.error
+    def handle_error(error, body, logger):
+        pass
+
+    return registry
+
+
+@pytest.fixture()
+def dispatcher():
+    dispatcher = AsyncDispatcher(
+        workers=8, default_concurrency=4, concurrency={"action": 2}
+    )
+    yield dispatcher
+    dispatcher.shutdown()
+
+
+def _async_ack():
+    calls = []
+
+    async def ack(*args, **kwargs):
+        calls.append((args, kwargs))
+
+    return ack, calls
+
+
+class TestListenerRegistry:
+    def test_decorators_return_the_original_function(self):
+        registry = ListenerRegistry()
+
+        def handle(ack, body):
+            pass
+
+        assert registry.action("incident.example")(handle) is handle
+        assert registry.listeners == [
+            ("action", ("incident.example",), {}, handle)
+        ]
+
+    def test_build_app_mounts_listeners_on_a_bounded_pool(self):
+        client = WebClient(token="xoxb-test")
+        app = _registry().build_app(
+            client, workers=3, token_verification_enabled=False
+        )
+
+        assert app.client is client
+        assert len(app._listeners) == 2
+        assert app._listener_runner.listener_executor._max_workers == 3
+
+    def test_build_async_app_mounts_coroutine_listeners(self, dispatcher):
+        registry = _registry()
+
+        async def build():
+            return registry.build_async_app("xoxb-test", dispatcher)
+
+        app = dispatcher.run(build())
+
+        assert len(app._async_listeners) == 2
+        for listener in app._async_listeners:
+            assert inspect.iscoroutinefunction(listener.ack_function)
+        # Bolt injects arguments by name, so the wrappers must keep the
+        # original signatures
+        assert [
+            inspect.getfullargspec(inspect.unwrap(listener.ack_function)).args
+            for listener in app._async_listeners
+        ] == [["ack", "body"], ["ack", "body", "view"]]
+
+
+class TestAsyncDispatcher:
+    def test_listener_is_acked_on_the_loop_and_run_on_a_worker(self, dispatcher):
+        ack, acks = _async_ack()
+        said = []
+        seen = {}
+
+        async def say(text):
+            said.append(text)
+
+        def handle(ack, body, say, client):
+            ack()
+            say("hello")
+            seen["thread"] = threading.current_thread().name
+            seen["client"] = client
+            return body["id"]
+
+        listener = dispatcher.wrap("action", handle)
+        with patch(
+            "incidentbot.slack.client.slack_web_client", MagicMock(name="web")
+        ) as web:
+            result = dispatcher.run(
+                listener(ack=ack, body={"id": 1}, say=say, client=object())
+            )
+
+        assert result == 1
+        assert acks == [((), {})]
+        assert said == ["hello"]
+        assert seen["thread"].startswith("slack-handler")
+        assert seen["client"] is web
+
+    def test_concurrency_is_limited_per_listener_type(self, dispatcher):
+        release = threading.Event()
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def handle(ack, body):
+            with lock:
+                running.append(body)
+                peak.append(len(running))
+            release.wait(5)
+            with lock:
+                running.remove(body)
+
+        listener = dispatcher.wrap("action", handle)
+        futures = []
+        for i in range(5):
+            ack, _ = _async_ack()
+            futures.append(
+                asyncio.run_coroutine_threadsafe(
+                    listener(ack=ack, body=i), dispatcher.loop
+                )
+            )
+
+        deadline = time.monotonic() + 5
+        while handler_queue_depth.value(kind="action") < 3:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        assert handler_in_flight.value(kind="action") == 2
+        release.set()
+        for future in futures:
+            future.result(5)
+
+        assert max(peak) == 2
+        assert handler_queue_depth.value(kind="action") == 0
+        assert handler_in_flight.value(kind="action") == 0
+
+    def test_other_listener_types_are_not_blocked(self, dispatcher):
+        release = threading.Event()
+        busy = dispatcher.wrap("action", lambda ack, body: release.wait(5))
+        for i in range(4):
+            ack, _ = _async_ack()
+            asyncio.run_coroutine_threadsafe(
+                busy(ack=ack, body=i), dispatcher.loop
+            )
+
+        ack, _ = _async_ack()
+        view = dispatcher.wrap("view", lambda ack, body: "submitted")
+        try:
+            assert dispatcher.run(view(ack=ack, body={}), timeout=5) == "submitted"
+        finally:
+            release.set()
+
+    def test_error_in_listener_propagates_and_frees_the_slot(self, dispatcher):
+        def handle(ack, body):
+            raise RuntimeError("boom")
+
+        listener = dispatcher.wrap("command", handle)
+        ack, _ = _async_ack()
+        with pytest.raises(RuntimeError):
+            dispatcher.run(listener(ack=ack, body={}))
+
+        assert handler_in_flight.value(kind="command") == 0
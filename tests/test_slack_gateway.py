@@ -0,0 +1,185 @@
+"""
+Tests for the Slack Web API gateway in incidentbot/slack/gateway.py
+"""
+import threading
+import time
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from slack_sdk.errors import SlackApiError
+
+from incidentbot.slack.gateway import (
+    SlackGateway,
+    TokenBucket,
+    api_calls,
+    coalesced,
+    rate_limited,
+    retries,
+)
+
+
+def _rate_limit_error(retry_after: int = 2) -> SlackApiError:
+    resp = MagicMock()
+    resp.status_code = 429
+    resp.headers = {"Retry-After": str(retry_after)}
+    return SlackApiError("rate limited", resp)
+
+
+def _api_error(status_code: int = 200) -> SlackApiError:
+    resp = MagicMock()
+    resp.status_code = status_code
+    return SlackApiError("channel_not_found", resp)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def slept():
+    return []
+
+
+@pytest.fixture()
+def gateway(slept):
+    return SlackGateway(sleep=slept.append)
+
+
+class TestTokenBucket:
+    def test_allows_a_burst_then_paces_calls(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+        assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+        clock.now += 10
+        assert bucket.reserve() == 0
+
+    def test_pause_holds_callers_until_it_ends(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=1, capacity=5, clock=clock)
+
+        bucket.pause(30)
+
+        assert bucket.reserve() == pytest.approx(30)
+        assert bucket.reserve() == pytest.approx(31)
+
+
+class TestSlackGateway:
+    def test_returns_result_and_passes_arguments(self, gateway):
+        api_call = MagicMock(return_value={"ok": True})
+        before = api_calls.value(method="chat.update", outcome="ok")
+
+        result = gateway.call(api_call, "chat.update", json={"channel": "C1"})
+
+        assert result == {"ok": True}
+        api_call.assert_called_once_with("chat.update", json={"channel": "C1"})
+        assert api_calls.value(method="chat.update", outcome="ok") == before + 1
+
+    def test_retries_rate_limited_calls_after_retry_after(self, gateway, slept):
+        api_call = MagicMock(side_effect=[_rate_limit_error(30), "ok"])
+        before = rate_limited.value(method="pins.add")
+        retried = retries.value(method="pins.add", reason="rate_limited")
+
+        with patch("incidentbot.slack.gateway.random.uniform", return_value=0.5):
+            assert gateway.call(api_call, "pins.add", json={}) == "ok"
+
+        assert api_call.call_count == 2
+        assert slept == [pytest.approx(30.5, abs=0.1)]
+        assert rate_limited.value(method="pins.add") == before + 1
+        assert (
+            retries.value(method="pins.add", reason="rate_limited") == retried + 1
+        )
+
+    def test_gives_up_after_max_retries(self, slept):
+        gateway = SlackGateway(max_retries=2, sleep=slept.append)
+        api_call = MagicMock(side_effect=_rate_limit_error(1))
+        before = api_calls.value(method="reactions.add", outcome="rate_limited")
+
+        with pytest.raises(SlackApiError):
+            gateway.call(api_call, "reactions.add", json={})
+
+        assert api_call.call_count == 3
+        assert (
+            api_calls.value(method="reactions.add", outcome="rate_limited")
+            == before + 1
+        )
+
+    def test_reraises_other_slack_errors_without_retrying(self, gateway):
+        api_call = MagicMock(side_effect=_api_error())
+
+        with pytest.raises(SlackApiError):
+            gateway.call(api_call, "conversations.info", params={"channel": "C1"})
+
+        api_call.assert_called_once()
+
+    def test_connection_errors_are_retried_for_reads_only(self, gateway, slept):
+        read = MagicMock(side_effect=[ConnectionError("reset"), "ok"])
+        write = MagicMock(side_effect=ConnectionError("reset"))
+
+        assert gateway.call(read, "users.info", params={"user": "U1"}) == "ok"
+        with pytest.raises(ConnectionError):
+            gateway.call(write, "chat.update", json={})
+
+        assert read.call_count == 2
+        assert write.call_count == 1
+        assert len(slept) == 1 and 0 <= slept[0] <= 1
+
+    def test_identical_concurrent_reads_share_one_request(self, gateway):
+        release = threading.Event()
+        api_call = MagicMock(
+            side_effect=lambda *a, **kw: release.wait(5) and {"members": []}
+        )
+        before = coalesced.value(method="conversations.members")
+        results = []
+
+        def read():
+            results.append(
+                gateway.call(
+                    api_call, "conversations.members", params={"channel": "C1"}
+                )
+            )
+
+        threads = [threading.Thread(target=read) for _ in range(4)]
+        for t in threads:
+            t.start()
+        deadline = time.monotonic() + 5
+        while coalesced.value(method="conversations.members") < before + 3:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        release.set()
+        for t in threads:
+            t.join()
+
+        api_call.assert_called_once()
+        assert results == [{"members": []}] * 4
+
+    def test_posts_are_limited_per_channel(self, gateway):
+        one = gateway.bucket("chat.postMessage", {"json": {"channel": "C1"}})
+        two = gateway.bucket("chat.postMessage", {"json": {"channel": "C2"}})
+        update = gateway.bucket("chat.update", {"json": {"channel": "C1"}})
+
+        assert one is not two
+        assert one is gateway.bucket("chat.postMessage", {"json": {"channel": "C1"}})
+        assert update is gateway.bucket("chat.update", {"json": {"channel": "C2"}})
+        assert one.rate == 1
+        assert update.rate == pytest.approx(50 / 60)
+
+
+class TestSharedClient:
+    def test_web_client_calls_go_through_the_gateway(self):
+        from incidentbot.slack import client
+
+        with patch(
+            "incidentbot.slack.gateway.gateway.call", return_value={"ok": True}
+        ) as call:
+            client.slack_web_client.api_call("auth.test")
+
+        assert call.call_args.args[1] == "auth.test"
@@ -0,0 +1,119 @@
+"""
+Tests for the roles panel and digest update coalescer in
+incidentbot/slack/updates.py
+"""
+import threading
+import time
+
+import pytest
+
+from incidentbot.slack.updates import (
+    MessageUpdateCoalescer,
+    updates_requested,
+    updates_sent,
+)
+
+WINDOW = 0.05
+
+
+@pytest.fixture()
+def coalescer():
+    coalescer = MessageUpdateCoalescer(
+        window_seconds=WINDOW, max_delay_seconds=20 * WINDOW
+    )
+    yield coalescer
+    coalescer.shutdown()
+
+
+def _recorder():
+    sent = []
+    done = threading.Event()
+
+    def update(value):
+        def run():
+            sent.append(value)
+            done.set()
+
+        return run
+
+    return sent, done, update
+
+
+class TestMessageUpdateCoalescer:
+    def test_burst_of_updates_sends_only_the_latest(self, coalescer):
+        sent, done, update = _recorder()
+        requested = updates_requested.value(message="roles_panel")
+        sent_before = updates_sent.value(message="roles_panel")
+
+        for i in range(10):
+            coalescer.submit("roles_panel", "C1", update(i))
+
+        assert done.wait(5)
+        time.sleep(2 * WINDOW)
+        assert sent == [9]
+        assert updates_requested.value(message="roles_panel") == requested + 10
+        assert updates_sent.value(message="roles_panel") == sent_before + 1
+
+    def test_messages_are_batched_separately(self, coalescer):
+        sent, _, update = _recorder()
+
+        coalescer.submit("roles_panel", "C1", update("panel C1"))
+        coalescer.submit("roles_panel", "C2", update("panel C2"))
+        coalescer.submit("digest", "C1", update("digest C1"))
+
+        deadline = time.monotonic() + 5
+        while len(sent) < 3:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert sorted(sent) == ["digest C1", "panel C1", "panel C2"]
+
+    def test_steady_updates_are_sent_by_max_delay(self):
+        coalescer = MessageUpdateCoalescer(
+            window_seconds=WINDOW, max_delay_seconds=3 * WINDOW
+        )
+        sent, done, update = _recorder()
+
+        try:
+            start = time.monotonic()
+            i = 0
+            while not done.is_set() and time.monotonic() - start < 5:
+                coalescer.submit("digest", "C1", update(i))
+                i += 1
+                time.sleep(WINDOW / 5)
+        finally:
+            coalescer.shutdown()
+
+        assert done.is_set()
+        assert sent[0] < i
+
+    def test_zero_window_sends_right_away(self):
+        coalescer = MessageUpdateCoalescer(window_seconds=0, max_delay_seconds=0)
+        sent, _, update = _recorder()
+
+        coalescer.submit("digest", "C1", update(1))
+
+        assert sent == [1]
+        assert coalescer.pending() == 0
+
+    def test_failed_update_does_not_stop_later_ones(self, coalescer):
+        sent, done, update = _recorder()
+
+        def broken():
+            raise RuntimeError("boom")
+
+        coalescer.submit("digest", "C1", broken)
+        coalescer.flush()
+        coalescer.submit("digest", "C1", update("after"))
+
+        assert done.wait(5)
+        assert sent == ["after"]
+
+    def test_shutdown_sends_pending_updates(self):
+        coalescer = MessageUpdateCoalescer(window_seconds=60, max_delay_seconds=60)
+        sent, _, update = _recorder()
+
+        coalescer.submit("digest", "C1", update("pending"))
+        assert sent == []
+        coalescer.shutdown()
+
+        assert sent == ["pending"]
@@ -0,0 +1,195 @@
+"""
+Tests for incidentbot/util/tracing.py and the spans recorded around
+database, Slack and incident setup work.
+"""
+import asyncio
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlmodel import Session, select
+
+from incidentbot.incident.steps import StepGraph
+from incidentbot.models.database import IncidentRecord
+from incidentbot.slack.client import _traced_api_call
+from incidentbot.util.tracing import (
+    OTLPExporter,
+    current_span,
+    get_exporter,
+    set_incident,
+    shutdown_exporter,
+    span,
+    span_duration,
+    span_errors,
+    traced,
+)
+
+
+@pytest.fixture()
+def exported():
+    """
+    Collect every span that finishes during the test
+    """
+
+    spans = []
+    exporter = MagicMock()
+    exporter.export.side_effect = spans.append
+    with patch("incidentbot.util.tracing.get_exporter", return_value=exporter):
+        yield spans
+
+
+class TestSpan:
+    def test_records_duration_by_system_and_operation(self):
+        before = span_duration.count(system="test", operation="timed")
+
+        with span("test", "timed"):
+            pass
+
+        assert span_duration.count(system="test", operation="timed") == before + 1
+
+    def test_nested_spans_share_the_trace(self, exported):
+        with span("incident", "start") as root:
+            set_incident("inc-7")
+            with span("slack", "chat.postMessage") as child:
+                assert current_span() is child
+            assert current_span() is root
+
+        assert current_span() is None
+        assert [s.operation for s in exported] == ["chat.postMessage", "start"]
+        assert child.trace_id == root.trace_id
+        assert child.parent_id == root.span_id
+        assert child.incident == "inc-7"
+
+    def test_exceptions_are_counted_and_reraised(self, exported):
+        before = span_errors.value(system="test", operation="broken")
+
+        with pytest.raises(RuntimeError), span("test", "broken"):
+            raise RuntimeError("boom")
+
+        assert span_errors.value(system="test", operation="broken") == before + 1
+        assert len(exported) == 1
+        assert isinstance(exported[0].error, RuntimeError)
+
+    def test_traced_wraps_functions_and_coroutines(self, exported):
+        @traced("test")
+        def sync_work():
+            return current_span().operation
+
+        @traced("test", "renamed")
+        async def async_work():
+            return current_span().operation
+
+        assert sync_work() == "sync_work"
+        assert asyncio.run(async_work()) == "renamed"
+        assert [s.operation for s in exported] == ["sync_work", "renamed"]
+
+    def test_step_graph_steps_are_children_of_the_caller(self, exported):
+        graph = StepGraph("test")
+        graph.add("a", lambda: current_span().span_id)
+        graph.add("b", lambda: current_span().span_id)
+
+        with span("incident", "start") as root:
+            results = graph.run()
+
+        assert results.values == {"a": root.span_id, "b": root.span_id}
+
+
+class TestInstrumentation:
+    def test_database_statements_are_spans(self, db_engine, exported):
+        with (
+            span("incident", "lookup") as root,
+            Session(db_engine) as session,
+        ):
+            session.exec(select(IncidentRecord)).all()
+
+        statements = [s for s in exported if s.system == "db"]
+        assert [s.operation for s in statements] == ["select"]
+        assert statements[0].parent_id == root.span_id
+
+    def test_slack_api_calls_are_spans(self, exported):
+        api_call = MagicMock(return_value={"ok": True})
+
+        result = _traced_api_call(api_call)("chat.postMessage", json={"x": 1})
+
+        assert result == {"ok": True}
+        api_call.assert_called_once_with("chat.postMessage", json={"x": 1})
+        assert [(s.system, s.operation) for s in exported] == [
+            ("slack", "chat.postMessage")
+        ]
+
+
+class TestOTLPExporter:
+    def test_flush_posts_spans_as_otlp_json(self, requests_mock):
+        requests_mock.post("http://collector:4318/v1/traces", status_code=200)
+        exporter = OTLPExporter(
+            "http://collector:4318/", flush_interval_seconds=3600
+        )
+
+        with (
+            patch("incidentbot.util.tracing.get_exporter", return_value=exporter),
+            span("incident", "set_status") as root,
+        ):
+            set_incident("inc-3")
+            with span("jira", "update_issue_status", attempt=1):
+                pass
+
+        exporter.flush()
+        exporter.shutdown()
+
+        body = requests_mock.last_request.json()
+        resource = body["resourceSpans"][0]
+        assert resource["resource"]["attributes"] == [
+            {"key": "service.name", "value": {"stringValue": "incidentbot"}}
+        ]
+        spans = resource["scopeSpans"][0]["spans"]
+        assert [s["name"] for s in spans] == [
+            "jira.update_issue_status",
+            "incident.set_status",
+        ]
+        child, parent = spans
+        assert child["traceId"] == parent["traceId"] == root.trace_id
+        assert child["parentSpanId"] == parent["spanId"]
+        assert "parentSpanId" not in parent
+        assert child["kind"] == 3
+        assert {"key": "incident.slug", "value": {"stringValue": "inc-3"}} in child[
+            "attributes"
+        ]
+        assert {"key": "attempt", "value": {"intValue": "1"}} in child["attributes"]
+        assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
+
+    def test_full_queue_drops_spans(self):
+        exporter = OTLPExporter(
+            "http://collector:4318", flush_interval_seconds=3600, max_queue_size=1
+        )
+
+        with patch("incidentbot.util.tracing.get_exporter", return_value=exporter):
+            for _ in range(3):
+                with span("test", "dropped"):
+                    pass
+
+        assert exporter.dropped == 2
+
+    def test_spans_after_shutdown_do_not_restart_the_exporter(self):
+        with (
+            patch.multiple(
+                "incidentbot.util.tracing",
+                _exporter=None,
+                _exporter_configured=False,
+                _exporter_shut_down=False,
+            ),
+            patch(
+                "incidentbot.util.tracing.settings.TRACING_OTLP_ENDPOINT",
+                "http://collector:4318",
+            ),
+            patch("incidentbot.util.tracing.OTLPExporter") as exporter_cls,
+        ):
+            exporter = get_exporter()
+            shutdown_exporter()
+            with span("test", "late"):
+                pass
+
+            assert get_exporter() is None
+
+        exporter_cls.assert_called_once()
+        exporter.shutdown.assert_called_once()
+        exporter.export.assert_not_called()
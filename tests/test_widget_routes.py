@@ -4,6 +4,8 @@ Tests for incidentbot/api/routes/widget.py
 import unittest
 from unittest.mock import MagicMock, patch
 
+from incidentbot.configuration.lookups import build_lookups
+
 # Pre-import fastapi so it stays in sys.modules after the patch.dict block
 # exits.  FastAPI uses isinstance checks against its own classes at request
 # time; if the module has been evicted from sys.modules the Header dependency
@@ -26,6 +28,9 @@ _mock_settings.roles = {
     "incident_commander": MagicMock(is_lead=True),
     "scribe": MagicMock(is_lead=False),
 }
+_mock_settings.lookups = build_lookups(
+    statuses=_mock_settings.statuses, roles=_mock_settings.roles
+)
 
 with (
     patch("incidentbot.configuration.settings.settings", _mock_settings),